@@ -0,0 +1,65 @@
+"""One-shot operational commands, run once per deploy instead of on every worker boot.
+
+    python manage.py migrate        # apply migrations and build indexes
+    python manage.py seed           # QA users (--demo for demo channels and creators)
+    python manage.py status         # schema version and index build status
+"""
+import asyncio
+import json
+
+import typer
+
+import server
+
+cli = typer.Typer(help="TeleIndex operational commands", no_args_is_help=True)
+
+
+def echo_json(data) -> None:
+    typer.echo(json.dumps(data, ensure_ascii=False, indent=2, default=str))
+
+
+@cli.command()
+def migrate(
+    wait: float = typer.Option(600.0, help="Seconds to wait for another process holding the migration lock"),
+    skip_indexes: bool = typer.Option(False, help="Only apply migrations; leave index builds for a later run"),
+):
+    """Apply pending migrations and build every declared index."""
+    try:
+        ran, indexes = asyncio.run(server.migrate("manage.py migrate", wait_seconds=wait, indexes=not skip_indexes))
+    except server.MigrationError as e:
+        typer.echo(f"error: {e}", err=True)
+        raise typer.Exit(1)
+    for record in ran:
+        typer.echo(f"applied {record['version']:04d}_{record['name']} ({record['duration_ms']} ms)")
+    typer.echo(f"schema version {server.SCHEMA_VERSION}")
+    if indexes is not None:
+        failed = [i for i in indexes["indexes"] if i["status"] == "failed"]
+        typer.echo(f"indexes: {len(indexes['indexes']) - len(failed)} ready, {len(failed)} failed")
+        for i in failed:
+            typer.echo(f"  {i['collection']}.{i['name']}: {i['error']}", err=True)
+        if failed:
+            raise typer.Exit(1)
+
+
+@cli.command()
+def seed(demo: bool = typer.Option(False, help="Also create demo users, channels and creators")):
+    """Create the QA users (idempotent)."""
+    async def run():
+        async with server.migration_lock("manage.py seed"):
+            users = await server.seed_test_users()
+            return {"users": users, "demo": await server.run_seed_all() if demo else None}
+
+    echo_json(asyncio.run(run()))
+
+
+@cli.command()
+def status():
+    """Show applied/pending migrations and index build status; exits 1 if anything is behind."""
+    report = asyncio.run(server.migration_status())
+    echo_json(report)
+    if report["schema_version"] < report["target_schema_version"] or report["indexes_not_ready"]:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    cli()
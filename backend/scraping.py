@@ -0,0 +1,747 @@
+"""HTML scraping helpers for the catalog parsers.
+
+Kept free of app/DB imports so process-pool workers can import it cheaply.
+"""
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+try:
+    from bs4 import BeautifulSoup, CData, NavigableString, Tag
+except Exception:
+    BeautifulSoup = None
+
+try:
+    from lxml import etree
+except Exception:
+    etree = None
+
+try:
+    import numpy as np
+    import pandas as pd
+except Exception:
+    np = pd = None
+
+# bs4 gives <script>/<style>/<template>/<rt>/<rp> their own string classes, which get_text skips
+_SPECIAL_STRING_CONTAINERS = frozenset({"script", "style", "template", "rt", "rp"})
+
+
+# -------------------- Numbers --------------------
+
+_COUNT_SUFFIXES = {
+    **dict.fromkeys(["k", "к", "тыс", "тысяч", "тысяча", "тысячи", "thousand"], 1_000),
+    **dict.fromkeys(["m", "м", "млн", "миллион", "миллиона", "миллионов", "million"], 1_000_000),
+    **dict.fromkeys(["b", "млрд", "миллиард", "миллиарда", "миллиардов", "billion"], 1_000_000_000),
+}
+# digit groups ("1 234 567", "1,234", thin/no-break spaces), an optional decimal part and the
+# word that follows. Only words in _COUNT_SUFFIXES scale the count, so "1200 members" stays 1200
+_NUMBER_TEMPLATE = r"({g}\d{{1,3}}(?:[\s.,]\d{{3}})+(?!\d)|\d+)(?:[.,]({g}\d+))?(?:\s*({g}[a-zа-яё]+))?"
+_COUNT_RE = re.compile(_NUMBER_TEMPLATE.format(g=""))
+_SUBS_RE = re.compile(
+    r"(?<![\d.,])(" + _NUMBER_TEMPLATE.format(g="?:") + r")\s*(?:подписчик|subs|subscribers)"
+)
+_GROUP_SEP_RE = re.compile(r"[\s.,]")
+_SINGLE_GROUP_RE = re.compile(r"\d{1,3}[.,]\d{3}")
+_MAX_FRACTION_DIGITS = 6
+MAX_COUNT = 10 ** 15
+
+
+def _count_from_parts(whole: str, frac: Optional[str], suffix: Optional[str]) -> Optional[int]:
+    """Exact integer value of a matched count. Shared rules for `to_int` and `parse_counts`:
+    separators in the whole part are grouping, except that "12,500k" is 12.5k; with a suffix
+    the fraction rounds half up, without one it is dropped."""
+    mult = _COUNT_SUFFIXES.get(suffix, 1) if suffix else 1
+    if mult > 1 and not frac and _SINGLE_GROUP_RE.fullmatch(whole):
+        whole, frac = whole[:-4], whole[-3:]
+    digits = _GROUP_SEP_RE.sub("", whole)
+    if len(digits) > 15:
+        return None
+    value = int(digits) * mult
+    if frac and mult > 1:
+        frac = frac[:_MAX_FRACTION_DIGITS]
+        scale = 10 ** len(frac)
+        value += (int(frac) * mult * 2 + scale) // (2 * scale)
+    return value if value <= MAX_COUNT else None
+
+
+def to_int(value: str) -> Optional[int]:
+    """First count in `value` ("12,5 тыс", "1.2M", "3 400 000"), or None."""
+    if value is None:
+        return None
+    m = _COUNT_RE.search(str(value).lower())
+    if not m:
+        return None
+    return _count_from_parts(*m.groups())
+
+
+def to_float(value: str) -> Optional[float]:
+    if value is None:
+        return None
+    s = str(value).strip().replace(",", ".")
+    try:
+        return float(s)
+    except Exception:
+        return None
+
+
+def _column_text(values) -> List[str]:
+    return ["" if v is None or (isinstance(v, float) and v != v) else str(v) for v in values]
+
+
+def parse_counts(values) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Batch `to_int` over a list/array/Series of raw strings.
+
+    Returns `(counts, valid)`: an int64 array (0 where invalid) and a boolean mask, agreeing
+    exactly with `to_int`. Bare ASCII digit strings (the bulk of an imported column) are
+    recognised from the array's code points and converted by NumPy in one step. Only formatted
+    values ("12,5 тыс", "1 234") go through the precompiled pattern.
+    """
+    items = _column_text(values)
+    n = len(items)
+    counts = np.zeros(n, dtype="int64")
+    valid = np.zeros(n, dtype=bool)
+    if not n:
+        return counts, valid
+    # 16 code points per value: a bare count has at most 15 digits, so the 16th must be padding
+    text = np.array(items, dtype="<U16")
+    codes = text.view(np.uint32).reshape(n, 16)
+    is_digit = (codes >= 48) & (codes <= 57)
+    plain = is_digit[:, 0] & (is_digit | (codes == 0)).all(axis=1) & (codes[:, 15] == 0)
+    counts[plain] = text[plain].astype("int64")
+    valid[plain] = True
+    for i in np.flatnonzero(~plain).tolist():
+        value = to_int(items[i])
+        if value is not None:
+            counts[i] = value
+            valid[i] = True
+    return counts, valid
+
+
+def parse_floats(values) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Batch `to_float`: `(floats, valid)` with NaN where the value does not parse."""
+    text = pd.Series(_column_text(values), dtype="object").str.strip().str.replace(",", ".", regex=False)
+    floats = pd.to_numeric(text.where(text != "", None), errors="coerce").to_numpy(dtype="float64")
+    return floats, ~np.isnan(floats)
+
+
+def absolutize(src: Optional[str], base: str) -> Optional[str]:
+    if not src:
+        return None
+    if src.startswith("//"):
+        return (urlparse(base).scheme or "https") + ":" + src
+    if src.startswith("http"):
+        return src
+    try:
+        return urljoin(base, src)
+    except Exception:
+        return src
+
+
+_MENTION_RE = re.compile(r"@([A-Za-z0-9_]{4,})")
+
+# -------------------- Selectors --------------------
+
+_SIMPLE_SELECTOR_RE = re.compile(r'([a-z][a-z0-9]*)?((?:\.[A-Za-z0-9_-]+)*)((?:\[[a-z-]+\*="[^"]*"\])*)')
+_ATTR_CONTAINS_RE = re.compile(r'\[([a-z-]+)\*="([^"]*)"\]')
+
+
+def _attr_text(get, attr: str, classes) -> Optional[str]:
+    if attr == "class":
+        return " ".join(classes)
+    value = get(attr)
+    if isinstance(value, (list, tuple)):
+        return " ".join(value)
+    return value
+
+
+def _xpath_condition(tag: Optional[str], classes: Tuple[str, ...], attrs: List[Tuple[str, str]]) -> str:
+    parts = [f"self::{tag}"] if tag else []
+    parts += [f'contains(concat(" ", normalize-space(@class), " "), " {c} ")' for c in classes]
+    parts += [f'contains(@{attr}, "{text}")' for attr, text in attrs]
+    return " and ".join(parts)
+
+
+class Selector:
+    """A comma-separated selector list, compiled once and then matched tag by tag while walking a page.
+
+    Covers the CSS subset the catalog sites need: `tag`, `.class`, `[attr*="text"]` and compounds
+    such as `a[href*="t.me"]`. `matches` takes a tag name, its class tokens and an attribute getter,
+    so bs4 tags and lxml elements share one implementation; bare tags and bare classes are set
+    lookups. `xpath` is the same test as an XPath predicate for the streaming parser. A selector
+    that only looks at tag names and classes is `static`, so its result can be reused across
+    tags with the same name and classes.
+    """
+
+    def __init__(self, css: str):
+        self.css = css
+        self._names = set()
+        self._classes = set()
+        self._compound: List[Tuple[Optional[str], frozenset, List[Tuple[str, str]]]] = []
+        conditions = []
+        for part in css.split(","):
+            part = part.strip()
+            m = _SIMPLE_SELECTOR_RE.fullmatch(part)
+            if not part or not m:
+                raise ValueError(f"Unsupported selector: {part!r}")
+            tag = m.group(1)
+            classes = tuple(c for c in m.group(2).split(".") if c)
+            attrs = _ATTR_CONTAINS_RE.findall(m.group(3))
+            if tag and not classes and not attrs:
+                self._names.add(tag)
+            elif len(classes) == 1 and not tag and not attrs:
+                self._classes.add(classes[0])
+            else:
+                self._compound.append((tag, frozenset(classes), attrs))
+            conditions.append(_xpath_condition(tag, classes, attrs))
+        self.xpath = " or ".join(f"({c})" for c in conditions)
+        self.static = all(attr == "class" for _, _, attrs in self._compound for attr, _ in attrs)
+
+    def matches(self, name: str, classes, get) -> bool:
+        if name in self._names:
+            return True
+        if self._classes and not self._classes.isdisjoint(classes):
+            return True
+        for tag, required, attrs in self._compound:
+            if tag and tag != name:
+                continue
+            if required and not required.issubset(classes):
+                continue
+            if all(text and text in (_attr_text(get, attr, classes) or "") for attr, text in attrs):
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        return f"Selector({self.css!r})"
+
+
+# -------------------- Source parsers --------------------
+
+TG_LINKS = 'a[href*="t.me"], a[href*="telegram.me"]'
+DEFAULT_TITLE = ('.title', 'h3', 'h2', 'h4', 'a', '.name')
+DEFAULT_CATEGORY = '.tag, .badge, .label, .category, [class*="tag"], [class*="badge"], [class*="category"]'
+DEFAULT_AVATAR_ATTRS = ('src', 'data-src', 'data-original', 'data-lazy')
+
+
+class SourceParser:
+    """One catalog site's listing layout and the field mapping for its cards.
+
+    With `cards`, every matching container is a candidate card keyed by the first `link` anchor
+    inside it (or its first @mention); the deepest container wins its link. Without `cards`, the
+    card for each `link` anchor is its ancestor `card_depth` levels up, and `profile_links` whose
+    href matches `profile_link_re` add cards named by the captured username. Field selectors are
+    tried in order: the first `title` selector whose first match has text names the card, the
+    first `avatar` element's first present `avatar_attrs` is its picture, and the first
+    `category` element with text is its category.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cards: Optional[str] = None,
+        link: str = TG_LINKS,
+        title: Tuple[str, ...] = DEFAULT_TITLE,
+        avatar: str = 'img',
+        avatar_attrs: Tuple[str, ...] = DEFAULT_AVATAR_ATTRS,
+        category: str = DEFAULT_CATEGORY,
+        subscribers_re: "re.Pattern[str]" = _SUBS_RE,
+        card_depth: int = 3,
+        profile_links: Optional[str] = None,
+        profile_link_re: Optional[str] = None,
+    ):
+        self.name = name
+        self.cards = Selector(cards) if cards else None
+        self.link = Selector(link)
+        self.title = tuple(Selector(css) for css in title)
+        self.avatar = Selector(avatar)
+        self.avatar_attrs = tuple(avatar_attrs)
+        self.category = Selector(category)
+        self.subscribers_re = subscribers_re
+        self.card_depth = card_depth
+        self.profile_links = Selector(profile_links) if profile_links else None
+        self.profile_link_re = re.compile(profile_link_re) if profile_link_re else None
+        self._xpaths: Optional[Dict[str, Any]] = None
+
+    @property
+    def streamable(self) -> bool:
+        return self.cards is not None
+
+    def selectors(self) -> List[Tuple[str, Selector]]:
+        """Everything CardIndex marks, keyed the way CardIndex.extract looks it up."""
+        out = [("link", self.link), ("avatar", self.avatar), ("category", self.category)]
+        out += [(f"title{i}", sel) for i, sel in enumerate(self.title)]
+        if self.cards is not None:
+            out.append(("card", self.cards))
+        if self.profile_links is not None:
+            out.append(("profile", self.profile_links))
+        return out
+
+    def xpaths(self) -> Dict[str, Any]:
+        """Compiled XPath lookups for the field mapping, used on lxml elements by the streaming parser."""
+        if self._xpaths is None:
+            first = lambda sel: etree.XPath(f"(.//*[{sel.xpath}])[1]")  # noqa: E731
+            self._xpaths = {
+                "link": first(self.link),
+                "avatar": first(self.avatar),
+                "title": [first(sel) for sel in self.title],
+                "category": etree.XPath(f".//*[{self.category.xpath}]"),
+            }
+        return self._xpaths
+
+    def parse(self, html: str, base_url: str) -> List[Dict[str, Any]]:
+        soup = BeautifulSoup(html, "lxml")
+        if self.cards is not None:
+            return extract_cards(soup, base_url, self)
+        return extract_anchor_cards(soup, base_url, self)
+
+    def __repr__(self) -> str:
+        return f"SourceParser({self.name!r})"
+
+
+PARSERS: Dict[str, SourceParser] = {}
+
+
+def register_parser(parser: SourceParser) -> SourceParser:
+    PARSERS[parser.name] = parser
+    return parser
+
+
+register_parser(SourceParser("telemetr", cards='article, .card, .channel, .list-item, .ch-list, .list, .row, .col, div'))
+register_parser(SourceParser("tgstat", profile_links='a[href*="/channel/"]', profile_link_re=r"/@([A-Za-z0-9_]{4,})"))
+register_parser(SourceParser("telega", cards='article, .card, .channel, .list-item, .card-body, .row, div'))
+# catalogs without a dedicated parser: cards are list items, table rows or the usual card classes
+register_parser(SourceParser("generic", cards='article, li, tr, .card, .channel, .item, div'))
+
+# -------------------- Card extraction --------------------
+
+
+class CardIndex:
+    """One pre-order pass over a parsed page that answers a SourceParser's queries in O(log n).
+
+    Every tag gets a document-order position and the span of positions its subtree covers, and
+    every stripped text node gets an index. Tags matching the parser's selectors are recorded
+    by position, so "first anchor / avatar / title below this tag", "first @mention in this tag's
+    text" and the tag's `get_text` are lookups rather than subtree walks. Scoring every candidate
+    container on a page therefore no longer rescans its descendants.
+    """
+
+    def __init__(self, root, parser: SourceParser):
+        self.parser = parser
+        self.tags: List[Any] = []
+        self.strings: List[str] = []
+        self._span: Dict[int, Tuple[int, int, int, int]] = {}
+        self._text: Dict[Tuple[int, str], str] = {}
+        selectors = parser.selectors()
+        self._static = [(key, sel) for key, sel in selectors if sel.static]
+        self._dynamic = [(key, sel) for key, sel in selectors if not sel.static]
+        self._static_marks: Dict[Tuple[str, Tuple[str, ...]], List[str]] = {}
+        self.marks: Dict[str, List[int]] = {key: [] for key, _ in selectors}
+        self._mention_at: List[int] = []
+        self._build(root)
+
+    def _build(self, root) -> None:
+        string_types = (NavigableString, CData)
+        stack = [(root, iter(root.contents), len(self.tags), len(self.strings))]
+        self._enter(root)
+        while stack:
+            node, children, tag_start, str_start = stack[-1]
+            for child in children:
+                if isinstance(child, Tag):
+                    stack.append((child, iter(child.contents), len(self.tags), len(self.strings)))
+                    self._enter(child)
+                    break
+                if type(child) in string_types:
+                    text = child.strip()
+                    if text:
+                        if _MENTION_RE.search(text):
+                            self._mention_at.append(len(self.strings))
+                        self.strings.append(text)
+            else:
+                stack.pop()
+                self._span[id(node)] = (tag_start, len(self.tags), str_start, len(self.strings))
+
+    def _enter(self, tag) -> None:
+        pos = len(self.tags)
+        self.tags.append(tag)
+        name = tag.name
+        classes = tag.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        signature = (name, tuple(classes))
+        keys = self._static_marks.get(signature)
+        if keys is None:
+            keys = self._static_marks[signature] = [key for key, sel in self._static if sel.matches(name, classes, None)]
+        for key in keys:
+            self.marks[key].append(pos)
+        for key, sel in self._dynamic:
+            if sel.matches(name, classes, tag.get):
+                self.marks[key].append(pos)
+
+    def span(self, tag) -> Tuple[int, int, int, int]:
+        return self._span[id(tag)]
+
+    @staticmethod
+    def _first(marks: List[int], lo: int, hi: int) -> Optional[int]:
+        i = bisect_left(marks, lo)
+        if i < len(marks) and marks[i] < hi:
+            return marks[i]
+        return None
+
+    def first_below(self, tag, key: str):
+        """First descendant (not `tag` itself) marked `key`, like `tag.select_one(...)`."""
+        start, end, _, _ = self.span(tag)
+        pos = self._first(self.marks[key], start + 1, end)
+        return None if pos is None else self.tags[pos]
+
+    def all_below(self, tag, key: str):
+        start, end, _, _ = self.span(tag)
+        marks = self.marks[key]
+        i = bisect_left(marks, start + 1)
+        while i < len(marks) and marks[i] < end:
+            yield self.tags[marks[i]]
+            i += 1
+
+    def text(self, tag, separator: str = " ") -> str:
+        """`tag.get_text(separator, strip=True)`, cached per tag."""
+        key = (id(tag), separator)
+        cached = self._text.get(key)
+        if cached is None:
+            if tag.name in _SPECIAL_STRING_CONTAINERS:
+                cached = tag.get_text(separator, strip=True)
+            else:
+                _, _, lo, hi = self.span(tag)
+                cached = separator.join(self.strings[lo:hi])
+            self._text[key] = cached
+        return cached
+
+    def mention(self, tag) -> Optional[str]:
+        """First @username in the tag's text. Strings are joined with a space, so no match spans two of them."""
+        if tag.name in _SPECIAL_STRING_CONTAINERS:
+            m = _MENTION_RE.search(self.text(tag))
+            return m.group(1) if m else None
+        _, _, lo, hi = self.span(tag)
+        pos = self._first(self._mention_at, lo, hi)
+        if pos is None:
+            return None
+        return _MENTION_RE.search(self.strings[pos]).group(1)
+
+    def card_link(self, card) -> Optional[str]:
+        a = self.first_below(card, "link")
+        if a is not None and a.get("href"):
+            return a.get("href").strip()
+        username = self.mention(card)
+        return f"https://t.me/{username}" if username else None
+
+    def extract(self, card, base_url: str, link: Optional[str] = None) -> Dict[str, Any]:
+        parser = self.parser
+        link = link or self.card_link(card)
+        if not link:
+            return {}
+        name = None
+        for i in range(len(parser.title)):
+            el = self.first_below(card, f"title{i}")
+            if el is not None and self.text(el, ""):
+                name = self.text(el, "")
+                break
+        if not name:
+            name = link.rsplit('/', 1)[-1]
+        img = self.first_below(card, "avatar")
+        avatar = None
+        if img is not None:
+            avatar = next((img.get(attr) for attr in parser.avatar_attrs if img.get(attr)), None)
+        avatar = absolutize(avatar, base_url)
+        m2 = parser.subscribers_re.search(self.text(card).lower())
+        subs = to_int(m2.group(1)) if m2 else 0
+        cat = None
+        for el in self.all_below(card, "category"):
+            t = self.text(el, "")
+            if t:
+                cat = t
+                break
+        return {"name": name, "link": link, "avatar_url": avatar, "subscribers": subs, "category": cat}
+
+
+def extract_cards(soup, base_url: str, parser: SourceParser) -> List[Dict[str, Any]]:
+    """Cards keyed by channel link, in first-seen order, each built from the deepest container for it.
+
+    Equivalent to extracting every container and deduplicating by link (later, i.e. nested,
+    containers win), but only the winning container per link is materialised.
+    """
+    index = CardIndex(soup, parser)
+    winners: Dict[str, Any] = {}
+    for pos in index.marks["card"]:
+        if pos == 0:
+            continue
+        tag = index.tags[pos]
+        link = index.card_link(tag)
+        if link:
+            winners[link] = tag
+    return [index.extract(card, base_url, link) for link, card in winners.items()]
+
+
+def _card_root(a, depth: int):
+    card = a
+    for _ in range(depth):
+        if card.parent:
+            card = card.parent
+    return card
+
+
+def extract_anchor_cards(soup, base_url: str, parser: SourceParser) -> List[Dict[str, Any]]:
+    """Cards hung off link anchors (see SourceParser); the last card per link wins, in first-seen order."""
+    index = CardIndex(soup, parser)
+    extracted: Dict[int, Dict[str, Any]] = {}
+
+    def extract(card) -> Dict[str, Any]:
+        # several anchors usually share one card; extract it once
+        if id(card) not in extracted:
+            extracted[id(card)] = index.extract(card, base_url)
+        return dict(extracted[id(card)])
+
+    results = []
+    for pos in index.marks["link"]:
+        data = extract(_card_root(index.tags[pos], parser.card_depth))
+        if data:
+            results.append(data)
+    for pos in index.marks.get("profile", ()):
+        a = index.tags[pos]
+        m = parser.profile_link_re.search(a.get('href', ''))
+        if not m:
+            continue
+        username = m.group(1)
+        data = extract(_card_root(a, parser.card_depth))
+        if not data:
+            data = {"name": username, "link": f"https://t.me/{username}", "avatar_url": None, "subscribers": 0, "category": None}
+        else:
+            data['link'] = f"https://t.me/{username}"
+        results.append(data)
+    uniq = {}
+    for it in results:
+        uniq[it['link']] = it
+    return list(uniq.values())
+
+
+# -------------------- Streaming extraction --------------------
+
+
+def _lxml_strings(el, out: List[str]) -> List[str]:
+    """Stripped text nodes of `el` in document order, skipping what bs4's get_text skips."""
+    if isinstance(el.tag, str) and el.tag not in _SPECIAL_STRING_CONTAINERS:
+        text = (el.text or "").strip()
+        if text:
+            out.append(text)
+        for child in el:
+            _lxml_strings(child, out)
+            tail = (child.tail or "").strip()
+            if tail:
+                out.append(tail)
+    return out
+
+
+def _lxml_first(xpath, el):
+    found = xpath(el)
+    return found[0] if found else None
+
+
+def _lxml_matches(selector: Selector, el) -> bool:
+    return selector.matches(el.tag, (el.get("class") or "").split(), el.get)
+
+
+def _lxml_card_link(el, xpaths: Dict[str, Any]) -> Optional[str]:
+    a = _lxml_first(xpaths["link"], el)
+    if a is not None and a.get("href"):
+        return a.get("href").strip()
+    for text in _lxml_strings(el, []):
+        m = _MENTION_RE.search(text)
+        if m:
+            return f"https://t.me/{m.group(1)}"
+    return None
+
+
+def _lxml_extract(el, base_url: str, link: str, parser: SourceParser) -> Dict[str, Any]:
+    xpaths = parser.xpaths()
+    name = None
+    for xpath in xpaths["title"]:
+        found = _lxml_first(xpath, el)
+        if found is not None:
+            name = "".join(_lxml_strings(found, []))
+            if name:
+                break
+    if not name:
+        name = link.rsplit('/', 1)[-1]
+    img = _lxml_first(xpaths["avatar"], el)
+    avatar = None
+    if img is not None:
+        avatar = next((img.get(attr) for attr in parser.avatar_attrs if img.get(attr)), None)
+    avatar = absolutize(avatar, base_url)
+    m2 = parser.subscribers_re.search(" ".join(_lxml_strings(el, [])).lower())
+    subs = to_int(m2.group(1)) if m2 else 0
+    cat = None
+    for found in xpaths["category"](el):
+        t = "".join(_lxml_strings(found, []))
+        if t:
+            cat = t
+            break
+    return {"name": name, "link": link, "avatar_url": avatar, "subscribers": subs, "category": cat}
+
+
+def _detach(el) -> None:
+    """Remove `el` from the tree, keeping its tail text with the parent."""
+    parent = el.getparent()
+    if parent is None:
+        return
+    if el.tail:
+        prev = el.getprevious()
+        if prev is not None:
+            prev.tail = (prev.tail or "") + el.tail
+        else:
+            parent.text = (parent.text or "") + el.tail
+    parent.remove(el)
+
+
+class StreamingCardParser:
+    """Incremental card extraction for the container-based sources (those with `cards` selectors).
+
+    Feed raw bytes as they arrive. A container yields its card as soon as its end tag is
+    parsed, so cards come out in completion order. As in the buffered parsers, a later container
+    with the same link replaces the earlier card in place. Finished containers and anything
+    outside an open container are dropped from the tree, so memory follows the open nesting
+    depth rather than the page size. The one behavioural difference is that a wrapper no longer
+    sees the content of cards finished inside it. Once `limit` links are collected, `done` turns
+    true and further input is ignored, so the caller can stop downloading.
+    """
+
+    def __init__(self, source: str, base_url: str, limit: Optional[int] = None, encoding: Optional[str] = None):
+        if etree is None:
+            raise RuntimeError("lxml is not installed")
+        self.parser = PARSERS[source]
+        if not self.parser.streamable:
+            raise ValueError(f"{source} cards are not container-based and cannot be streamed")
+        self._xpaths = self.parser.xpaths()
+        self.base_url = base_url
+        self.limit = limit
+        self.cards: List[Dict[str, Any]] = []
+        self._owners: Dict[str, Tuple[int, int]] = {}  # link -> (card index, start order of its container)
+        self._started: Dict[Any, int] = {}
+        self._seq = 0
+        self._pull = etree.HTMLPullParser(events=("start", "end"), encoding=encoding)
+
+    @property
+    def done(self) -> bool:
+        return self.limit is not None and len(self.cards) >= self.limit
+
+    def feed(self, data: bytes) -> None:
+        if not self.done:
+            self._pull.feed(data)
+            self._drain()
+
+    def close(self) -> None:
+        if self.done:
+            return
+        try:
+            self._pull.close()
+        except etree.XMLSyntaxError:
+            # nothing parseable was fed (empty body); keep whatever was already extracted
+            pass
+        self._drain()
+
+    def _release(self, el) -> None:
+        """Drop a finished card's content. A link anchor acting as the card keeps an empty stub,
+        since it is still the first link of the containers around it."""
+        if _lxml_matches(self.parser.link, el):
+            for child in list(el):
+                el.remove(child)
+            el.text = None
+        else:
+            _detach(el)
+
+    def _drain(self) -> None:
+        for event, el in self._pull.read_events():
+            if self.done:
+                continue
+            if event == "start":
+                if _lxml_matches(self.parser.cards, el):
+                    self._seq += 1
+                    self._started[el] = self._seq
+                continue
+            seq = self._started.pop(el, None)
+            if seq is not None:
+                link = _lxml_card_link(el, self._xpaths)
+                if link:
+                    owner = self._owners.get(link)
+                    if owner is None:
+                        self._owners[link] = (len(self.cards), seq)
+                        self.cards.append(_lxml_extract(el, self.base_url, link, self.parser))
+                    elif seq > owner[1]:
+                        # a later sibling, not a wrapper of the current owner
+                        self._owners[link] = (owner[0], seq)
+                        self.cards[owner[0]] = _lxml_extract(el, self.base_url, link, self.parser)
+                    self._release(el)
+                    continue
+            if not self._started and el.tag not in ("html", "body"):
+                _detach(el)
+
+
+def parse_listing_stream(source: str, chunks, base_url: str, limit: Optional[int] = None, encoding: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Run StreamingCardParser over an iterable of byte chunks, stopping once `limit` cards are found."""
+    parser = StreamingCardParser(source, base_url, limit, encoding)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.cards
+
+
+def parse_listing(source: str, html: str, base_url: str) -> List[Dict[str, Any]]:
+    """Entry point for pool workers: parse one listing page with the registered `source` parser."""
+    if BeautifulSoup is None:
+        return []
+    return PARSERS[source].parse(html, base_url)
+
+
+def limit_worker_memory(limit_mb: int) -> None:
+    """Cap a parser worker's address space so a runaway page raises MemoryError."""
+    if not limit_mb:
+        return
+    try:
+        import resource
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception:
+        pass
+
+
+def parser_worker(conn, limit_mb: int, max_tasks: int) -> None:
+    """Parser worker process: run `(fn, args)` requests from `conn` until `max_tasks` are done
+    (0 for no limit) or the pipe closes.
+
+    Sends ("ready", None) once started, then replies ("ok", result) or ("error", exception).
+    A MemoryError replies ("oom", None) and ends the process, since its heap can't be trusted
+    afterwards.
+    """
+    limit_worker_memory(limit_mb)
+    conn.send(("ready", None))
+    done = 0
+    while not max_tasks or done < max_tasks:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        fn, args = request
+        try:
+            reply = ("ok", fn(*args))
+        except MemoryError:
+            conn.send(("oom", None))
+            return
+        except Exception as e:
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # unpicklable result or exception
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+        done += 1
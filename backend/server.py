@@ -1,25 +1,43 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends, UploadFile, File
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
+import asyncio
+import functools
+import contextlib
+import csv
+import hashlib
+import io
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Literal, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, ValidationError
+from typing import List, Optional, Literal, Dict, Any, Tuple, Callable, Awaitable, Iterator, AsyncIterator, Union, get_args, get_origin
 import uuid
+import json
+import base64
+import time
 from datetime import datetime, timezone, timedelta
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 import re
-import requests
-from urllib.parse import urljoin, urlparse
+import random
+import httpx
+from urllib.parse import urlparse, parse_qsl, urlencode
 
-try:
-    from bs4 import BeautifulSoup
-except Exception:
-    BeautifulSoup = None
+import scraping
+
+try:  # optional: only needed for Parquet exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -31,34 +49,37 @@ db = client[os.environ['DB_NAME']]
 app = FastAPI()
 api = APIRouter(prefix="/api")
 
-# Seed test users on startup for QA
-@app.on_event("startup")
-async def seed_test_users():
-    try:
-        now = utcnow_iso()
-        async def ensure_user(email: str, password: str, role: str) -> str:
-            u = await db.users.find_one({"email": email})
-            if u:
-                # ensure desired role if differs
-                if u.get("role") != role:
-                    await db.users.update_one({"id": u.get("id")}, {"$set": {"role": role, "updated_at": now}})
-                return u.get("id")
-            uid = str(uuid.uuid4())
-            await db.users.insert_one({
-                "id": uid,
-                "email": email,
-                "password_hash": pwd_ctx.hash(password),
-                "role": role,
-                "created_at": now,
-                "updated_at": now,
-            })
-            return uid
-        admin_id = await ensure_user("admin@test.com", "Admin123", "admin")
-        _u1 = await ensure_user("user1@test.com", "Test1234", "owner")
-        _u2 = await ensure_user("user2@test.com", "Test5678", "advertiser")
-        _u3 = await ensure_user("user3@test.com", "Test91011", "advertiser")
-    except Exception as e:
-        logging.getLogger(__name__).warning(f"Seed test users skipped: {e}")
+# QA users, created by `python manage.py seed` (not on startup)
+async def seed_test_users() -> Dict[str, str]:
+    now = utcnow_iso()
+    async def ensure_user(email: str, password: str, role: str) -> str:
+        u = await db.users.find_one({"email": email})
+        if u:
+            # ensure desired role if differs
+            if u.get("role") != role:
+                await db.users.update_one({"id": u.get("id")}, {"$set": {"role": role, "updated_at": now}})
+            return u.get("id")
+        uid = str(uuid.uuid4())
+        await db.users.insert_one({
+            "id": uid,
+            "email": email,
+            "password_hash": await password_hasher.hash(password),
+            "role": role,
+            "created_at": now,
+            "updated_at": now,
+        })
+        return uid
+    users = {
+        email: await ensure_user(email, password, role)
+        for email, password, role in (
+            ("admin@test.com", "Admin123", "admin"),
+            ("user1@test.com", "Test1234", "owner"),
+            ("user2@test.com", "Test5678", "advertiser"),
+            ("user3@test.com", "Test91011", "advertiser"),
+        )
+    }
+    notify_write("users")
+    return users
 
 pwd_ctx = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 JWT_SECRET = os.environ.get("JWT_SECRET", "dev_secret_change_me")
@@ -67,41 +88,60 @@ JWT_EXPIRE_MIN = int(os.environ.get("JWT_EXPIRES_MINUTES", "10080"))
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
-def utcnow_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+class PasswordHasher:
+    """Runs pwd_ctx hash/verify on a bounded thread pool so pbkdf2 never blocks the event loop.
 
+    hashlib's pbkdf2 releases the GIL, so threads hash in parallel. At most `workers`
+    calls run at once; when more than `max_queue` are waiting, new calls fail fast with 503.
+    """
 
-def to_int(value: str) -> Optional[int]:
-    if value is None:
-        return None
-    s = str(value).strip().lower()
-    if s == "" or s == "none":
-        return None
-    mult = 1
-    if any(k in s for k in ["m", "млн", "million", "миллион"]):
-        mult = 1_000_000
-    elif any(k in s for k in ["k", "тыс", "thousand"]):
-        mult = 1_000
-    num = re.findall(r"[\d]+(?:[\.,]\d+)?", s)
-    if not num:
-        return None
-    n = num[0].replace(",", ".")
-    try:
-        if "." in n:
-            return int(float(n) * mult)
-        return int(int(n) * mult)
-    except Exception:
-        return None
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd")
+        self._slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.running = 0
+        self.max_waiting_seen = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(503, detail="Too many concurrent sign-ins, retry shortly")
+        self.waiting += 1
+        self.max_waiting_seen = max(self.max_waiting_seen, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
 
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_ctx.hash, password)
 
-def to_float(value: str) -> Optional[float]:
-    if value is None:
-        return None
-    s = str(value).strip().replace(",", ".")
-    try:
-        return float(s)
-    except Exception:
-        return None
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(pwd_ctx.verify, password, password_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "running": self.running, "queue_depth": self.waiting, "max_queue_depth": self.max_waiting_seen, "completed": self.completed, "rejected": self.rejected}
+
+
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "64")),
+)
+
+
+def utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
 
 
 def prepare_for_mongo(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -112,11 +152,122 @@ def prepare_for_mongo(data: Dict[str, Any]) -> Dict[str, Any]:
     return data
 
 
+_SEARCH_SPLIT_RE = re.compile(r"[\W_]+")
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """Lowercase and fold ё→е so prefix lookups match however the name was typed."""
+    return (value or "").lower().replace("ё", "е")
+
+
+def search_terms(value: Optional[str]) -> List[str]:
+    terms: List[str] = []
+    for tok in _SEARCH_SPLIT_RE.split(normalize_search_text(value)):
+        if tok and tok not in terms:
+            terms.append(tok)
+    return terms
+
+
+# channel fields whose words go into `search_terms`, the same fields the text index covers
+SEARCH_TEXT_FIELDS = ("name", "short_description", "seo_description")
+
+
+def channel_search_terms(data: Dict[str, Any]) -> List[str]:
+    return search_terms(" ".join(data.get(f) or "" for f in SEARCH_TEXT_FIELDS))
+
+
+_TG_HOSTS = {"t.me", "telegram.me", "telegram.dog"}
+_TG_USERNAME_RE = re.compile(r"^[a-z0-9_]{3,64}$")
+# t.me paths that are not usernames
+_TG_RESERVED_PATHS = {"joinchat", "addstickers", "addemoji", "addlist", "share", "proxy", "socks", "c", "iv", "login", "setlanguage", "invoice", "boost"}
+
+
+def normalize_tg_username(raw: Optional[str]) -> Optional[str]:
+    """Canonical lowercase username for any spelling of a public channel reference.
+
+    `@x`, `x`, `t.me/x`, `https://t.me/x/`, `http://telegram.me/x?start=1` and `t.me/s/x`
+    all map to `x`. Invite links and anything else without a username give None.
+    """
+    value = (raw or "").strip().lower()
+    if not value:
+        return None
+    if value.startswith("@"):
+        value = value[1:]
+    elif "/" in value or "." in value:
+        parsed = urlparse(value if "://" in value else f"https://{value}")
+        host = (parsed.hostname or "").removeprefix("www.")
+        if host not in _TG_HOSTS:
+            return None
+        parts = [p for p in parsed.path.split("/") if p]
+        if parts and parts[0] == "s":
+            parts = parts[1:]
+        if not parts or parts[0] in _TG_RESERVED_PATHS:
+            return None
+        value = parts[0]
+    return value if _TG_USERNAME_RE.match(value) else None
+
+
+def channel_derived_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields computed from other channel fields; only those whose sources are present in `data`."""
+    derived: Dict[str, Any] = {}
+    if data.get("name") is not None and all(f in data for f in SEARCH_TEXT_FIELDS):
+        derived["search_terms"] = channel_search_terms(data)
+    if "link" in data or "username" in data:
+        norm = normalize_tg_username(data.get("link")) or normalize_tg_username(data.get("username"))
+        if norm or "link" in data:
+            derived["username_norm"] = norm
+    if all(f in data for f in GROWTH_SCORE_FIELDS):
+        derived["growth_score"] = compute_growth_score(data, datetime.now(timezone.utc))
+    return derived
+
+
+def prepare_channel_for_mongo(data: Dict[str, Any]) -> Dict[str, Any]:
+    data = prepare_for_mongo(data)
+    data.update(channel_derived_fields(data))
+    return data
+
+
 def parse_from_mongo(item: Dict[str, Any]) -> Dict[str, Any]:
     item = dict(item)
     item.pop("_id", None)
     return item
 
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise HTTPException(400, detail="Invalid cursor")
+    if not isinstance(data, dict):
+        raise HTTPException(400, detail="Invalid cursor")
+    return data
+
+
+def seek_filter(sort_spec: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """Build a range filter matching documents strictly after `values` in `sort_spec` order.
+
+    The last key of the sort spec must be a unique tiebreaker (e.g. `id`). Nulls sort
+    before any value in Mongo, so they come last on descending keys and first on ascending ones.
+    """
+    clauses: List[Dict[str, Any]] = []
+    for i, (field, direction) in enumerate(sort_spec):
+        prefix = {f: v for (f, _), v in zip(sort_spec[:i], values[:i])}
+        value = values[i]
+        if value is None:
+            if direction == 1:
+                clauses.append({**prefix, field: {"$ne": None}})
+            continue
+        clauses.append({**prefix, field: {"$gt" if direction == 1 else "$lt": value}})
+        if direction == -1 and i < len(sort_spec) - 1:
+            clauses.append({**prefix, field: None})
+    return {"$or": clauses} if clauses else {"_id": {"$exists": False}}
+
 # -------------------- Models --------------------
 
 class StatusCheck(BaseModel):
@@ -176,7 +327,6 @@ class ChannelUpdate(BaseModel):
     seo_description: Optional[str] = None
     status: Optional[ChannelStatus] = None
     is_featured: Optional[bool] = None
-    growth_score: Optional[float] = None
     link_status: Optional[Literal["alive", "dead"]] = None
 
 class ChannelResponse(ChannelBase):
@@ -186,10 +336,12 @@ class ChannelResponse(ChannelBase):
 
 class PaginatedChannels(BaseModel):
     items: List[ChannelResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
     has_more: bool
+    next_cursor: Optional[str] = None
+    total_exact: Optional[bool] = None
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -370,116 +522,603 @@ async def ensure_unique_slug(base_slug: str, creator_id: Optional[str] = None) -
         slug = f"{base_slug}-{counter}"
         counter += 1
 
+def _metric_values(field: str, keep: Dict[str, Any]) -> Dict[str, Any]:
+    """`[field of each linked channel where keep, else null]`; array $min/$max/$avg skip the nulls."""
+    return {"$map": {"input": "$chs", "as": "c", "in": {"$cond": [keep, f"$$c.{field}", None]}}}
+
+
+def _subscriber_weighted(field: str) -> Dict[str, Any]:
+    """Subscriber-weighted mean of a positive channel field over the linked channels, or null."""
+    rated = {"$filter": {"input": "$chs", "as": "c", "cond": {"$gt": [f"$$c.{field}", 0]}}}
+    subs = {"$ifNull": ["$$c.subscribers", 0]}
+    return {"$let": {
+        "vars": {
+            "w": {"$sum": {"$map": {"input": rated, "as": "c", "in": {"$multiply": [f"$$c.{field}", subs]}}}},
+            "s": {"$sum": {"$map": {"input": rated, "as": "c", "in": subs}}},
+        },
+        "in": {"$cond": [{"$gt": ["$$s", 0]}, {"$divide": ["$$w", "$$s"]}, None]},
+    }}
+
+
+def creator_metrics_pipeline(creator_ids: Optional[List[str]], now: str) -> List[Dict[str, Any]]:
+    """Aggregation that recomputes CreatorMetrics from approved linked channels and `$merge`s
+    them back into `creators` (MongoDB 5.0+ for `$lookup` with both join fields and a pipeline).
+
+    Metrics are those of `CreatorMetrics`: subscribers summed over channels not marked dead
+    (all channels if every one is), subscriber-weighted ER/CPM, min/avg positive price and the
+    latest post. Creators without approved channels get the defaults.
+    """
+    alive = {"$filter": {"input": "$chs", "as": "c", "cond": {"$ne": ["$$c.link_status", "dead"]}}}
+    prices = _metric_values("price_rub", {"$gt": ["$$c.price_rub", 0]})
+    metrics = {
+        "channels_count": {"$size": "$chs"},
+        "subscribers_total": {"$sum": {"$map": {
+            "input": {"$cond": [{"$gt": [{"$size": alive}, 0]}, alive, "$chs"]},
+            "as": "c",
+            "in": {"$ifNull": ["$$c.subscribers", 0]},
+        }}},
+        "avg_er_percent": {"$round": [_subscriber_weighted("er"), 3]},
+        "min_price_rub": {"$min": prices},
+        "avg_price_rub": {"$toLong": {"$trunc": {"$avg": prices}}},
+        "avg_cpm_rub": {"$toLong": {"$trunc": _subscriber_weighted("cpm_rub")}},
+        "last_post_at_min": {"$max": _metric_values("last_post_at", {"$gt": ["$$c.last_post_at", ""]})},
+    }
+    return [
+        {"$match": {"id": {"$in": creator_ids}} if creator_ids is not None else {}},
+        {"$project": {"_id": 0, "id": 1}},
+        {"$lookup": {
+            "from": "creator_channel_links", "localField": "id", "foreignField": "creator_id", "as": "links",
+            "pipeline": [{"$project": {"_id": 0, "channel_id": 1}}],
+        }},
+        {"$lookup": {
+            "from": "channels", "localField": "links.channel_id", "foreignField": "id", "as": "chs",
+            "pipeline": [
+                {"$match": {"status": "approved"}},
+                {"$project": {"_id": 0, "subscribers": 1, "er": 1, "price_rub": 1, "cpm_rub": 1, "last_post_at": 1, "link_status": 1}},
+            ],
+        }},
+        {"$project": {"id": 1, "metrics": metrics, "updated_at": {"$literal": now}}},
+        {"$merge": {"into": "creators", "on": "id", "whenMatched": "merge", "whenNotMatched": "discard"}},
+    ]
+
+
+async def recompute_creators_metrics(creator_ids: Optional[List[str]] = None) -> None:
+    """Recompute metrics for `creator_ids` (every creator if None) in one aggregation."""
+    if creator_ids is not None and not creator_ids:
+        return
+    await db.creators.aggregate(creator_metrics_pipeline(creator_ids, utcnow_iso())).to_list(length=None)
+    notify_write("creators", creator_ids)
+
+
 async def recompute_creator_metrics(creator_id: str) -> CreatorMetrics:
     """Recompute metrics for a creator based on linked channels"""
-    # Get all channel links for this creator
-    links_cursor = db.creator_channel_links.find({"creator_id": creator_id})
-    links = await links_cursor.to_list(length=None)
-    
-    if not links:
-        return CreatorMetrics()
-    
-    # Get all linked channels that are approved/published
-    channel_ids = [link["channel_id"] for link in links]
-    channels_cursor = db.channels.find({
-        "id": {"$in": channel_ids},
-        "status": {"$in": ["approved"]}
-    })
-    channels = await channels_cursor.to_list(length=None)
-    
-    if not channels:
-        return CreatorMetrics()
-    
-    # Compute metrics
-    metrics = CreatorMetrics()
-    metrics.channels_count = len(channels)
-    
-    # Sum subscribers (only alive channels)
-    alive_channels = [ch for ch in channels if ch.get("link_status") != "dead"]
-    if not alive_channels:
-        alive_channels = channels  # fallback to all if status unknown
-    
-    metrics.subscribers_total = sum(ch.get("subscribers", 0) for ch in alive_channels)
-    
-    # Weighted average ER
-    er_channels = [(ch.get("er", 0), ch.get("subscribers", 0)) 
-                   for ch in channels if ch.get("er") is not None and ch.get("er") > 0]
-    if er_channels:
-        total_weighted_er = sum(er * subs for er, subs in er_channels)
-        total_subs = sum(subs for _, subs in er_channels)
-        if total_subs > 0:
-            metrics.avg_er_percent = round(total_weighted_er / total_subs, 3)
-    
-    # Price metrics
-    prices = [ch.get("price_rub") for ch in channels 
-              if ch.get("price_rub") is not None and ch.get("price_rub") > 0]
-    if prices:
-        metrics.min_price_rub = min(prices)
-        metrics.avg_price_rub = int(sum(prices) / len(prices))
-    
-    # Weighted average CPM
-    cpm_channels = [(ch.get("cpm_rub", 0), ch.get("subscribers", 0)) 
-                    for ch in channels if ch.get("cpm_rub") is not None and ch.get("cpm_rub") > 0]
-    if cpm_channels:
-        total_weighted_cpm = sum(cpm * subs for cpm, subs in cpm_channels)
-        total_subs = sum(subs for _, subs in cpm_channels)
-        if total_subs > 0:
-            metrics.avg_cpm_rub = int(total_weighted_cpm / total_subs)
-    
-    # Most recent post date
-    post_dates = [ch.get("last_post_at") for ch in channels if ch.get("last_post_at")]
-    if post_dates:
-        # Get the most recent (max) post date
-        metrics.last_post_at_min = max(post_dates)
-    
-    # Update creator record with new metrics
-    await db.creators.update_one(
-        {"id": creator_id},
-        {"$set": {"metrics": metrics.dict(), "updated_at": utcnow_iso()}}
-    )
-    
-    return metrics
+    await recompute_creators_metrics([creator_id])
+    doc = await db.creators.find_one({"id": creator_id}, {"metrics": 1})
+    return CreatorMetrics(**((doc or {}).get("metrics") or {}))
 
 # -------------------- Indexes --------------------
 
-async def create_indexes():
-    try:
-        # Existing indexes
-        await db.users.create_index("email", unique=True)
-        await db.channels.create_index("id", unique=True)
-        await db.channels.create_index([("status", 1), ("subscribers", -1)])
-        await db.channels.create_index([("created_at", -1)])
-        await db.channels.create_index([("price_rub", -1)])
-        await db.channels.create_index([("er", -1)])
-        await db.channels.create_index(
-            [("name", "text"), ("short_description", "text"), ("seo_description", "text")],
-            default_language="ru",
-            language_override="textLang",
-            name="channels_text_idx",
-        )
-        await db.categories.create_index("name", unique=True)
-        
-        # New creator indexes
-        await db.creators.create_index("id", unique=True)
-        await db.creators.create_index("slug", unique=True)
-        await db.creators.create_index(
-            [("name", "text"), ("tags", "text")],
-            default_language="ru",
-            language_override="textLang",
-            name="creators_text_idx",
-        )
-        await db.creators.create_index([("category", 1), ("language", 1)])
-        await db.creators.create_index([("metrics.subscribers_total", -1)])
-        await db.creators.create_index([("metrics.avg_er_percent", -1)])
-        await db.creators.create_index([("metrics.min_price_rub", 1)])
-        await db.creators.create_index([("created_at", -1)])
-        
-        # Creator-channel link indexes
-        await db.creator_channel_links.create_index("id", unique=True)
-        await db.creator_channel_links.create_index([("creator_id", 1), ("channel_id", 1)], unique=True)
-        await db.creator_channel_links.create_index("channel_id")
-    except Exception:
-        pass
+# Every sort ends with the unique `id` so cursors can seek past ties
+CHANNEL_SORTS: Dict[str, List[Tuple[str, int]]] = {
+    "popular": [("subscribers", -1), ("id", -1)],
+    "new": [("created_at", -1), ("id", -1)],
+    "name": [("name", 1), ("id", 1)],
+    "price": [("price_rub", -1), ("id", -1)],
+    "er": [("er", -1), ("id", -1)],
+}
+
+IndexSpec = Tuple[str, List[Tuple[str, Any]], Dict[str, Any]]
+
+# Every index the app relies on, as (collection, keys, create_index options).
+# The channel catalog gets (status, <sort>, id) and (status, category, <sort>, id) for each
+# CHANNEL_SORTS entry, so list_channels walks an index in sort order for its common filters;
+# range filters are then checked on the fetched documents without an in-memory sort.
+INDEX_SPECS: List[IndexSpec] = [
+    ("users", [("email", 1)], {"unique": True}),
+    ("channels", [("id", 1)], {"unique": True}),
+    ("channels", [("link", 1)], {}),
+    ("channels", [("username_norm", 1)], {
+        "unique": True,
+        "partialFilterExpression": {"username_norm": {"$type": "string"}},
+        "name": "channels_username_norm_unique",
+    }),
+    *[("channels", [("status", 1), *sort], {}) for sort in CHANNEL_SORTS.values()],
+    *[("channels", [("status", 1), ("category", 1), *sort], {}) for sort in CHANNEL_SORTS.values()],
+    # serves /channels/trending as a single index walk
+    ("channels", [("status", 1), ("growth_score", -1), ("id", -1)], {}),
+    ("channels", [("owner_id", 1), ("status", 1)], {}),
+    ("channels", [("link_last_checked", 1)], {}),
+    ("channels", [("name", "text"), ("short_description", "text"), ("seo_description", "text")], {
+        "default_language": "ru", "language_override": "textLang", "name": "channels_text_idx",
+    }),
+    ("channels", [("status", 1), ("search_terms", 1)], {}),
+    ("categories", [("name", 1)], {"unique": True}),
+    ("creators", [("id", 1)], {"unique": True}),
+    ("creators", [("slug", 1)], {"unique": True}),
+    ("creators", [("name", "text"), ("tags", "text")], {
+        "default_language": "ru", "language_override": "textLang", "name": "creators_text_idx",
+    }),
+    ("creators", [("category", 1), ("language", 1)], {}),
+    ("creators", [("category", 1), ("metrics.subscribers_total", -1)], {}),
+    ("creators", [("metrics.subscribers_total", -1)], {}),
+    ("creators", [("metrics.avg_er_percent", -1)], {}),
+    ("creators", [("metrics.min_price_rub", 1)], {}),
+    ("creators", [("created_at", -1)], {}),
+    ("creator_channel_links", [("id", 1)], {"unique": True}),
+    ("creator_channel_links", [("creator_id", 1), ("channel_id", 1)], {"unique": True}),
+    ("creator_channel_links", [("channel_id", 1)], {}),
+    ("jobs", [("id", 1)], {"unique": True}),
+    # one queued job per scheduled slot (submit_job's dedupe_key)
+    ("jobs", [("dedupe_key", 1)], {
+        "unique": True,
+        "partialFilterExpression": {"dedupe_key": {"$type": "string"}},
+        "name": "jobs_dedupe_key_unique",
+    }),
+    ("jobs", [("status", 1), ("created_at", 1)], {}),
+    ("jobs", [("status", 1), ("lease_until", 1)], {}),
+    ("jobs", [("type", 1), ("created_at", -1)], {}),
+]
+
+
+def index_name(keys: List[Tuple[str, Any]], options: Dict[str, Any]) -> str:
+    """The name MongoDB gives an index unless `options` sets one."""
+    return options.get("name") or "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def index_specs_version() -> str:
+    """Fingerprint of INDEX_SPECS, recorded by sync_indexes() so status can tell a stale index set."""
+    raw = json.dumps([[c, keys, options] for c, keys, options in INDEX_SPECS], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+# Representative query shapes checked by the index advisor: (name, collection, filter, sort)
+INDEX_ADVISOR_QUERIES: List[Tuple[str, str, Dict[str, Any], List[Tuple[str, Any]]]] = [
+    *[(f"channels {name}", "channels", {"status": "approved"}, sort) for name, sort in CHANNEL_SORTS.items()],
+    *[(f"channels by category {name}", "channels", {"status": "approved", "category": "Новости"}, sort) for name, sort in CHANNEL_SORTS.items()],
+    ("channels by category, price range", "channels", {"status": "approved", "category": "Новости", "price_rub": {"$gte": 1000, "$lte": 10000}}, CHANNEL_SORTS["price"]),
+    ("channels subscriber range", "channels", {"status": "approved", "subscribers": {"$gte": 10000}}, CHANNEL_SORTS["popular"]),
+    ("channels alive only", "channels", {"status": "approved", "link_status": "alive"}, CHANNEL_SORTS["popular"]),
+    ("channels by owner", "channels", {"status": "approved", "owner_id": "owner"}, CHANNEL_SORTS["popular"]),
+    ("channels trending", "channels", {"status": "approved"}, [("growth_score", -1), ("id", -1)]),
+    ("link check batch", "channels", {"status": {"$in": ["approved", "draft"]}, "link": {"$nin": [None, "", "#"]}}, [("link_last_checked", 1)]),
+    ("creators popular", "creators", {"flags.active": True}, [("metrics.subscribers_total", -1)]),
+    ("creators by category", "creators", {"flags.active": True, "category": "Новости"}, [("metrics.subscribers_total", -1)]),
+]
+
+
+def plan_stages(plan: Any) -> Tuple[List[str], List[str]]:
+    """(stage names, index names) anywhere in an explain() winning plan."""
+    stages: List[str] = []
+    indexes: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        if "indexName" in plan:
+            indexes.append(plan["indexName"])
+        values = plan.values()
+    elif isinstance(plan, list):
+        values = plan
+    else:
+        values = []
+    for value in values:
+        if isinstance(value, (dict, list)):
+            sub_stages, sub_indexes = plan_stages(value)
+            stages.extend(sub_stages)
+            indexes.extend(sub_indexes)
+    return stages, indexes
+
+
+def _equality_fields(query: Dict[str, Any]) -> List[str]:
+    return [f for f, cond in query.items() if not f.startswith("$") and (not isinstance(cond, dict) or set(cond) <= {"$eq", "$in"})]
+
+
+def suggest_index(query: Dict[str, Any], sort: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    """Equality fields, then sort keys, then range fields (the ESR rule)."""
+    keys: List[Tuple[str, Any]] = [(f, 1) for f in _equality_fields(query)]
+    seen = {f for f, _ in keys}
+    ranges = [(f, 1) for f in query if not f.startswith("$") and f not in seen]
+    keys += [(f, d) for f, d in sort if f not in seen]
+    seen |= {f for f, _ in sort}
+    return keys + [(f, d) for f, d in ranges if f not in seen]
+
+
+def index_serves_sort(keys: List[Tuple[str, Any]], query: Dict[str, Any], sort: List[Tuple[str, Any]]) -> bool:
+    """Whether walking `keys` returns `query` matches in `sort` order: the index starts with
+    equality-filtered fields and continues with the sort keys (in either direction)."""
+    equality = set(_equality_fields(query))
+    i = 0
+    while i < len(keys) and keys[i][0] in equality and keys[i][0] not in {f for f, _ in sort}:
+        i += 1
+    tail = list(keys[i:i + len(sort)])
+    return tail == list(sort) or tail == [(f, -d) for f, d in sort]
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    stages, indexes = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+    stats = explain.get("executionStats", {})
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+    }
+
+# -------------------- Write hooks & caches --------------------
+
+WriteHook = Callable[[Optional[List[str]]], None]
+_write_hooks: Dict[str, List[WriteHook]] = {}
+
+def on_write(collection: str):
+    """Register a sync callback fired after writes to `collection` (receives affected ids, or None if unknown)."""
+    def decorator(fn: WriteHook) -> WriteHook:
+        _write_hooks.setdefault(collection, []).append(fn)
+        return fn
+    return decorator
+
+def notify_write(collection: str, ids: Optional[List[str]] = None) -> None:
+    for hook in _write_hooks.get(collection, []):
+        try:
+            hook(ids)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Write hook {hook.__name__} failed for {collection}: {e}")
+
+
+class CountCache:
+    """TTL cache for list-endpoint totals, keyed by collection and normalized filter.
+
+    `count` returns `(total, exact)`; totals served from cache or from collection
+    metadata are flagged inexact since another worker may have written since.
+
+    Invalidation via `notify_write` is per process: a write handled by one worker clears
+    only that worker's cache, so with several workers the others may serve a stale total
+    for up to `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 2048):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._counts: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._groups: Dict[Tuple[str, str], Tuple[float, Dict[Any, int]]] = {}
+
+    @staticmethod
+    def filter_key(query: Dict[str, Any]) -> str:
+        return json.dumps(query, sort_keys=True, default=str, ensure_ascii=False)
+
+    async def count(self, collection, query: Dict[str, Any], group_field: Optional[str] = None, base: Optional[Dict[str, Any]] = None) -> Tuple[int, bool]:
+        """Count `query` on `collection`.
+
+        Filters equal to `base` (the unfiltered listing) use `estimated_document_count`
+        when `base` is empty. Filters that only add an equality on `group_field` are
+        answered from one cached `$group` over that field.
+        """
+        base = base or {}
+        name = collection.name
+        now = time.monotonic()
+        if not query:
+            return await collection.estimated_document_count(), False
+        extra = {k: v for k, v in query.items() if base.get(k) != v}
+        if group_field and set(extra) == {group_field} and not isinstance(extra[group_field], dict):
+            key = (name, self.filter_key(base) + "|" + group_field)
+            hit = self._groups.get(key)
+            exact = False
+            if not hit or hit[0] < now:
+                pipeline = ([{"$match": base}] if base else []) + [{"$group": {"_id": f"${group_field}", "n": {"$sum": 1}}}]
+                groups = {g["_id"]: g["n"] async for g in collection.aggregate(pipeline)}
+                hit = (now + self.ttl, groups)
+                self._groups[key] = hit
+                exact = True
+            return hit[1].get(extra[group_field], 0), exact
+        key = (name, self.filter_key(query))
+        hit = self._counts.get(key)
+        if hit and hit[0] >= now:
+            return hit[1], False
+        total = await collection.count_documents(query)
+        if len(self._counts) >= self.maxsize:
+            self._counts = {k: v for k, v in self._counts.items() if v[0] >= now}
+            if len(self._counts) >= self.maxsize:
+                self._counts.pop(next(iter(self._counts)))
+        self._counts[key] = (now + self.ttl, total)
+        return total, True
+
+    def invalidate(self, collection_name: str) -> None:
+        self._counts = {k: v for k, v in self._counts.items() if k[0] != collection_name}
+        self._groups = {k: v for k, v in self._groups.items() if k[0] != collection_name}
+
+
+count_cache = CountCache(ttl=float(os.environ.get("COUNT_CACHE_TTL_SECONDS", "30")))
+
+@on_write("channels")
+def _invalidate_channel_counts(ids: Optional[List[str]]) -> None:
+    count_cache.invalidate("channels")
+
+@on_write("creators")
+def _invalidate_creator_counts(ids: Optional[List[str]]) -> None:
+    count_cache.invalidate("creators")
+
+@on_write("users")
+def _invalidate_user_counts(ids: Optional[List[str]]) -> None:
+    count_cache.invalidate("users")
+
+class ResponseCache:
+    """In-process TTL + LRU cache for public read handlers.
+
+    Concurrent misses on one key share a single load (single-flight). Entries carry
+    tags; `invalidate(tag)` drops them and stops loads already in flight from
+    storing results read before the write.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: str, ttl: float, tags: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry and entry[0] >= time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        generations = tuple(self._generations.get(t, 0) for t in tags)
+        try:
+            value = await loader()
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        if generations == tuple(self._generations.get(t, 0) for t in tags):
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        fut.set_result(value)
+        return value
+
+    def invalidate(self, tag: Optional[str] = None) -> None:
+        if tag is None:
+            self._entries.clear()
+            for t in list(self._generations):
+                self._generations[t] += 1
+            return
+        self._generations[tag] = self._generations.get(tag, 0) + 1
+        for key in [k for k, v in self._entries.items() if tag in v[2]]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses, "inflight": len(self._inflight)}
+
+
+response_cache = ResponseCache(maxsize=int(os.environ.get("RESPONSE_CACHE_MAXSIZE", "512")))
+
+def cached_endpoint(ttl: float, tags: Tuple[str, ...]):
+    """Serve a public GET handler from `response_cache`, keyed by its query arguments."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = fn.__name__ + ":" + json.dumps(kwargs, sort_keys=True, default=str)
+            return await response_cache.get_or_load(key, ttl, tags, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
+
+@on_write("channels")
+def _invalidate_channel_responses(ids: Optional[List[str]]) -> None:
+    response_cache.invalidate("channels")
+
+@on_write("creators")
+def _invalidate_creator_responses(ids: Optional[List[str]]) -> None:
+    response_cache.invalidate("creators")
+
+@on_write("categories")
+def _invalidate_category_responses(ids: Optional[List[str]]) -> None:
+    response_cache.invalidate("categories")
+
+# -------------------- Creator metrics maintenance --------------------
+
+class CreatorMetricsQueue:
+    """Keeps creator metrics in step with channel writes.
+
+    Channel writes mark channels dirty. `delay` seconds after the first one, the pending
+    channels are resolved to creators through creator_channel_links and their metrics are
+    recomputed `batch_size` creators at a time; writes arriving meanwhile join that flush,
+    and writes landing during a flush are picked up by the next one. A write with unknown
+    ids (bulk jobs) recomputes every creator in one pipeline.
+    """
+
+    def __init__(self, delay: float = 2.0, batch_size: int = 100):
+        self.delay = delay
+        self.batch_size = batch_size
+        self._channels: set = set()
+        self._all = False
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self.flushes = 0
+        self.recomputed = 0
+        self.full_rebuilds = 0
+
+    @property
+    def pending(self) -> bool:
+        return self._all or bool(self._channels)
+
+    def mark_channels(self, ids: Optional[List[str]]) -> None:
+        if ids is None:
+            self._all = True
+        else:
+            self._channels.update(ids)
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass  # no loop (scripts/tests): flushed by the next write or by drain()
+
+    async def _run(self) -> None:
+        while self.pending:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Creator metrics flush failed: {e}")
+
+    async def flush(self) -> None:
+        channels, everything = self._channels, self._all
+        self._channels, self._all = set(), False
+        if everything:
+            await recompute_creators_metrics()
+            self.full_rebuilds += 1
+        elif channels:
+            creator_ids = await db.creator_channel_links.distinct("creator_id", {"channel_id": {"$in": list(channels)}})
+            for i in range(0, len(creator_ids), self.batch_size):
+                await recompute_creators_metrics(creator_ids[i:i + self.batch_size])
+            self.recomputed += len(creator_ids)
+        else:
+            return
+        self.flushes += 1
+
+    async def drain(self) -> None:
+        """Flush now, without waiting for the debounce (shutdown)."""
+        self._wake.set()
+        try:
+            if self._task is not None and not self._task.done():
+                await self._task
+            if self.pending:
+                await self.flush()
+        finally:
+            self._wake.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending_channels": len(self._channels), "pending_all": self._all, "flushes": self.flushes, "recomputed": self.recomputed, "full_rebuilds": self.full_rebuilds}
+
+
+creator_metrics_queue = CreatorMetricsQueue(
+    delay=float(os.environ.get("CREATOR_METRICS_DELAY_SECONDS", "2")),
+    batch_size=int(os.environ.get("CREATOR_METRICS_BATCH_SIZE", "100")),
+)
+
+@on_write("channels")
+def _queue_creator_metrics(ids: Optional[List[str]]) -> None:
+    creator_metrics_queue.mark_channels(ids)
+
+# -------------------- Channel facets --------------------
+
+FACET_FIELDS = ("category", "language", "country")
+FACET_BUCKETS: Dict[str, List[float]] = {
+    "subscribers": [0, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 10**15],
+    "price_rub": [0, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 10**15],
+    "er": [0, 1, 2, 5, 10, 20, 10**6],
+}
+
+
+def channel_facets_pipeline() -> List[Dict[str, Any]]:
+    """One `$facet` pass over approved channels: value counts per FACET_FIELDS and histograms per FACET_BUCKETS."""
+    facets: Dict[str, Any] = {"total": [{"$count": "n"}]}
+    for field in FACET_FIELDS:
+        facets[field] = [
+            {"$match": {field: {"$nin": [None, ""]}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+    for field, bounds in FACET_BUCKETS.items():
+        facets[field] = [{"$bucket": {"groupBy": f"${field}", "boundaries": bounds, "default": "unknown", "output": {"count": {"$sum": 1}}}}]
+    return [{"$match": {"status": "approved"}}, {"$facet": facets}]
+
+
+def shape_channel_facets(raw: Dict[str, Any], now: str) -> Dict[str, Any]:
+    """Turn the `$facet` output into the sidebar document: every histogram bucket is listed, empty ones with 0."""
+    out: Dict[str, Any] = {"total": raw["total"][0]["n"] if raw.get("total") else 0, "updated_at": now}
+    for field in FACET_FIELDS:
+        out[field] = [{"value": g["_id"], "count": g["count"]} for g in raw.get(field, [])]
+    for field, bounds in FACET_BUCKETS.items():
+        counts = {b["_id"]: b["count"] for b in raw.get(field, [])}
+        out[field] = {
+            "buckets": [{"min": lo, "max": hi if hi != bounds[-1] else None, "count": counts.get(lo, 0)} for lo, hi in zip(bounds, bounds[1:])],
+            "unknown": counts.get("unknown", 0),
+        }
+    return out
+
+
+class ChannelFacets:
+    """Materialized catalog facets, kept in `channel_facets` and served from memory.
+
+    Channel writes mark the facets dirty and trigger a `$facet` rebuild `delay` seconds
+    later, so bursts of writes cost one rebuild. Readers get the in-memory copy, reload
+    the materialized document (possibly rebuilt by another worker) after `ttl`, and
+    rebuild it themselves once it is older than `max_age`.
+    """
+
+    DOC_ID = "approved"
+
+    def __init__(self, ttl: float = 30.0, delay: float = 30.0, max_age: float = 3600.0):
+        self.ttl = ttl
+        self.delay = delay
+        self.max_age = max_age
+        self._data: Optional[Dict[str, Any]] = None
+        self._expires = 0.0
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.rebuilds = 0
+
+    def mark_dirty(self, ids: Optional[List[str]] = None) -> None:
+        self._dirty = True
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                pass
+
+    async def _run(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            self._dirty = False
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Channel facets rebuild failed: {e}")
+
+    async def rebuild(self) -> Dict[str, Any]:
+        raw = await db.channels.aggregate(channel_facets_pipeline()).to_list(length=1)
+        data = shape_channel_facets(raw[0] if raw else {}, utcnow_iso())
+        await db.channel_facets.replace_one({"_id": self.DOC_ID}, data, upsert=True)
+        self._data, self._expires = data, time.monotonic() + self.ttl
+        self.rebuilds += 1
+        return data
+
+    async def get(self) -> Dict[str, Any]:
+        if self._data is not None and self._expires >= time.monotonic():
+            return self._data
+        async with self._lock:
+            if self._data is not None and self._expires >= time.monotonic():
+                return self._data
+            doc = await db.channel_facets.find_one({"_id": self.DOC_ID}, {"_id": 0})
+            if doc is None or doc.get("updated_at", "") < (datetime.now(timezone.utc) - timedelta(seconds=self.max_age)).isoformat():
+                return await self.rebuild()
+            self._data, self._expires = doc, time.monotonic() + self.ttl
+            return doc
+
+
+channel_facets = ChannelFacets(
+    ttl=float(os.environ.get("FACETS_CACHE_TTL_SECONDS", "30")),
+    delay=float(os.environ.get("FACETS_REBUILD_DELAY_SECONDS", "30")),
+    max_age=float(os.environ.get("FACETS_MAX_AGE_SECONDS", "3600")),
+)
+
+@on_write("channels")
+def _mark_channel_facets(ids: Optional[List[str]]) -> None:
+    channel_facets.mark_dirty(ids)
 
 # -------------------- Auth Helpers --------------------
 
@@ -493,27 +1132,84 @@ def make_token(user: Dict[str, Any]) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
 
-async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Dict[str, Any]:
+class AuthUserCache:
+    """Short-lived cache of user documents for authenticated requests, keyed by (sub, iat)."""
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, Any], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, uid: str, iat: Any) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get((uid, iat))
+        if not entry or entry[0] < time.monotonic():
+            return None
+        return dict(entry[1])
+
+    def set(self, uid: str, iat: Any, user: Dict[str, Any]) -> None:
+        self._entries[(uid, iat)] = (time.monotonic() + self.ttl, dict(user))
+        self._entries.move_to_end((uid, iat))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, uids: Optional[List[str]] = None) -> None:
+        if uids is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] in uids]:
+            del self._entries[key]
+
+
+auth_user_cache = AuthUserCache(ttl=float(os.environ.get("AUTH_USER_CACHE_TTL_SECONDS", "30")))
+# Trust the `role` claim from make_token on read-only endpoints instead of loading the user.
+# Trade-off: a deleted or demoted user keeps read access until the token expires.
+AUTH_STATELESS_READS = os.environ.get("AUTH_STATELESS_READS", "").lower() in ("1", "true", "yes")
+
+@on_write("users")
+def _invalidate_auth_users(ids: Optional[List[str]]) -> None:
+    auth_user_cache.invalidate(ids)
+
+def decode_token(credentials: Optional[HTTPAuthorizationCredentials]) -> Dict[str, Any]:
     if not credentials:
         raise HTTPException(401, detail="Not authenticated")
-    token = credentials.credentials
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        uid = payload.get("sub")
-        if not uid:
-            raise HTTPException(401, detail="Invalid token")
-        user = await db.users.find_one({"id": uid})
-        if not user:
-            raise HTTPException(401, detail="User not found")
-        return parse_from_mongo(user)
+        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALG])
     except JWTError:
         raise HTTPException(401, detail="Invalid token")
+    if not payload.get("sub"):
+        raise HTTPException(401, detail="Invalid token")
+    return payload
+
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Dict[str, Any]:
+    payload = decode_token(credentials)
+    uid = payload["sub"]
+    iat = payload.get("iat")
+    user = auth_user_cache.get(uid, iat)
+    if user is None:
+        doc = await db.users.find_one({"id": uid})
+        if not doc:
+            raise HTTPException(401, detail="User not found")
+        user = parse_from_mongo(doc)
+        auth_user_cache.set(uid, iat, user)
+    return user
+
+async def get_current_reader(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Dict[str, Any]:
+    """Like get_current_user, but built from token claims alone when AUTH_STATELESS_READS is on."""
+    if AUTH_STATELESS_READS:
+        payload = decode_token(credentials)
+        return {"id": payload["sub"], "email": payload.get("email"), "role": payload.get("role")}
+    return await get_current_user(credentials)
 
 async def get_current_admin(user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     if user.get("role") != "admin":
         raise HTTPException(403, detail="Admin required")
     return user
 
+async def get_current_admin_reader(user: Dict[str, Any] = Depends(get_current_reader)) -> Dict[str, Any]:
+    if user.get("role") != "admin":
+        raise HTTPException(403, detail="Admin required")
+    return user
+
 # -------------------- Defaults --------------------
 
 DEFAULT_CATEGORIES = ["Новости", "Технологии", "Крипто", "Бизнес", "Развлечения"]
@@ -541,7 +1237,7 @@ async def register(user: UserCreate):
     data = {
         "id": str(uuid.uuid4()),
         "email": str(user.email).lower(),
-        "password_hash": pwd_ctx.hash(user.password),
+        "password_hash": await password_hasher.hash(user.password),
         "role": user.role or "advertiser",
         "first_name": user.first_name,
         "last_name": user.last_name,
@@ -554,12 +1250,13 @@ async def register(user: UserCreate):
         await db.users.insert_one(data)
     except Exception:
         raise HTTPException(400, detail="User exists")
+    notify_write("users", [data["id"]])
     return UserResponse(id=data["id"], email=data["email"], role=data["role"], created_at=data["created_at"])    
 
 @api.post("/auth/login")
 async def login(payload: UserLogin):
     user = await db.users.find_one({"email": str(payload.email).lower()})
-    if not user or not pwd_ctx.verify(payload.password, user.get("password_hash", "")):
+    if not user or not await password_hasher.verify(payload.password, user.get("password_hash", "")):
         raise HTTPException(401, detail="Invalid credentials")
     token = make_token(parse_from_mongo(user))
     return {"access_token": token, "token_type": "bearer", "user": UserResponse(id=user["id"], email=user["email"], role=user["role"], created_at=user["created_at"]) }
@@ -569,19 +1266,58 @@ async def me(user: Dict[str, Any] = Depends(get_current_user)):
     return UserResponse(id=user["id"], email=user["email"], role=user.get("role", "advertiser"), first_name=user.get("first_name"), last_name=user.get("last_name"), tg_username=user.get("tg_username"), created_at=user.get("created_at", utcnow_iso()))
 
 @api.get("/categories", response_model=List[str])
+@cached_endpoint(ttl=300, tags=("categories",))
 async def list_categories():
-    count = await db.categories.count_documents({})
-    if count == 0:
+    cats = await db.categories.find({}, {"_id": 0, "name": 1}).sort("name", 1).to_list(1000)
+    if not cats:
         try:
             from pymongo import UpdateOne
-            ops = [UpdateOne({"name": c}, {"$set": {"name": c}}, upsert=True) for c in DEFAULT_CATEGORIES]
-            if ops:
-                await db.categories.bulk_write(ops)
+            await db.categories.bulk_write([UpdateOne({"name": c}, {"$set": {"name": c}}, upsert=True) for c in DEFAULT_CATEGORIES])
+            notify_write("categories")
         except Exception:
             pass
-    cats = await db.categories.find().sort("name", 1).to_list(1000)
+        cats = await db.categories.find({}, {"_id": 0, "name": 1}).sort("name", 1).to_list(1000)
     return [c.get("name") for c in cats]
 
+async def refresh_search_terms(query: Dict[str, Any], batch_size: int = 500) -> int:
+    """Re-derive `search_terms` for channels matching `query` from their stored text fields.
+
+    For writes that change some of SEARCH_TEXT_FIELDS without the others.
+    """
+    from pymongo import UpdateOne
+    updated = 0
+    ops = []
+    projection = {"search_terms": 1, **{f: 1 for f in SEARCH_TEXT_FIELDS}}
+    async for ch in db.channels.find(query, projection):
+        terms = channel_search_terms(ch)
+        if ch.get("search_terms") != terms:
+            ops.append(UpdateOne({"_id": ch["_id"]}, {"$set": {"search_terms": terms}}))
+        if len(ops) >= batch_size:
+            updated += (await db.channels.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await db.channels.bulk_write(ops, ordered=False)).modified_count
+    return updated
+
+async def insert_channel(item: Dict[str, Any]) -> None:
+    from pymongo.errors import DuplicateKeyError
+    try:
+        await db.channels.insert_one(prepare_channel_for_mongo(item))
+    except DuplicateKeyError:
+        raise HTTPException(409, detail="Channel with this username already exists")
+
+async def update_channel_fields(channel_id: str, updates: Dict[str, Any]) -> None:
+    from pymongo.errors import DuplicateKeyError
+    try:
+        await db.channels.update_one({"id": channel_id}, {"$set": prepare_channel_for_mongo(updates)})
+    except DuplicateKeyError:
+        raise HTTPException(409, detail="Channel with this username already exists")
+    if any(f in updates for f in SEARCH_TEXT_FIELDS) and not all(f in updates for f in SEARCH_TEXT_FIELDS):
+        await refresh_search_terms({"id": channel_id})
+    # trending ranks by the stored score, so it is always re-derived rather than trusted
+    await refresh_growth_scores({"id": channel_id})
+    notify_write("channels", [channel_id])
+
 @api.post("/channels", response_model=ChannelResponse)
 async def create_channel(payload: ChannelCreate, user: Dict[str, Any] = Depends(get_current_user)):
     if not (payload.link.startswith("http") or payload.link.startswith("t.me")):
@@ -599,46 +1335,42 @@ async def create_channel(payload: ChannelCreate, user: Dict[str, Any] = Depends(
         if status not in ["draft", "moderation"]:
             status = "moderation"
     item = {"id": str(uuid.uuid4()), **payload.model_dump(), "username": uname, "status": status, "owner_id": owner_id, "created_at": now, "updated_at": now}
-    await db.channels.insert_one(prepare_for_mongo(item))
+    await insert_channel(item)
+    notify_write("channels", [item["id"]])
     return ChannelResponse(**item)
 
 @api.get("/channels/trending", response_model=List[ChannelResponse])
+@cached_endpoint(ttl=60, tags=("channels",))
 async def trending_channels(limit: int = Query(4, ge=1, le=8)):
-    # Prefer featured, then highest growth_30d, then subscribers
-    featured = await db.channels.find({"status": "approved", "is_featured": True}).sort("updated_at", -1).limit(limit).to_list(length=limit)
-    out = featured[:]
-    if len(out) < limit:
-        left = limit - len(out)
-        extra = await db.channels.find({"status": "approved", "is_featured": {"$ne": True}}).sort([
-            ("growth_30d", -1), ("subscribers", -1)
-        ]).limit(left).to_list(length=left)
-        out.extend(extra)
-    return [ChannelResponse(**parse_from_mongo(i)) for i in out]
+    # growth_score is set on every channel write and decayed by the channels.growth_score job;
+    # featured channels score highest
+    cursor = db.channels.find({"status": "approved"}).sort([("growth_score", -1), ("id", -1)]).limit(limit)
+    return [ChannelResponse(**parse_from_mongo(i)) for i in await cursor.to_list(length=limit)]
 
 @api.get("/channels/top", response_model=List[ChannelResponse])
+@cached_endpoint(ttl=60, tags=("channels",))
 async def top_channels(limit: int = Query(10, ge=1, le=50)):
     cursor = db.channels.find({"status": "approved"}).sort("subscribers", -1).limit(limit)
     items_raw = await cursor.to_list(length=limit)
     return [ChannelResponse(**parse_from_mongo(i)) for i in items_raw]
 
-@api.get("/channels", response_model=PaginatedChannels)
-async def list_channels(
+def build_channels_query(
     q: Optional[str] = None,
     category: Optional[str] = None,
     owner_id: Optional[str] = None,
-    status: Optional[ChannelStatus] = "approved",
-    sort: Literal["popular", "new", "name", "price", "er"] = "popular",
-    page: int = Query(1, ge=1),
-    limit: int = Query(24, ge=1, le=48),
-    min_subscribers: Optional[int] = Query(None, ge=0),
-    max_subscribers: Optional[int] = Query(None, ge=0),
-    min_price: Optional[int] = Query(None, ge=0),
-    max_price: Optional[int] = Query(None, ge=0),
-    min_er: Optional[float] = Query(None, ge=0),
-    max_er: Optional[float] = Query(None, ge=0),
+    status: Optional[str] = None,
+    search: str = "auto",
+    regex: bool = False,
+    min_subscribers: Optional[int] = None,
+    max_subscribers: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_er: Optional[float] = None,
+    max_er: Optional[float] = None,
     only_featured: Optional[bool] = False,
     only_alive: Optional[bool] = False,
-):
+) -> Tuple[Dict[str, Any], bool]:
+    """Mongo filter for the channel catalog filters, and whether it uses `$text`."""
     query: Dict[str, Any] = {}
     if status:
         query["status"] = status
@@ -650,12 +1382,26 @@ async def list_channels(
         query["is_featured"] = True
     if only_alive:
         query["link_status"] = "alive"
-    if q:
+    text_search = False
+    if q and regex:
         query["$or"] = [
             {"name": {"$regex": q, "$options": "i"}},
             {"short_description": {"$regex": q, "$options": "i"}},
             {"seo_description": {"$regex": q, "$options": "i"}},
         ]
+    elif q:
+        terms = search_terms(q)
+        if search == "auto":
+            search = "prefix" if len(terms) == 1 else "text"
+        if search == "prefix" and terms:
+            # words from the name and descriptions; whole words must match exactly and
+            # the word being typed matches as a prefix
+            query["$and"] = [{"search_terms": t} for t in terms[:-1]] + [
+                {"search_terms": {"$regex": f"^{re.escape(terms[-1])}"}}
+            ]
+        elif search == "text":
+            query["$text"] = {"$search": q}
+            text_search = True
 
     # numeric ranges
     if min_subscribers is not None or max_subscribers is not None:
@@ -679,24 +1425,76 @@ async def list_channels(
         if max_er is not None:
             rng["$lte"] = float(max_er)
         query["er"] = rng
+    return query, text_search
 
-    if sort == "popular":
-        sort_spec = [("subscribers", -1)]
-    elif sort == "name":
-        sort_spec = [("name", 1)]
-    elif sort == "price":
-        sort_spec = [("price_rub", -1)]
-    elif sort == "er":
-        sort_spec = [("er", -1)]
-    else:
-        sort_spec = [("created_at", -1)]
+@api.get("/channels", response_model=PaginatedChannels)
+async def list_channels(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    owner_id: Optional[str] = None,
+    status: Optional[ChannelStatus] = "approved",
+    sort: Literal["popular", "new", "name", "price", "er", "relevance"] = "popular",
+    search: Literal["auto", "text", "prefix"] = Query("auto", description="auto: prefix for a single word being typed, full-text otherwise"),
+    regex: bool = Query(False, description="Legacy case-insensitive regex search (unindexed)"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(24, ge=1, le=48),
+    min_subscribers: Optional[int] = Query(None, ge=0),
+    max_subscribers: Optional[int] = Query(None, ge=0),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    min_er: Optional[float] = Query(None, ge=0),
+    max_er: Optional[float] = Query(None, ge=0),
+    only_featured: Optional[bool] = False,
+    only_alive: Optional[bool] = False,
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page; overrides page"),
+    include_total: Optional[bool] = Query(None, description="Count matching channels (default: on for page mode, off for cursor mode)"),
+):
+    query, text_search = build_channels_query(
+        q, category, owner_id, status, search, regex, min_subscribers, max_subscribers,
+        min_price, max_price, min_er, max_er, only_featured, only_alive,
+    )
 
-    skip = (page - 1) * limit
-    total = await db.channels.count_documents(query)
-    cursor = db.channels.find(query).sort(sort_spec).skip(skip).limit(limit)
-    items_raw = await cursor.to_list(length=limit)
+    if sort == "relevance":
+        if not text_search:
+            sort = "popular"
+        elif cursor:
+            raise HTTPException(400, detail="Cursor pagination is not available for relevance sort")
+    sort_spec = CHANNEL_SORTS.get(sort) or [("score", {"$meta": "textScore"}), ("subscribers", -1), ("id", -1)]
+    projection = {"score": {"$meta": "textScore"}} if text_search else None
+    if cursor:
+        data = decode_cursor(cursor)
+        values = data.get("v")
+        if data.get("s") != sort or not isinstance(values, list) or len(values) != len(sort_spec):
+            raise HTTPException(400, detail="Cursor does not match sort")
+        after = seek_filter(sort_spec, values)
+        find_query = {"$and": [query, after]} if query else after
+        skip = 0
+        if include_total is None:
+            include_total = False
+    else:
+        find_query = query
+        skip = (page - 1) * limit
+        if include_total is None:
+            include_total = True
+
+    total = total_exact = None
+    if include_total:
+        total, total_exact = await count_cache.count(db.channels, query, group_field="status")
+    rows = db.channels.find(find_query, projection).sort(sort_spec).skip(skip).limit(limit + 1)
+    items_raw = await rows.to_list(length=limit + 1)
+    has_more = len(items_raw) > limit
+    items_raw = items_raw[:limit]
+    next_cursor = None
+    if has_more and items_raw and sort in CHANNEL_SORTS:
+        last = items_raw[-1]
+        next_cursor = encode_cursor({"s": sort, "v": [last.get(f) for f, _ in sort_spec]})
     items = [ChannelResponse(**parse_from_mongo(i)) for i in items_raw]
-    return PaginatedChannels(items=items, total=total, page=page, limit=limit, has_more=(skip + len(items)) < total)
+    return PaginatedChannels(items=items, total=total, page=page, limit=limit, has_more=has_more, next_cursor=next_cursor, total_exact=total_exact)
+
+@api.get("/channels/facets")
+async def get_channel_facets():
+    """Counts and histograms over approved channels for the catalog filter sidebar."""
+    return await channel_facets.get()
 
 @api.get("/channels/{channel_id}")
 async def get_channel(channel_id: str):
@@ -715,12 +1513,11 @@ async def get_channel(channel_id: str):
 
 @api.get("/channels/username/{username}")
 async def get_channel_by_username(username: str):
-    # normalize remove leading @ if passed
-    un = username.lstrip("@")
-    doc = await db.channels.find_one({"username": un})
+    norm = normalize_tg_username(username)
+    doc = await db.channels.find_one({"username_norm": norm}) if norm else None
     if not doc:
-        # try to infer by link
-        doc = await db.channels.find_one({"link": {"$regex": f"/{un}$"}})
+        # channels without a derivable username_norm (e.g. invite links) keep their stored username
+        doc = await db.channels.find_one({"username": username.lstrip("@")})
     if not doc:
         raise HTTPException(404, detail="Channel not found")
     base = parse_from_mongo(doc)
@@ -773,7 +1570,7 @@ async def update_channel(channel_id: str, payload: ChannelUpdate, user: Dict[str
         if updates["status"] not in ["draft", "moderation"]:
             updates["status"] = "moderation"
     updates["updated_at"] = utcnow_iso()
-    await db.channels.update_one({"id": channel_id}, {"$set": prepare_for_mongo(updates)})
+    await update_channel_fields(channel_id, updates)
     doc = await db.channels.find_one({"id": channel_id})
     return ChannelResponse(**parse_from_mongo(doc))
 
@@ -785,22 +1582,24 @@ async def admin_list_users(
     q: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    user: Dict[str, Any] = Depends(get_current_admin)
+    user: Dict[str, Any] = Depends(get_current_admin_reader)
 ):
     query: Dict[str, Any] = {}
     if role:
         query["role"] = role
     if q:
         query["email"] = {"$regex": q, "$options": "i"}
-    total = await db.users.count_documents(query)
+    total, total_exact = await count_cache.count(db.users, query, group_field="role")
     skip = (page - 1) * limit
-    cursor = db.users.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    items = await cursor.to_list(length=limit)
+    cursor = db.users.find(query).sort("created_at", -1).skip(skip).limit(limit + 1)
+    items = await cursor.to_list(length=limit + 1)
+    has_more = len(items) > limit
+    items = items[:limit]
     out = []
     for u in items:
         d = parse_from_mongo(u)
         out.append({"id": d.get("id"), "email": d.get("email"), "role": d.get("role"), "created_at": d.get("created_at")})
-    return {"items": out, "total": total, "page": page, "limit": limit, "has_more": (skip + len(out)) < total}
+    return {"items": out, "total": total, "total_exact": total_exact, "page": page, "limit": limit, "has_more": has_more}
 
 @api.delete("/admin/users/{user_id}")
 async def admin_delete_user(user_id: str, user: Dict[str, Any] = Depends(get_current_admin)):
@@ -814,39 +1613,85 @@ async def admin_delete_user(user_id: str, user: Dict[str, Any] = Depends(get_cur
     # reassign channels owned by this user to admin
     await db.channels.update_many({"owner_id": user_id}, {"$set": {"owner_id": user.get("id")}})
     await db.users.delete_one({"id": user_id})
+    notify_write("channels")
+    notify_write("users", [user_id])
     return {"ok": True}
 
 
+@api.get("/admin/metrics")
+async def admin_metrics(user: Dict[str, Any] = Depends(get_current_admin_reader)):
+    return {"response_cache": response_cache.stats(), "password_hasher": password_hasher.stats(), "parser_pool": parser_pool.stats(), "creator_metrics": creator_metrics_queue.stats(), "channel_facets": {"rebuilds": channel_facets.rebuilds}}
+
+@api.post("/admin/cache/invalidate")
+async def admin_invalidate_cache(tag: Optional[str] = None, user: Dict[str, Any] = Depends(get_current_admin)):
+    response_cache.invalidate(tag)
+    if tag:
+        count_cache.invalidate(tag)
+    else:
+        for name in ("channels", "creators", "users"):
+            count_cache.invalidate(name)
+    return {"ok": True}
+
+@api.post("/admin/facets/rebuild")
+async def admin_rebuild_facets(user: Dict[str, Any] = Depends(get_current_admin)):
+    return await channel_facets.rebuild()
+
+@api.get("/admin/indexes/advisor")
+async def admin_index_advisor(user: Dict[str, Any] = Depends(get_current_admin_reader)):
+    """Explain each INDEX_ADVISOR_QUERIES shape and flag collection scans and blocking sorts.
+
+    `spec_index` is the INDEX_SPECS entry expected to serve the query; a flagged query with
+    one usually means the index is missing or failed on this deployment (see /admin/migrations).
+    """
+    report = []
+    for name, collection, query, sort in INDEX_ADVISOR_QUERIES:
+        explain = await db[collection].find(query).sort(sort).limit(24).explain()
+        entry = {"query": name, "collection": collection, "filter": query, "sort": sort, **summarize_explain(explain)}
+        entry["spec_index"] = next((keys for c, keys, _ in INDEX_SPECS if c == collection and index_serves_sort(keys, query, sort)), None)
+        if entry["collscan"] or entry["in_memory_sort"]:
+            entry["suggested_index"] = suggest_index(query, sort)
+        report.append(entry)
+    problems = [e["query"] for e in report if e["collscan"] or e["in_memory_sort"]]
+    # undeclared indexes cost writes and RAM without serving any advised query
+    unlisted = [f"{i['collection']}.{i['name']}" for i in await unlisted_indexes()]
+    return {"ok": not problems, "problems": problems, "queries": report, "unlisted_indexes": unlisted}
+
+@api.get("/admin/migrations")
+async def admin_migrations(user: Dict[str, Any] = Depends(get_current_admin_reader)):
+    """Applied/pending migrations and the build status of every INDEX_SPECS index."""
+    return await migration_status()
+
 @api.get("/admin/summary")
-async def admin_summary(user: Dict[str, Any] = Depends(get_current_admin)):
-    draft = await db.channels.count_documents({"status": "draft"})
-    approved = await db.channels.count_documents({"status": "approved"})
-    dead = await db.channels.count_documents({"link_status": "dead"})
+async def admin_summary(user: Dict[str, Any] = Depends(get_current_admin_reader)):
+    draft, _ = await count_cache.count(db.channels, {"status": "draft"}, group_field="status")
+    approved, _ = await count_cache.count(db.channels, {"status": "approved"}, group_field="status")
+    dead, _ = await count_cache.count(db.channels, {"link_status": "dead"})
     return {"draft": draft, "approved": approved, "dead": dead}
 
 @api.get("/admin/dead", response_model=List[ChannelResponse])
-async def list_dead_links(limit: int = 50, user: Dict[str, Any] = Depends(get_current_admin)):
+async def list_dead_links(limit: int = 50, user: Dict[str, Any] = Depends(get_current_admin_reader)):
     cursor = db.channels.find({"link_status": "dead"}).sort("dead_at", -1).limit(limit)
     items_raw = await cursor.to_list(length=limit)
     return [ChannelResponse(**parse_from_mongo(i)) for i in items_raw]
 
 @api.get("/admin/channels", response_model=PaginatedChannels)
-async def admin_list_channels(status: Optional[ChannelStatus] = None, page: int = Query(1, ge=1), limit: int = Query(20, ge=1, le=100), user: Dict[str, Any] = Depends(get_current_admin)):
+async def admin_list_channels(status: Optional[ChannelStatus] = None, page: int = Query(1, ge=1), limit: int = Query(20, ge=1, le=100), user: Dict[str, Any] = Depends(get_current_admin_reader)):
     query: Dict[str, Any] = {}
     if status:
         query["status"] = status
-    total = await db.channels.count_documents(query)
+    total, total_exact = await count_cache.count(db.channels, query, group_field="status")
     skip = (page - 1) * limit
-    cursor = db.channels.find(query).sort("updated_at", -1).skip(skip).limit(limit)
-    items_raw = await cursor.to_list(length=limit)
-    items = [ChannelResponse(**parse_from_mongo(i)) for i in items_raw]
-    return PaginatedChannels(items=items, total=total, page=page, limit=limit, has_more=(skip + len(items)) < total)
+    cursor = db.channels.find(query).sort("updated_at", -1).skip(skip).limit(limit + 1)
+    items_raw = await cursor.to_list(length=limit + 1)
+    items = [ChannelResponse(**parse_from_mongo(i)) for i in items_raw[:limit]]
+    return PaginatedChannels(items=items, total=total, page=page, limit=limit, has_more=len(items_raw) > limit, total_exact=total_exact)
 
 @api.post("/admin/channels", response_model=ChannelResponse)
 async def admin_create_channel(payload: ChannelCreate, user: Dict[str, Any] = Depends(get_current_admin)):
     now = utcnow_iso()
     item = {"id": str(uuid.uuid4()), **payload.model_dump(), "status": payload.status or "draft", "created_at": now, "updated_at": now}
-    await db.channels.insert_one(prepare_for_mongo(item))
+    await insert_channel(item)
+    notify_write("channels", [item["id"]])
     return ChannelResponse(**item)
 
 @api.patch("/admin/channels/{channel_id}", response_model=ChannelResponse)
@@ -856,7 +1701,7 @@ async def admin_update_channel(channel_id: str, payload: ChannelUpdate, user: Di
         raise HTTPException(404, detail="Channel not found")
     updates = {k: v for k, v in payload.model_dump(exclude_unset=True).items() if v is not None}
     updates["updated_at"] = utcnow_iso()
-    await db.channels.update_one({"id": channel_id}, {"$set": prepare_for_mongo(updates)})
+    await update_channel_fields(channel_id, updates)
     doc = await db.channels.find_one({"id": channel_id})
     return ChannelResponse(**parse_from_mongo(doc))
 
@@ -869,6 +1714,7 @@ async def admin_change_owner(channel_id: str, new_owner_id: str, user: Dict[str,
     if not u:
         raise HTTPException(404, detail="User not found")
     await db.channels.update_one({"id": channel_id}, {"$set": {"owner_id": new_owner_id, "updated_at": utcnow_iso()}})
+    notify_write("channels", [channel_id])
     return {"ok": True}
 
 @api.post("/admin/channels/{channel_id}/approve", response_model=ChannelResponse)
@@ -877,6 +1723,8 @@ async def admin_approve_channel(channel_id: str, user: Dict[str, Any] = Depends(
     if not existing:
         raise HTTPException(404, detail="Channel not found")
     await db.channels.update_one({"id": channel_id}, {"$set": {"status": "approved", "updated_at": utcnow_iso()}})
+    await refresh_growth_scores({"id": channel_id})
+    notify_write("channels", [channel_id])
     doc = await db.channels.find_one({"id": channel_id})
     return ChannelResponse(**parse_from_mongo(doc))
 
@@ -886,232 +1734,171 @@ async def admin_reject_channel(channel_id: str, user: Dict[str, Any] = Depends(g
     if not existing:
         raise HTTPException(404, detail="Channel not found")
     await db.channels.update_one({"id": channel_id}, {"$set": {"status": "rejected", "updated_at": utcnow_iso()}})
+    notify_write("channels", [channel_id])
     doc = await db.channels.find_one({"id": channel_id})
     return ChannelResponse(**parse_from_mongo(doc))
 
 # -------------------- Scraper helpers --------------------
 
-def absolutize(src: Optional[str], base: str) -> Optional[str]:
-    if not src:
-        return None
-    if src.startswith("//"):
-        return (urlparse(base).scheme or "https") + ":" + src
-    if src.startswith("http"):
-        return src
-    try:
-        return urljoin(base, src)
-    except Exception:
-        return src
-
+class _ParserProcess:
+    """One parser worker process and the pipe to it."""
 
-def extract_card_generic(card, base_url: str) -> Dict[str, Any]:
-    link = None
-    a = card.select_one('a[href*="t.me"], a[href*="telegram.me"]')
-    if a and a.get('href'):
-        link = a.get('href').strip()
-    else:
-        text = card.get_text(" ", strip=True)
-        m = re.search(r"@([A-Za-z0-9_]{4,})", text)
-        if m:
-            link = f"https://t.me/{m.group(1)}"
-    if not link:
-        return {}
-    name = None
-    for sel in ['.title', 'h3', 'h2', 'h4', 'a', '.name']:
-        el = card.select_one(sel)
-        if el and el.get_text(strip=True):
-            name = el.get_text(strip=True)
-            break
-    if not name:
-        name = link.rsplit('/', 1)[-1]
-    img = card.select_one('img')
-    avatar = None
-    if img:
-        avatar = img.get('src') or img.get('data-src') or img.get('data-original') or img.get('data-lazy')
-    avatar = absolutize(avatar, base_url)
-    subs_text = card.get_text(" ", strip=True).lower()
-    m2 = re.search(r"([\d\s.,]+)\s*(подписчик|подписчиков|subs|subscribers)", subs_text)
-    subs = to_int(m2.group(1)) if m2 else 0
-    cat = None
-    for el in card.select('.tag, .badge, .label, .category, [class*="tag"], [class*="badge"], [class*="category"]'):
-        t = el.get_text(strip=True)
-        if t:
-            cat = t
-            break
-    return {"name": name, "link": link, "avatar_url": avatar, "subscribers": subs, "category": cat}
+    def __init__(self, ctx, memory_mb: int, max_tasks: int):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=scraping.parser_worker, args=(child, memory_mb, max_tasks), daemon=True)
+        self.process.start()
+        child.close()
+        self.tasks = 0
+        # wait out interpreter startup here, so the parse timeout only covers parsing
+        try:
+            self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(timeout=1)
+            self.conn.close()
+            raise HTTPException(502, detail=f"Parser worker failed to start (exit code {self.process.exitcode})")
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            with contextlib.suppress(OSError):
+                self.conn.send(None)
+        self.process.join(timeout=5)
+        self.conn.close()
 
 
-def parse_telemetr_html(html: str, base_url: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, "lxml")
-    candidates = soup.select('article, .card, .channel, .list-item, .ch-list, .list, .row, .col, div')
-    results = []
-    for c in candidates:
-        data = extract_card_generic(c, base_url)
-        if data:
-            results.append(data)
-    uniq = {}
-    for it in results:
-        uniq[it['link']] = it
-    return list(uniq.values())
-
-
-def parse_tgstat_html(html: str, base_url: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, "lxml")
-    results = []
-    for a in soup.select('a[href*="t.me"], a[href*="telegram.me"]'):
-        card = a
-        for _ in range(3):
-            if card.parent:
-                card = card.parent
-        data = extract_card_generic(card, base_url)
-        if data:
-            results.append(data)
-    for a in soup.select('a[href*="/channel/"]'):
-        href = a.get('href', '')
-        m = re.search(r"/@([A-Za-z0-9_]{4,})", href)
-        if not m:
-            continue
-        username = m.group(1)
-        card = a
-        for _ in range(3):
-            if card.parent:
-                card = card.parent
-        data = extract_card_generic(card, base_url)
-        if not data:
-            data = {"name": username, "link": f"https://t.me/{username}", "avatar_url": None, "subscribers": 0, "category": None}
-        else:
-            data['link'] = f"https://t.me/{username}"
-        results.append(data)
-    uniq = {}
-    for it in results:
-        uniq[it['link']] = it
-    return list(uniq.values())
+class ParserPool:
+    """Parses listing HTML in worker processes so BeautifulSoup never runs on the event loop.
 
+    The pool owns its worker processes, one parse at a time each. Workers are recycled after
+    `max_tasks_per_child` pages and capped at `memory_mb` of address space. A parse that
+    exceeds `timeout` (504) or whose worker dies (502) or runs out of memory (503) replaces
+    only that worker; parses running on the others are unaffected. With `workers=0` parsing
+    runs in a thread instead.
+    """
 
-def parse_telega_html(html: str, base_url: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html, "lxml")
-    results = []
-    for card in soup.select('article, .card, .channel, .list-item, .card-body, .row, div'):
-        data = extract_card_generic(card, base_url)
-        if data:
-            results.append(data)
-    uniq = {}
-    for it in results:
-        uniq[it['link']] = it
-    return list(uniq.values())
+    def __init__(self, workers: int, max_tasks_per_child: int = 50, timeout: float = 30.0, memory_mb: int = 512):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: List[_ParserProcess] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.recycled = 0
+
+    async def _acquire(self) -> _ParserProcess:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await asyncio.to_thread(_ParserProcess, self._ctx, self.memory_mb, self.max_tasks_per_child)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: _ParserProcess, healthy: bool) -> None:
+        if healthy and not (self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child):
+            self._idle.append(worker)
+        else:
+            # a worker that reached its task limit exits on its own; a broken one is killed
+            self.recycled += 1
+            worker.stop(kill=not healthy)
+        self._slots.release()
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` in a worker process; `fn` and its arguments must be picklable."""
+        if self.workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        worker = await self._acquire()
+        healthy = False
+        try:
+            await asyncio.to_thread(worker.conn.send, (fn, args))
+            status, payload = await asyncio.wait_for(asyncio.to_thread(worker.conn.recv), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(504, detail=f"Parse timed out after {self.timeout:g}s")
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            raise HTTPException(502, detail=f"Parser worker crashed (exit code {worker.process.exitcode})")
+        else:
+            worker.tasks += 1
+            if status == "oom":
+                raise HTTPException(503, detail=f"Parser worker ran out of memory ({self.memory_mb} MB limit)")
+            healthy = True
+            if status == "error":
+                raise payload
+            return payload
+        finally:
+            self._release(worker, healthy)
+
+    async def parse(self, source: str, html: str, base_url: str) -> List[Dict[str, Any]]:
+        return await self.call(scraping.parse_listing, source, html, base_url)
+
+    def shutdown(self) -> None:
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "idle": len(self._idle), "recycled": self.recycled}
+
+
+parser_pool = ParserPool(
+    workers=int(os.environ.get("PARSER_WORKERS", str(min(2, os.cpu_count() or 1)))),
+    max_tasks_per_child=int(os.environ.get("PARSER_MAX_TASKS_PER_CHILD", "50")),
+    timeout=float(os.environ.get("PARSER_TIMEOUT_SECONDS", "30")),
+    memory_mb=int(os.environ.get("PARSER_MEMORY_LIMIT_MB", "512")),
+)
 
-# -------------------- Parser endpoints --------------------
+# -------------------- Channel ingestion --------------------
 
-@api.post("/parser/telemetr")
-async def parse_telemetr(list_url: str, category: Optional[str] = None, limit: int = 50, user: Dict[str, Any] = Depends(get_current_admin)):
-    try:
-        resp = requests.get(list_url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
-        if resp.status_code != 200:
-            raise HTTPException(400, detail=f"Fetch failed: {resp.status_code}")
-        items = parse_telemetr_html(resp.text, list_url) if BeautifulSoup else []
-        inserted = 0
-        now = utcnow_iso()
-        for it in items[:limit]:
-            channel = {
-                "id": str(uuid.uuid4()),
-                "name": it.get("name") or "Без названия",
-                "link": it.get("link"),
-                "avatar_url": it.get("avatar_url"),
-                "subscribers": int(it.get("subscribers") or 0),
-                "category": category or it.get("category"),
-                "language": "Русский",
-                "short_description": None,
-                "seo_description": None,
-                "status": "draft",
-                "created_at": now,
-                "updated_at": now,
-            }
-            await db.channels.update_one({"link": channel["link"]}, {"$setOnInsert": prepare_for_mongo(channel)}, upsert=True)
-            inserted += 1
-        return {"ok": True, "inserted": inserted}
-    except Exception as e:
-        raise HTTPException(400, detail=str(e))
+def normalize_ingest_link(raw: Optional[str]) -> Optional[str]:
+    """The link to store for a pasted/scraped reference, or None if it isn't a Telegram link."""
+    link = (raw or "").strip()
+    if not link or any(c.isspace() for c in link):
+        return None
+    if not (link.startswith("http") or link.startswith("t.me")):
+        link = f"t.me/{link.removeprefix('@')}"
+    parsed = urlparse(link if "://" in link else f"https://{link}")
+    if (parsed.hostname or "").removeprefix("www.") not in _TG_HOSTS or not parsed.path.strip("/"):
+        return None
+    return link
 
-@api.post("/parser/tgstat")
-async def parse_tgstat(list_url: str, category: Optional[str] = None, limit: int = 50, user: Dict[str, Any] = Depends(get_current_admin)):
-    try:
-        resp = requests.get(list_url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
-        if resp.status_code != 200:
-            raise HTTPException(400, detail=f"Fetch failed: {resp.status_code}")
-        items = parse_tgstat_html(resp.text, list_url) if BeautifulSoup else []
-        inserted = 0
-        now = utcnow_iso()
-        for it in items[:limit]:
-            channel = {
-                "id": str(uuid.uuid4()),
-                "name": it.get("name") or "Без названия",
-                "link": it.get("link"),
-                "avatar_url": it.get("avatar_url"),
-                "subscribers": int(it.get("subscribers") or 0),
-                "category": category or it.get("category"),
-                "language": "Русский",
-                "short_description": None,
-                "seo_description": None,
-                "status": "draft",
-                "created_at": now,
-                "updated_at": now,
-            }
-            await db.channels.update_one({"link": channel["link"]}, {"$setOnInsert": prepare_for_mongo(channel)}, upsert=True)
-            inserted += 1
-        return {"ok": True, "inserted": inserted}
-    except Exception as e:
-        raise HTTPException(400, detail=str(e))
 
-@api.post("/parser/telega")
-async def parse_telega(list_url: str, category: Optional[str] = None, limit: int = 50, user: Dict[str, Any] = Depends(get_current_admin)):
-    try:
-        resp = requests.get(list_url, timeout=20, headers={"User-Agent": "Mozilla/5.0"})
-        if resp.status_code != 200:
-            raise HTTPException(400, detail=f"Fetch failed: {resp.status_code}")
-        items = parse_telega_html(resp.text, list_url) if BeautifulSoup else []
-        inserted = 0
-        now = utcnow_iso()
-        for it in items[:limit]:
-            channel = {
-                "id": str(uuid.uuid4()),
-                "name": it.get("name") or "Без названия",
-                "link": it.get("link"),
-                "avatar_url": it.get("avatar_url"),
-                "subscribers": int(it.get("subscribers") or 0),
-                "category": category or it.get("category"),
-                "language": "Русский",
-                "short_description": None,
-                "seo_description": None,
-                "status": "draft",
-                "created_at": now,
-                "updated_at": now,
-            }
-            await db.channels.update_one({"link": channel["link"]}, {"$setOnInsert": prepare_for_mongo(channel)}, upsert=True)
-            inserted += 1
-        return {"ok": True, "inserted": inserted}
-    except Exception as e:
-        raise HTTPException(400, detail=str(e))
+async def ingest_channels(items: List[Dict[str, Any]], category: Optional[str] = None, batch_size: int = 1000) -> Dict[str, Any]:
+    """Insert scraped/pasted channels as drafts, skipping links that already exist.
 
-@api.post("/parser/links")
-async def parse_links(payload: PasteLinksPayload, user: Dict[str, Any] = Depends(get_current_admin)):
-    if not payload.links:
-        return {"ok": True, "inserted": 0}
+    Links are deduplicated in memory by canonical username (first occurrence wins, as with
+    the old per-item upserts), then written as unordered `$setOnInsert` upserts in batches.
+    `inserted` counts documents actually created; `matched` those already present;
+    `invalid` non-empty entries that aren't Telegram links.
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
     now = utcnow_iso()
-    inserted = 0
-    for raw in payload.links:
-        link = (raw or "").strip()
+    seen = set()
+    ops = []
+    duplicates = invalid = 0
+    for it in items:
+        link = normalize_ingest_link(it.get("link"))
         if not link:
+            invalid += bool((it.get("link") or "").strip())
+            continue
+        norm = normalize_tg_username(link)
+        key = norm or link
+        if key in seen:
+            duplicates += 1
             continue
-        if not (link.startswith("http") or link.startswith("t.me")):
-            link = f"t.me/{link}"
-        name = link.rsplit('/', 1)[-1]
+        seen.add(key)
         channel = {
             "id": str(uuid.uuid4()),
-            "name": name,
+            "name": it.get("name") or link.rsplit('/', 1)[-1] or "Без названия",
             "link": link,
-            "avatar_url": None,
-            "subscribers": 0,
-            "category": payload.category,
+            "avatar_url": it.get("avatar_url"),
+            "subscribers": int(it.get("subscribers") or 0),
+            "category": category or it.get("category"),
             "language": "Русский",
             "short_description": None,
             "seo_description": None,
@@ -1119,48 +1906,560 @@ async def parse_links(payload: PasteLinksPayload, user: Dict[str, Any] = Depends
             "created_at": now,
             "updated_at": now,
         }
+        match = {"username_norm": norm} if norm else {"link": link}
+        ops.append(UpdateOne(match, {"$setOnInsert": prepare_channel_for_mongo(channel)}, upsert=True))
+    inserted = matched = errors = 0
+    for i in range(0, len(ops), batch_size):
         try:
-            await db.channels.update_one({"link": channel["link"]}, {"$setOnInsert": prepare_for_mongo(channel)}, upsert=True)
-            inserted += 1
-        except Exception as e:
-            print(f"Error inserting channel {channel['name']}: {e}")
-            continue
-    return {"ok": True, "inserted": inserted}
+            res = await db.channels.bulk_write(ops[i:i + batch_size], ordered=False)
+            inserted += res.upserted_count
+            matched += res.matched_count
+        except BulkWriteError as e:
+            inserted += e.details.get("nUpserted", 0)
+            matched += e.details.get("nMatched", 0)
+            errors += len(e.details.get("writeErrors", []))
+            logger.warning(f"Channel ingest batch had {len(e.details.get('writeErrors', []))} write errors")
+    if inserted:
+        notify_write("channels")
+    return {"ok": True, "inserted": inserted, "matched": matched, "duplicates": duplicates, "invalid": invalid, "errors": errors}
 
-# -------------------- Link checker & demo seed --------------------
+# -------------------- Channel import --------------------
 
-@api.post("/admin/links/check")
-async def check_links(limit: int = 100, replace_dead: bool = False, user: Dict[str, Any] = Depends(get_current_admin)):
-    cursor = db.channels.find({"status": {"$in": ["approved", "draft"]}}).sort("link_last_checked", 1).limit(limit)
-    items = await cursor.to_list(length=limit)
-    alive = dead = 0
-    now = utcnow_iso()
-    for ch in items:
-        link = ch.get("link", "")
-        if not link:
+IMPORT_COUNT_FIELDS = ("subscribers", "price_rub")
+IMPORT_FLOAT_FIELDS = ("er", "cpm_rub", "growth_30d")
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson", ".json")) or "json" in (content_type or ""):
+        return "jsonl"
+    return "csv"
+
+
+def iter_import_records(fileobj, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Lazily read an uploaded CSV/JSONL file as `(line, record, parse_error)` triples.
+
+    CSV needs a header row; the delimiter (`,`, `;` or tab) is taken from it, and empty cells
+    are treated as absent. `line` is where the record ends, so report lines match the file.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", errors="replace", newline="")
+    if fmt == "jsonl":
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+        return
+    header_line = text.readline()
+    delimiter = max(",;\t", key=header_line.count)
+    reader = csv.reader(itertools.chain([header_line], text), delimiter=delimiter)
+    header = [h.strip() for h in next(reader, [])]
+    for row in reader:
+        if not any(cell.strip() for cell in row):
             continue
-        url = link if link.startswith("http") else f"https://{link}"
-        status = "dead"
+        if len(row) > len(header):
+            yield reader.line_num, None, f"Expected {len(header)} columns, got {len(row)}"
+            continue
+        yield reader.line_num, {k: v.strip() for k, v in zip(header, row) if k and v.strip()}, None
+
+
+def _coerce_import_numbers(records: List[Dict[str, Any]]) -> None:
+    """Parse string counts ("12,5 тыс") and decimals ("4,2") column by column. Values that don't
+    parse are left as they are for validation to report."""
+    for fields, parse in ((IMPORT_COUNT_FIELDS, scraping.parse_counts), (IMPORT_FLOAT_FIELDS, scraping.parse_floats)):
+        for field in fields:
+            rows = [r for r in records if isinstance(r.get(field), str)]
+            if not rows:
+                continue
+            values, valid = parse([r[field] for r in rows])
+            for r, value, ok in zip(rows, values.tolist(), valid.tolist()):
+                if ok:
+                    r[field] = value
+
+
+def next_import_chunk(records: Iterator, size: int) -> Optional[Tuple[List[Tuple[int, ChannelCreate]], List[Dict[str, Any]]]]:
+    """Read and validate up to `size` records: `(valid, errors)`, or None once the input is exhausted."""
+    batch = list(itertools.islice(records, size))
+    if not batch:
+        return None
+    errors = [{"line": line, "errors": [{"field": None, "message": err}]} for line, _, err in batch if err]
+    parsed = [(line, record) for line, record, err in batch if not err]
+    _coerce_import_numbers([record for _, record in parsed])
+    valid = []
+    for line, record in parsed:
         try:
-            r = requests.head(url, timeout=8, allow_redirects=True)
-            if r.status_code < 400:
-                status = "alive"
-            else:
-                r2 = requests.get(url, timeout=8)
-                if r2.status_code < 400:
-                    status = "alive"
-        except Exception:
-            status = "dead"
-        updates = {"link_status": status, "link_last_checked": now, "updated_at": now}
-        if status == "dead":
-            updates["dead_at"] = now
-            if replace_dead:
-                updates["link"] = "#"
-            dead += 1
+            valid.append((line, ChannelCreate.model_validate(record)))
+        except ValidationError as e:
+            errors.append({"line": line, "errors": [
+                {"field": ".".join(str(p) for p in err["loc"]) or None, "message": err["msg"]} for err in e.errors()
+            ]})
+    return valid, errors
+
+
+def import_channel_op(payload: ChannelCreate, mode: str, default_status: str, now: str):
+    """UpdateOne for one imported record, matched on username_norm (or the link if it has none).
+
+    Upserts overwrite the columns present in the record and fill model defaults only on
+    insert. In "insert" mode existing channels are left untouched.
+    """
+    from pymongo import UpdateOne
+    present = payload.model_dump(exclude_unset=True)
+    # derived from the other columns, never imported
+    present.pop("growth_score", None)
+    present["link"] = normalize_ingest_link(payload.link) or payload.link
+    norm = normalize_tg_username(present["link"])
+    match = {"username_norm": norm} if norm else {"link": present["link"]}
+    full = {**payload.model_dump(), **present, "id": str(uuid.uuid4()), "created_at": now, "updated_at": now}
+    if "status" not in present:
+        full["status"] = default_status
+    if mode == "insert":
+        return match, UpdateOne(match, {"$setOnInsert": prepare_channel_for_mongo(full)}, upsert=True)
+    to_set = prepare_channel_for_mongo({**present, "updated_at": now})
+    on_insert = {k: v for k, v in prepare_channel_for_mongo(full).items() if k not in to_set}
+    return match, UpdateOne(match, {"$set": to_set, "$setOnInsert": on_insert}, upsert=True)
+
+
+async def import_channels(fileobj, fmt: str, mode: str = "upsert", default_status: str = "draft", chunk_size: int = 1000, max_errors: int = 500, dry_run: bool = False) -> Dict[str, Any]:
+    """Stream an uploaded CSV/JSONL file of channel records into the catalog.
+
+    Records are read, number-coerced and validated against ChannelCreate a chunk at a time in a
+    worker thread, so only one chunk is in memory. Each chunk is written with one unordered
+    bulk_write. Within a chunk the last record for a channel wins. Validation and write errors
+    are reported per line, up to `max_errors`.
+    """
+    from pymongo.errors import BulkWriteError
+    records = iter_import_records(fileobj, fmt)
+    report: Dict[str, Any] = {
+        "ok": True, "format": fmt, "dry_run": dry_run, "rows": 0, "valid": 0, "invalid": 0,
+        "inserted": 0, "updated": 0, "duplicates": 0, "errors": [], "errors_truncated": False,
+    }
+
+    def add_errors(errors: List[Dict[str, Any]]) -> None:
+        report["invalid"] += len(errors)
+        room = max_errors - len(report["errors"])
+        report["errors"].extend(errors[:max(room, 0)])
+        if len(errors) > room:
+            report["errors_truncated"] = True
+
+    while True:
+        chunk = await asyncio.to_thread(next_import_chunk, records, chunk_size)
+        if chunk is None:
+            break
+        valid, errors = chunk
+        report["rows"] += len(valid) + len(errors)
+        report["valid"] += len(valid)
+        now = utcnow_iso()
+        ops: Dict[str, Tuple[int, Any]] = {}
+        # upserts that set only some of the fields search_terms / growth_score derive from get them
+        # re-derived from the stored channel after the write
+        partial_text: List[Dict[str, Any]] = []
+        partial_score: List[Dict[str, Any]] = []
+        for line, payload in valid:
+            match, op = import_channel_op(payload, mode, default_status, now)
+            key = json.dumps(match, sort_keys=True)
+            if key in ops:
+                report["duplicates"] += 1
+            ops[key] = (line, op)
+            if mode == "upsert" and not payload.model_fields_set.issuperset(SEARCH_TEXT_FIELDS):
+                partial_text.append(match)
+            if mode == "upsert" and payload.model_fields_set & set(GROWTH_SCORE_FIELDS) and not payload.model_fields_set.issuperset(GROWTH_SCORE_FIELDS):
+                partial_score.append(match)
+        if ops and not dry_run:
+            lines = [line for line, _ in ops.values()]
+            try:
+                res = await db.channels.bulk_write([op for _, op in ops.values()], ordered=False)
+                report["inserted"] += res.upserted_count
+                report["updated"] += res.matched_count
+            except BulkWriteError as e:
+                report["inserted"] += e.details.get("nUpserted", 0)
+                report["updated"] += e.details.get("nMatched", 0)
+                write_errors = [{"line": lines[err["index"]], "errors": [{"field": None, "message": err.get("errmsg", "write failed")}]} for err in e.details.get("writeErrors", [])]
+                report["valid"] -= len(write_errors)
+                errors += write_errors
+            if partial_text:
+                await refresh_search_terms({"$or": partial_text})
+            if partial_score:
+                await refresh_growth_scores({"$or": partial_score})
+        add_errors(sorted(errors, key=lambda err: err["line"]))
+    if report["inserted"] or report["updated"]:
+        notify_write("channels")
+    return report
+
+
+@api.post("/admin/import/channels")
+async def admin_import_channels(
+    file: UploadFile = File(...),
+    fmt: Optional[Literal["csv", "jsonl"]] = Query(None, alias="format"),
+    mode: Literal["upsert", "insert"] = "upsert",
+    default_status: ChannelStatus = "draft",
+    dry_run: bool = False,
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    max_errors: int = Query(500, ge=0, le=50000),
+    user: Dict[str, Any] = Depends(get_current_admin),
+):
+    fmt = fmt or detect_import_format(file.filename, file.content_type)
+    try:
+        return await import_channels(file.file, fmt, mode, default_status, chunk_size, max_errors, dry_run)
+    finally:
+        await file.close()
+
+# -------------------- Page fetching --------------------
+
+class PageFetcher:
+    """Async fetching of scraper list pages over one pooled client.
+
+    Retries transport errors and 429/5xx with exponential backoff, revalidates pages it
+    has seen with ETag/Last-Modified (a 304 reuses the cached body), and aborts bodies
+    larger than `max_bytes` while streaming. `open_stream` hands out the raw response for
+    incremental parsing, capped at `stream_max_bytes` instead.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, timeout: float = 20.0, retries: int = 3, backoff: float = 0.5, max_bytes: int = 5_000_000, concurrency: int = 4, cache_size: int = 64, stream_max_bytes: int = 50_000_000):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_bytes = max_bytes
+        self.stream_max_bytes = stream_max_bytes
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self._client: Optional[httpx.AsyncClient] = None
+        self._validators: "OrderedDict[str, Tuple[Optional[str], Optional[str], str]]" = OrderedDict()
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "Mozilla/5.0"},
+                limits=httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _sleep_backoff(self, attempt: int, retry_after: Optional[str] = None) -> None:
+        delay = self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), 30.0))
+        await asyncio.sleep(delay)
+
+    async def fetch(self, url: str) -> str:
+        cached = self._validators.get(url)
+        for attempt in range(self.retries + 1):
+            headers = {}
+            if cached:
+                if cached[0]:
+                    headers["If-None-Match"] = cached[0]
+                if cached[1]:
+                    headers["If-Modified-Since"] = cached[1]
+            try:
+                async with self.client().stream("GET", url, headers=headers) as resp:
+                    if resp.status_code == 304 and cached:
+                        self._validators.move_to_end(url)
+                        return cached[2]
+                    if resp.status_code in self.RETRY_STATUSES and attempt < self.retries:
+                        await self._sleep_backoff(attempt, resp.headers.get("Retry-After"))
+                        continue
+                    if resp.status_code != 200:
+                        raise HTTPException(400, detail=f"Fetch failed: {resp.status_code}")
+                    declared = resp.headers.get("Content-Length")
+                    if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                        raise HTTPException(400, detail=f"Fetch failed: response larger than {self.max_bytes} bytes")
+                    body = bytearray()
+                    async for chunk in resp.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) > self.max_bytes:
+                            raise HTTPException(400, detail=f"Fetch failed: response larger than {self.max_bytes} bytes")
+                    text = bytes(body).decode(resp.charset_encoding or "utf-8", errors="replace")
+                    etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                    if etag or modified:
+                        self._validators[url] = (etag, modified, text)
+                        self._validators.move_to_end(url)
+                        while len(self._validators) > self.cache_size:
+                            self._validators.popitem(last=False)
+                    return text
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise HTTPException(400, detail=f"Fetch failed: {e.__class__.__name__}")
+                await self._sleep_backoff(attempt)
+        raise HTTPException(400, detail="Fetch failed: retries exhausted")
+
+    @contextlib.asynccontextmanager
+    async def open_stream(self, url: str):
+        """A 200 response for `url` with its body unread, retried like `fetch` until it is handed out."""
+        delivered = False
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.client().stream("GET", url) as resp:
+                    if resp.status_code in self.RETRY_STATUSES and attempt < self.retries:
+                        await self._sleep_backoff(attempt, resp.headers.get("Retry-After"))
+                        continue
+                    if resp.status_code != 200:
+                        raise HTTPException(400, detail=f"Fetch failed: {resp.status_code}")
+                    delivered = True
+                    yield resp
+                    return
+            except httpx.TransportError as e:
+                if delivered or attempt >= self.retries:
+                    raise HTTPException(400, detail=f"Fetch failed: {e.__class__.__name__}")
+                await self._sleep_backoff(attempt)
+        raise HTTPException(400, detail="Fetch failed: retries exhausted")
+
+    async def fetch_many(self, urls: List[str]) -> List[str]:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(u: str) -> str:
+            async with sem:
+                return await self.fetch(u)
+
+        return await asyncio.gather(*(one(u) for u in urls))
+
+
+page_fetcher = PageFetcher(
+    timeout=float(os.environ.get("PARSER_FETCH_TIMEOUT_SECONDS", "20")),
+    retries=int(os.environ.get("PARSER_FETCH_RETRIES", "3")),
+    max_bytes=int(os.environ.get("PARSER_FETCH_MAX_BYTES", str(5_000_000))),
+    concurrency=int(os.environ.get("PARSER_FETCH_CONCURRENCY", "4")),
+    stream_max_bytes=int(os.environ.get("PARSER_STREAM_MAX_BYTES", str(50_000_000))),
+)
+
+
+def list_page_urls(list_url: str, pages: int = 1) -> List[str]:
+    """Expand a listing URL to `pages` page URLs, via a `{page}` placeholder or a `page` query param."""
+    if "{page}" in list_url:
+        return [list_url.replace("{page}", str(n)) for n in range(1, pages + 1)]
+    urls = [list_url]
+    parsed = urlparse(list_url)
+    for n in range(2, pages + 1):
+        params = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != "page"]
+        params.append(("page", str(n)))
+        urls.append(parsed._replace(query=urlencode(params)).geturl())
+    return urls
+
+# -------------------- Parser endpoints --------------------
+
+async def stream_listing(source: str, url: str, limit: int) -> List[Dict[str, Any]]:
+    """Parse one listing page while it downloads and hang up once `limit` cards are found."""
+    async with page_fetcher.open_stream(url) as resp:
+        parser = scraping.StreamingCardParser(source, url, limit, resp.charset_encoding or "utf-8")
+        received = 0
+        async for chunk in resp.aiter_bytes():
+            received += len(chunk)
+            if received > page_fetcher.stream_max_bytes:
+                raise HTTPException(400, detail=f"Fetch failed: response larger than {page_fetcher.stream_max_bytes} bytes")
+            await asyncio.to_thread(parser.feed, chunk)
+            if parser.done:
+                break
         else:
-            alive += 1
-        await db.channels.update_one({"id": ch["id"]}, {"$set": updates})
-    return {"ok": True, "checked": len(items), "alive": alive, "dead": dead}
+            await asyncio.to_thread(parser.close)
+    return parser.cards
+
+
+async def run_parser(
+    source: str,
+    list_url: str,
+    category: Optional[str] = None,
+    limit: int = 50,
+    pages: int = 1,
+    stream: bool = False,
+    on_progress: Optional[Callable[..., Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    urls = list_page_urls(list_url, pages)
+    if stream and scraping.PARSERS[source].streamable:
+        # pages in order, so a satisfied limit skips the remaining downloads entirely
+        items: List[Dict[str, Any]] = []
+        for n, url in enumerate(urls, 1):
+            items.extend(await stream_listing(source, url, limit - len(items)))
+            if on_progress:
+                await on_progress(pages=n, total_pages=len(urls), items=len(items))
+            if len(items) >= limit:
+                break
+    else:
+        # anchor-based sources (tgstat) need the whole page
+        htmls = await page_fetcher.fetch_many(urls)
+        parsed = await asyncio.gather(*(parser_pool.parse(source, html, url) for url, html in zip(urls, htmls)))
+        items = [it for page_items in parsed for it in page_items]
+        if on_progress:
+            await on_progress(pages=len(urls), total_pages=len(urls), items=len(items))
+    return await ingest_channels(items[:limit], category)
+
+@api.post("/parser/links")
+async def parse_links(payload: PasteLinksPayload, user: Dict[str, Any] = Depends(get_current_admin)):
+    if not payload.links:
+        return {"ok": True, "inserted": 0}
+    return await ingest_channels([{"link": raw} for raw in payload.links], payload.category)
+
+# registered after /parser/links so that literal path keeps its own handler
+@api.post("/parser/{source}")
+async def parse_source(source: str, list_url: str, category: Optional[str] = None, limit: int = 50, pages: int = Query(1, ge=1, le=20), stream: bool = False, background: bool = False, user: Dict[str, Any] = Depends(get_current_admin)):
+    if source not in scraping.PARSERS:
+        raise HTTPException(404, detail=f"Unknown parser source: {source}")
+    if background:
+        return await submit_job("parser", {"source": source, "list_url": list_url, "category": category, "limit": limit, "pages": pages, "stream": stream}, user)
+    try:
+        return await run_parser(source, list_url, category, limit, pages, stream)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(400, detail=str(e))
+
+# -------------------- Link checker & demo seed --------------------
+
+class AsyncRateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart across all callers."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class LinkChecker:
+    """Concurrent liveness checks over one pooled HTTP client.
+
+    HEAD first; on an error status or failure, fall back to a GET with `Range: bytes=0-0`
+    whose body is never read; a timeout counts as dead. Concurrency is capped globally and
+    per host, and requests are spaced by a global rate limit. Nearly every channel link is
+    on t.me, so the per-host cap defaults to the global one and `rate_per_sec` is what keeps
+    the checker polite.
+    """
+
+    def __init__(self, concurrency: int = 50, per_host: Optional[int] = None, rate_per_sec: float = 20.0, timeout: float = 8.0):
+        self.concurrency = concurrency
+        self.per_host = per_host or concurrency
+        self.timeout = timeout
+        self._global = asyncio.Semaphore(concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._rate = AsyncRateLimiter(rate_per_sec)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "LinkChecker":
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": "Mozilla/5.0"},
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def check(self, link: str) -> str:
+        url = link if link.startswith("http") else f"https://{link}"
+        host = urlparse(url).hostname or ""
+        sem = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with self._global, sem:
+            try:
+                await self._rate.acquire()
+                r = await self._client.head(url)
+                if r.status_code < 400:
+                    return "alive"
+            except Exception:
+                pass
+            try:
+                await self._rate.acquire()
+                async with self._client.stream("GET", url, headers={"Range": "bytes=0-0"}) as r:
+                    return "alive" if r.status_code < 400 else "dead"
+            except Exception:
+                return "dead"
+
+    async def check_many(self, links: List[str]) -> List[str]:
+        return await asyncio.gather(*(self.check(link) for link in links))
+
+
+def link_checker_from_env() -> LinkChecker:
+    return LinkChecker(
+        concurrency=int(os.environ.get("LINK_CHECK_CONCURRENCY", "50")),
+        per_host=int(os.environ.get("LINK_CHECK_PER_HOST", "0")) or None,
+        rate_per_sec=float(os.environ.get("LINK_CHECK_RATE_PER_SEC", "20")),
+        timeout=float(os.environ.get("LINK_CHECK_TIMEOUT_SECONDS", "8")),
+    )
+
+
+async def run_link_check(
+    limit: int,
+    replace_dead: bool = False,
+    batch_size: int = 500,
+    on_batch: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    totals: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Check the `limit` least recently checked channels, writing each batch with one bulk_write.
+
+    Checked channels get a fresh `link_last_checked`, so repeated runs walk the whole catalog
+    and an interrupted run resumes by passing its last `totals` back in. Channels already
+    checked since the run started are skipped, so each is checked at most once per run.
+    """
+    from pymongo import UpdateOne
+    totals = totals or {}
+    checked, alive, dead = totals.get("checked", 0), totals.get("alive", 0), totals.get("dead", 0)
+    started_at = totals.get("started_at") or utcnow_iso()
+    async with link_checker_from_env() as checker:
+        while checked < limit:
+            size = min(batch_size, limit - checked)
+            cursor = db.channels.find(
+                {
+                    "status": {"$in": ["approved", "draft"]},
+                    # "#" is the placeholder replace_dead leaves behind
+                    "link": {"$nin": [None, "", "#"]},
+                    "link_last_checked": {"$not": {"$gte": started_at}},
+                },
+                {"id": 1, "link": 1},
+            ).sort("link_last_checked", 1).limit(size)
+            batch = await cursor.to_list(length=size)
+            if not batch:
+                break
+            statuses = await checker.check_many([ch["link"] for ch in batch])
+            now = utcnow_iso()
+            ops = []
+            for ch, status in zip(batch, statuses):
+                updates = {"link_status": status, "link_last_checked": now, "updated_at": now}
+                if status == "dead":
+                    updates["dead_at"] = now
+                    if replace_dead:
+                        updates["link"] = "#"
+                    dead += 1
+                else:
+                    alive += 1
+                ops.append(UpdateOne({"id": ch["id"]}, {"$set": prepare_channel_for_mongo(updates)}))
+            await db.channels.bulk_write(ops, ordered=False)
+            notify_write("channels", [ch["id"] for ch in batch])
+            checked += len(batch)
+            if on_batch:
+                await on_batch({"checked": checked, "alive": alive, "dead": dead, "started_at": started_at})
+            if len(batch) < size:
+                break
+    return {"ok": True, "checked": checked, "alive": alive, "dead": dead}
+
+@api.post("/admin/links/check")
+async def check_links(limit: int = 100, replace_dead: bool = False, background: bool = False, user: Dict[str, Any] = Depends(get_current_admin)):
+    if background:
+        return await submit_job("links.check", {"limit": limit, "replace_dead": replace_dead}, user)
+    return await run_link_check(limit, replace_dead)
 
 @api.post("/admin/seed-demo")
 async def seed_demo(user: Dict[str, Any] = Depends(get_current_admin)):
@@ -1189,42 +2488,38 @@ async def seed_demo(user: Dict[str, Any] = Depends(get_current_admin)):
             "created_at": now,
             "updated_at": now,
         }
+        norm = normalize_tg_username(s["link"])
         try:
-            await db.channels.update_one({"link": s["link"]}, {"$setOnInsert": prepare_for_mongo(doc)}, upsert=True)
+            await db.channels.update_one({"username_norm": norm} if norm else {"link": s["link"]}, {"$setOnInsert": prepare_channel_for_mongo(doc)}, upsert=True)
             inserted += 1
         except Exception as e:
             print(f"Error inserting demo channel {s['name']}: {e}")
             continue
+    notify_write("channels")
     return {"ok": True, "inserted": inserted}
 
 # -------------------- Creators Endpoints --------------------
 
-@api.get("/creators", response_model=PaginatedCreators)
-async def list_creators(
-    q: Optional[str] = Query(None, description="Search in name and tags"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    language: Optional[str] = Query(None, description="Filter by language"),
-    country: Optional[str] = Query(None, description="Filter by country"),
-    subscribers_min: Optional[int] = Query(None, description="Minimum total subscribers"),
-    subscribers_max: Optional[int] = Query(None, description="Maximum total subscribers"),
-    price_min: Optional[int] = Query(None, description="Minimum price"),
-    price_max: Optional[int] = Query(None, description="Maximum price"),
-    er_min: Optional[float] = Query(None, description="Minimum ER percentage"),
-    er_max: Optional[float] = Query(None, description="Maximum ER percentage"),
-    cpm_max: Optional[int] = Query(None, description="Maximum CPM"),
-    has_price: Optional[bool] = Query(None, description="Filter creators with price"),
-    featured: Optional[bool] = Query(None, description="Filter featured creators"),
-    verified: Optional[bool] = Query(None, description="Filter verified creators"),
-    priority_level: Optional[PriorityLevel] = Query(None, description="Filter by priority level"),
-    last_post_days_max: Optional[int] = Query(None, description="Maximum days since last post"),
-    tags: Optional[List[str]] = Query(None, description="Filter by tags"),
-    sort: str = Query("subscribers", description="Sort field: name|created_at|subscribers|price|er|cpm|last_post"),
-    order: str = Query("desc", description="Sort order: asc|desc"),
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(24, ge=1, le=50, description="Items per page")
-):
-    """List creators with filtering, sorting and pagination"""
-    # Build query
+def build_creators_query(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    language: Optional[str] = None,
+    country: Optional[str] = None,
+    subscribers_min: Optional[int] = None,
+    subscribers_max: Optional[int] = None,
+    price_min: Optional[int] = None,
+    price_max: Optional[int] = None,
+    er_min: Optional[float] = None,
+    er_max: Optional[float] = None,
+    cpm_max: Optional[int] = None,
+    has_price: Optional[bool] = None,
+    featured: Optional[bool] = None,
+    verified: Optional[bool] = None,
+    priority_level: Optional[str] = None,
+    last_post_days_max: Optional[int] = None,
+    tags: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Mongo filter for the creator catalog filters (active creators only)."""
     query = {"flags.active": True}
     
     if q:
@@ -1274,7 +2569,38 @@ async def list_creators(
         query["metrics.last_post_at_min"] = {"$gte": cutoff_date.isoformat()}
     if tags:
         query["tags"] = {"$in": tags}
-    
+    return query
+
+@api.get("/creators", response_model=PaginatedCreators)
+async def list_creators(
+    q: Optional[str] = Query(None, description="Search in name and tags"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    language: Optional[str] = Query(None, description="Filter by language"),
+    country: Optional[str] = Query(None, description="Filter by country"),
+    subscribers_min: Optional[int] = Query(None, description="Minimum total subscribers"),
+    subscribers_max: Optional[int] = Query(None, description="Maximum total subscribers"),
+    price_min: Optional[int] = Query(None, description="Minimum price"),
+    price_max: Optional[int] = Query(None, description="Maximum price"),
+    er_min: Optional[float] = Query(None, description="Minimum ER percentage"),
+    er_max: Optional[float] = Query(None, description="Maximum ER percentage"),
+    cpm_max: Optional[int] = Query(None, description="Maximum CPM"),
+    has_price: Optional[bool] = Query(None, description="Filter creators with price"),
+    featured: Optional[bool] = Query(None, description="Filter featured creators"),
+    verified: Optional[bool] = Query(None, description="Filter verified creators"),
+    priority_level: Optional[PriorityLevel] = Query(None, description="Filter by priority level"),
+    last_post_days_max: Optional[int] = Query(None, description="Maximum days since last post"),
+    tags: Optional[List[str]] = Query(None, description="Filter by tags"),
+    sort: str = Query("subscribers", description="Sort field: name|created_at|subscribers|price|er|cpm|last_post"),
+    order: str = Query("desc", description="Sort order: asc|desc"),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(24, ge=1, le=50, description="Items per page")
+):
+    """List creators with filtering, sorting and pagination"""
+    query = build_creators_query(
+        q, category, language, country, subscribers_min, subscribers_max, price_min, price_max,
+        er_min, er_max, cpm_max, has_price, featured, verified, priority_level, last_post_days_max, tags,
+    )
+
     # Build sort
     sort_field_map = {
         "name": "name",
@@ -1290,7 +2616,7 @@ async def list_creators(
     sort_order = -1 if order == "desc" else 1
     
     # Execute queries
-    total = await db.creators.count_documents(query)
+    total, total_exact = await count_cache.count(db.creators, query, group_field="category", base={"flags.active": True})
     skip = (page - 1) * limit
     
     cursor = db.creators.find(query).sort(sort_field, sort_order).skip(skip).limit(limit)
@@ -1320,11 +2646,13 @@ async def list_creators(
             "page": page,
             "limit": limit,
             "total": total,
+            "total_exact": total_exact,
             "pages": (total + limit - 1) // limit
         }
     )
 
 @api.get("/creators/suggestions")
+@cached_endpoint(ttl=60, tags=("creators",))
 async def get_creator_suggestions(
     limit: int = Query(6, ge=1, le=20, description="Number of suggestions"),
     featured_only: bool = Query(False, description="Only return featured/premium creators"),
@@ -1372,6 +2700,7 @@ async def get_creator_suggestions(
     return {"items": creators}
 
 @api.get("/creators/{id_or_slug}", response_model=CreatorResponse)
+@cached_endpoint(ttl=60, tags=("creators", "channels"))
 async def get_creator(
     id_or_slug: str,
     include: Optional[str] = Query(None, description="Include channels: 'channels'")
@@ -1458,6 +2787,7 @@ async def create_creator(
         if "slug" in str(e):
             raise HTTPException(400, detail="Slug already exists")
         raise HTTPException(400, detail="Creator creation failed")
+    notify_write("creators", [creator_data["id"]])
     
     return CreatorResponse(**creator_data)
 
@@ -1496,6 +2826,7 @@ async def update_creator(
         if "slug" in str(e):
             raise HTTPException(400, detail="Slug already exists")
         raise HTTPException(400, detail="Creator update failed")
+    notify_write("creators", [creator_id])
     
     # Return updated creator
     updated_creator = await db.creators.find_one({"id": creator_id})
@@ -1537,6 +2868,7 @@ async def delete_creator(
             {"id": creator_id},
             {"$set": {"flags.active": False, "updated_at": utcnow_iso()}}
         )
+    notify_write("creators", [creator_id])
     
     return {"ok": True, "deleted": "hard" if hard else "soft"}
 
@@ -1629,6 +2961,7 @@ async def verify_creator(
         {"id": creator_id},
         {"$set": {"flags.verified": payload.verified, "updated_at": utcnow_iso()}}
     )
+    notify_write("creators", [creator_id])
     
     return {"ok": True, "verified": payload.verified}
 
@@ -1654,6 +2987,7 @@ async def feature_creator(
         {"id": creator_id},
         {"$set": update_data}
     )
+    notify_write("creators", [creator_id])
     
     return {"ok": True, "priority_level": payload.priority_level}
 
@@ -1707,13 +3041,18 @@ async def get_creator_suggestions(
 @api.post("/admin/creators/seed")
 async def seed_creators(
     count: int = Query(10, description="Number of creators to create (10 or 100)"),
+    background: bool = Query(False, description="Run as a background job and return its id"),
     user: Dict[str, Any] = Depends(get_current_admin)
 ):
     """Seed demo creators with links to existing channels for this admin"""
     if count not in [10, 100]:
         count = 10
     owner_id = user.get("id") if isinstance(user, dict) else None
-    
+    if background:
+        return await submit_job("seed.creators", {"count": count, "owner_id": owner_id}, user)
+    return await run_seed_creators(count, owner_id)
+
+async def run_seed_creators(count: int, owner_id: Optional[str], on_progress: Optional[Callable[..., Awaitable[None]]] = None) -> Dict[str, Any]:
     # Get existing approved channels to link to creators
     # Prefer channels owned by this admin if available
     channels = await db.channels.find({"status": "approved", "owner_id": owner_id}).to_list(length=100)
@@ -2119,6 +3458,8 @@ async def seed_creators(
     
     # Create creators and link to channels
     for i, creator_template in enumerate(demo_creators[:count]):
+        if on_progress:
+            await on_progress(done=i, total=min(count, len(demo_creators)))
         slug = await ensure_unique_slug(generate_slug(creator_template["name"]))
         
         creator_data = {
@@ -2160,12 +3501,18 @@ async def seed_creators(
         except Exception as e:
             print(f"Error creating creator {creator_template['name']}: {e}")
             continue
+    notify_write("creators")
     
     return {"ok": True, "created": created}
 
 @api.post("/admin/seed-all")
-async def seed_all(user: Dict[str, Any] = Depends(get_current_admin)):
+async def seed_all(background: bool = False, user: Dict[str, Any] = Depends(get_current_admin)):
     """Seed test users if needed, attach ALL existing channels to admin with username, approve them, and create 3 channels for each test user."""
+    if background:
+        return await submit_job("seed.all", {}, user)
+    return await run_seed_all()
+
+async def run_seed_all(on_progress: Optional[Callable[..., Awaitable[None]]] = None) -> Dict[str, Any]:
     now = utcnow_iso()
     # Ensure users exist
     async def ensure_user(email: str, password: str, role: str) -> Dict[str, Any]:
@@ -2176,7 +3523,7 @@ async def seed_all(user: Dict[str, Any] = Depends(get_current_admin)):
         await db.users.insert_one({
             "id": uid,
             "email": email,
-            "password_hash": pwd_ctx.hash(password),
+            "password_hash": await password_hasher.hash(password),
             "role": role,
             "created_at": now,
             "updated_at": now,
@@ -2194,12 +3541,17 @@ async def seed_all(user: Dict[str, Any] = Depends(get_current_admin)):
         uname = (ch.get("username") or "").strip()
         if not uname and link:
             uname = link.replace("https://t.me/", "").replace("http://t.me/", "").replace("t.me/", "").replace("@", "").strip("/")
+        # username_norm is left alone: the backfill nulls it on duplicate channels, and
+        # re-deriving it here would collide with the unique index
         await db.channels.update_one({"id": ch["id"]}, {"$set": {"owner_id": admin["id"], "status": "approved", "updated_at": now, "username": uname}})
         updated += 1
+        if on_progress and updated % 100 == 0:
+            await on_progress(updated_existing=updated)
 
     # Helper to create a channel if not exists by link
     async def ensure_channel(link: str, name: str, owner_id: str, **extra):
-        existing = await db.channels.find_one({"link": link})
+        norm = normalize_tg_username(link)
+        existing = await db.channels.find_one({"username_norm": norm} if norm else {"link": link})
         if existing:
             return existing["id"]
         uname = link.replace("https://t.me/", "").replace("http://t.me/", "").replace("t.me/", "").replace("@", "").strip("/")
@@ -2226,7 +3578,7 @@ async def seed_all(user: Dict[str, Any] = Depends(get_current_admin)):
             "created_at": now,
             "updated_at": now,
         }
-        await db.channels.insert_one(prepare_for_mongo(doc))
+        await db.channels.insert_one(prepare_channel_for_mongo(doc))
         return doc["id"]
 
     created = 0
@@ -2235,12 +3587,586 @@ async def seed_all(user: Dict[str, Any] = Depends(get_current_admin)):
         (u2, [("https://t.me/demo_u2_biz", "User2 Бизнес"), ("https://t.me/demo_u2_crypto", "User2 Крипто"), ("https://t.me/demo_u2_life", "User2 Lifestyle")]),
         (u3, [("https://t.me/demo_u3_marketing", "User3 Маркетинг"), ("https://t.me/demo_u3_fin", "User3 Финансы"), ("https://t.me/demo_u3_city", "User3 Афиша")]),
     ]:
+        if on_progress:
+            await on_progress(updated_existing=updated, created_for_users=created)
         for link, name in chans:
             await ensure_channel(link, name, user_doc["id"], category="Новости")
             created += 1
+    notify_write("users")
+    notify_write("channels")
 
     return {"ok": True, "updated_existing": updated, "created_for_users": created}
 
+# -------------------- Export --------------------
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+def export_columns(model: type, prefix: str = "", exclude: Tuple[str, ...] = ()) -> List[Tuple[str, str]]:
+    """Flat `(column, kind)` list for a model; nested models become dotted columns and
+    lists are exported as JSON strings."""
+    columns: List[Tuple[str, str]] = []
+    for name, field in model.model_fields.items():
+        if name in exclude:
+            continue
+        ann = field.annotation
+        if get_origin(ann) is Union:
+            args = [a for a in get_args(ann) if a is not type(None)]
+            ann = args[0] if len(args) == 1 else ann
+        if isinstance(ann, type) and issubclass(ann, BaseModel):
+            columns.extend(export_columns(ann, f"{prefix}{name}."))
+        elif ann in (int, float, bool):
+            columns.append((prefix + name, ann.__name__))
+        elif ann is str or get_origin(ann) is Literal:
+            columns.append((prefix + name, "str"))
+        else:
+            columns.append((prefix + name, "json"))
+    return columns
+
+
+def _export_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if kind == "json":
+        return json.dumps(value, ensure_ascii=False, default=str)
+    try:
+        return {"int": int, "float": float, "bool": bool, "str": str}[kind](value)
+    except (TypeError, ValueError):
+        return None
+
+
+def export_row(doc: Dict[str, Any], columns: List[Tuple[str, str]]) -> List[Any]:
+    row = []
+    for name, kind in columns:
+        value: Any = doc
+        for part in name.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        row.append(_export_value(value, kind))
+    return row
+
+
+async def cursor_batches(cursor, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    try:
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        await cursor.close()
+
+
+async def ndjson_export(batches: AsyncIterator[List[Dict[str, Any]]], columns: List[Tuple[str, str]]) -> AsyncIterator[bytes]:
+    async for docs in batches:
+        yield "".join(json.dumps(d, ensure_ascii=False, default=str) + "\n" for d in docs).encode("utf-8")
+
+
+async def csv_export(batches: AsyncIterator[List[Dict[str, Any]]], columns: List[Tuple[str, str]]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([name for name, _ in columns])
+    async for docs in batches:
+        writer.writerows(export_row(d, columns) for d in docs)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file that hands its bytes out as they are written, for streaming Parquet."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.pos = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self.chunks)
+        self.chunks = []
+        return out
+
+
+async def parquet_export(batches: AsyncIterator[List[Dict[str, Any]]], columns: List[Tuple[str, str]]) -> AsyncIterator[bytes]:
+    types = {"int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(), "str": pa.string(), "json": pa.string()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    async for docs in batches:
+        rows = [export_row(d, columns) for d in docs]
+        arrays = [pa.array([r[i] for r in rows], type=schema.field(i).type) for i in range(len(columns))]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {"ndjson": ndjson_export, "csv": csv_export, "parquet": parquet_export}
+
+
+def export_response(collection, query: Dict[str, Any], model: type, fmt: str, name: str, exclude: Tuple[str, ...] = ()) -> StreamingResponse:
+    """Stream every document matching `query` in `fmt`.
+
+    Documents are read from one cursor in EXPORT_BATCH_SIZE batches and encoded batch by
+    batch, so memory stays flat whatever the collection size. Only the model's fields are
+    exported.
+    """
+    if fmt == "parquet" and pa is None:
+        raise HTTPException(400, detail="Parquet export requires pyarrow")
+    columns = export_columns(model, exclude=exclude)
+    projection = {"_id": 0, **{f: 1 for f in model.model_fields if f not in exclude}}
+    cursor = collection.find(query, projection).sort("id", 1).batch_size(EXPORT_BATCH_SIZE)
+    body = EXPORT_WRITERS[fmt](cursor_batches(cursor, EXPORT_BATCH_SIZE), columns)
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%d}.{fmt}"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[fmt], headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@api.get("/admin/export/channels")
+async def export_channels(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    owner_id: Optional[str] = None,
+    status: Optional[ChannelStatus] = Query(None, description="Default: all statuses"),
+    search: Literal["auto", "text", "prefix"] = "auto",
+    regex: bool = False,
+    min_subscribers: Optional[int] = Query(None, ge=0),
+    max_subscribers: Optional[int] = Query(None, ge=0),
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    min_er: Optional[float] = Query(None, ge=0),
+    max_er: Optional[float] = Query(None, ge=0),
+    only_featured: Optional[bool] = False,
+    only_alive: Optional[bool] = False,
+    user: Dict[str, Any] = Depends(get_current_admin_reader),
+):
+    query, _ = build_channels_query(
+        q, category, owner_id, status, search, regex, min_subscribers, max_subscribers,
+        min_price, max_price, min_er, max_er, only_featured, only_alive,
+    )
+    return export_response(db.channels, query, ChannelResponse, format, "channels")
+
+
+@api.get("/admin/export/creators")
+async def export_creators(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    language: Optional[str] = None,
+    country: Optional[str] = None,
+    subscribers_min: Optional[int] = None,
+    subscribers_max: Optional[int] = None,
+    price_min: Optional[int] = None,
+    price_max: Optional[int] = None,
+    er_min: Optional[float] = None,
+    er_max: Optional[float] = None,
+    cpm_max: Optional[int] = None,
+    has_price: Optional[bool] = None,
+    featured: Optional[bool] = None,
+    verified: Optional[bool] = None,
+    priority_level: Optional[PriorityLevel] = None,
+    last_post_days_max: Optional[int] = None,
+    tags: Optional[List[str]] = Query(None),
+    user: Dict[str, Any] = Depends(get_current_admin_reader),
+):
+    query = build_creators_query(
+        q, category, language, country, subscribers_min, subscribers_max, price_min, price_max,
+        er_min, er_max, cpm_max, has_price, featured, verified, priority_level, last_post_days_max, tags,
+    )
+    return export_response(db.creators, query, CreatorResponse, format, "creators", exclude=("channels",))
+
+
+# -------------------- Trending --------------------
+
+GROWTH_SCORE_INTERVAL_SECONDS = float(os.environ.get("GROWTH_SCORE_INTERVAL_SECONDS", "3600"))
+GROWTH_SCORE_HALF_LIFE_DAYS = 7.0
+GROWTH_SCORE_FEATURED_BONUS = 1000.0
+# channel fields compute_growth_score reads
+GROWTH_SCORE_FIELDS = ("growth_30d", "er", "last_post_at", "is_featured")
+
+
+def parse_iso(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def compute_growth_score(channel: Dict[str, Any], now: datetime) -> float:
+    """Trending score: 0.5 * growth_30d + 0.3 * (5 * ER) + 0.2 * post recency, each capped at 100.
+
+    Recency is 100 for a post right now and halves every GROWTH_SCORE_HALF_LIFE_DAYS.
+    Featured channels get GROWTH_SCORE_FEATURED_BONUS on top, so they always lead.
+    """
+    def clamp(value: Any, scale: float = 1.0) -> float:
+        return min(max(float(value or 0) * scale, 0.0), 100.0) if isinstance(value, (int, float)) else 0.0
+
+    recency = 0.0
+    last_post = parse_iso(channel.get("last_post_at"))
+    if last_post is not None:
+        days = max((now - last_post).total_seconds() / 86400, 0.0)
+        recency = 100.0 * 0.5 ** (days / GROWTH_SCORE_HALF_LIFE_DAYS)
+    score = 0.5 * clamp(channel.get("growth_30d")) + 0.3 * clamp(channel.get("er"), 5.0) + 0.2 * recency
+    if channel.get("is_featured"):
+        score += GROWTH_SCORE_FEATURED_BONUS
+    return round(score, 3)
+
+
+async def refresh_growth_scores(query: Dict[str, Any], batch_size: int = 500) -> int:
+    """Rescore channels matching `query` after a partial write, so they don't wait for the next scheduled run."""
+    from pymongo import UpdateOne
+    now = datetime.now(timezone.utc)
+    updated = 0
+    ops = []
+    projection = {"growth_score": 1, **{f: 1 for f in GROWTH_SCORE_FIELDS}}
+    async for ch in db.channels.find(query, projection):
+        score = compute_growth_score(ch, now)
+        if ch.get("growth_score") != score:
+            ops.append(UpdateOne({"_id": ch["_id"]}, {"$set": {"growth_score": score}}))
+        if len(ops) >= batch_size:
+            updated += (await db.channels.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await db.channels.bulk_write(ops, ordered=False)).modified_count
+    return updated
+
+
+async def run_growth_scores(batch_size: int = 1000, on_progress: Optional[Callable[..., Awaitable[None]]] = None) -> Dict[str, Any]:
+    """Recompute growth_score for approved channels, writing only the scores that changed.
+
+    Writes already score the channel they touch; this pass only applies recency decay.
+    """
+    from pymongo import UpdateOne
+    now = datetime.now(timezone.utc)
+    scanned = updated = 0
+    ops: List[Any] = []
+    projection = {"_id": 0, "id": 1, "growth_score": 1, **{f: 1 for f in GROWTH_SCORE_FIELDS}}
+    async for ch in db.channels.find({"status": "approved"}, projection).batch_size(batch_size):
+        scanned += 1
+        score = compute_growth_score(ch, now)
+        if ch.get("growth_score") == score:
+            continue
+        ops.append(UpdateOne({"id": ch["id"]}, {"$set": {"growth_score": score}}))
+        if len(ops) >= batch_size:
+            updated += (await db.channels.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+            if on_progress:
+                await on_progress(scanned=scanned, updated=updated)
+    if ops:
+        updated += (await db.channels.bulk_write(ops, ordered=False)).modified_count
+    if updated:
+        # scores don't feed creator metrics or facets; only the read caches need dropping
+        count_cache.invalidate("channels")
+        response_cache.invalidate("channels")
+    return {"scanned": scanned, "updated": updated}
+
+
+# -------------------- Background jobs --------------------
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+class JobSubmitPayload(BaseModel):
+    type: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class JobCancelled(Exception):
+    pass
+
+class JobContext:
+    """Handed to job handlers: params, the last saved checkpoint, and a progress reporter.
+
+    Cancellation is checked in progress(), so a running job stops at its next progress call;
+    handlers pass ctx.progress as `on_progress` to the loops they run.
+    """
+
+    def __init__(self, runner: "JobRunner", job: Dict[str, Any]):
+        self.runner = runner
+        self.id = job["id"]
+        self.params = job.get("params") or {}
+        self.checkpoint = job.get("checkpoint") or {}
+
+    async def progress(self, checkpoint: Optional[Dict[str, Any]] = None, **progress) -> None:
+        """Persist progress (and a checkpoint to resume from); raises JobCancelled if cancel was requested."""
+        updates: Dict[str, Any] = {"updated_at": utcnow_iso(), "lease_until": self.runner.lease_deadline()}
+        if progress:
+            updates["progress"] = progress
+        if checkpoint is not None:
+            updates["checkpoint"] = checkpoint
+            self.checkpoint = checkpoint
+        from pymongo import ReturnDocument
+        doc = await db.jobs.find_one_and_update(
+            {"id": self.id}, {"$set": updates}, projection={"cancel_requested": 1}, return_document=ReturnDocument.AFTER
+        )
+        if not doc or doc.get("cancel_requested"):
+            raise JobCancelled()
+
+
+JobHandler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+JOB_HANDLERS: Dict[str, Tuple[JobHandler, bool]] = {}
+
+def job_handler(job_type: str, resumable: bool = False):
+    """Register a job type. Resumable handlers are re-queued with their checkpoint after a crash;
+    others are marked failed."""
+    def decorator(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = (fn, resumable)
+        return fn
+    return decorator
+
+
+class JobRunner:
+    """Runs jobs from the `jobs` collection on a few asyncio workers per process.
+
+    Jobs are claimed with an atomic queued→running update and hold a lease that a
+    heartbeat renews, so several uvicorn workers can share the queue. A job whose lease
+    expires (its process died) is re-queued if its handler is resumable.
+    """
+
+    def __init__(self, workers: int = 2, lease_seconds: int = 60, poll_seconds: float = 2.0):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{os.uname().nodename}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def lease_deadline(self) -> str:
+        return (datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)).isoformat()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def recover(self) -> None:
+        """Re-queue or fail running jobs whose lease has expired."""
+        now = utcnow_iso()
+        async for job in db.jobs.find({"status": "running", "lease_until": {"$lt": now}}, {"id": 1, "type": 1}):
+            _, resumable = JOB_HANDLERS.get(job.get("type"), (None, False))
+            if resumable:
+                updates = {"status": "queued", "updated_at": now}
+            else:
+                updates = {"status": "failed", "error": "Interrupted by worker restart", "finished_at": now, "updated_at": now}
+            await db.jobs.update_one({"id": job["id"], "status": "running", "lease_until": {"$lt": now}}, {"$set": updates})
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        from pymongo import ReturnDocument
+        now = utcnow_iso()
+        return await db.jobs.find_one_and_update(
+            {"status": "queued"},
+            {"$set": {"status": "running", "worker": self.worker_id, "started_at": now, "updated_at": now, "lease_until": self.lease_deadline()}, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                await self.recover()
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job poll failed: {e}")
+                job = None
+            if not job:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # the job keeps its lease until recover() picks it up; the worker carries on
+                logger.warning(f"Job {job.get('id')} status update failed: {e}")
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await db.jobs.update_one({"id": job_id, "status": "running"}, {"$set": {"lease_until": self.lease_deadline()}})
+            except Exception as e:
+                logger.warning(f"Job {job_id} heartbeat failed: {e}")
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        handler, _ = JOB_HANDLERS.get(job.get("type"), (None, False))
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        updates: Dict[str, Any]
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type: {job.get('type')}")
+            result = await handler(JobContext(self, job))
+            updates = {"status": "succeeded", "result": result}
+        except JobCancelled:
+            updates = {"status": "cancelled"}
+        except asyncio.CancelledError:
+            # shutting down: expire the lease so recover() re-queues or fails it right away
+            await db.jobs.update_one({"id": job["id"]}, {"$set": {"lease_until": utcnow_iso()}})
+            raise
+        except HTTPException as e:
+            updates = {"status": "failed", "error": str(e.detail)}
+        except Exception as e:
+            logger.exception(f"Job {job['id']} ({job.get('type')}) failed")
+            updates = {"status": "failed", "error": str(e)}
+        finally:
+            heartbeat.cancel()
+        now = utcnow_iso()
+        updates.update({"finished_at": now, "updated_at": now})
+        await db.jobs.update_one({"id": job["id"]}, {"$set": updates})
+
+
+job_runner = JobRunner(workers=int(os.environ.get("JOB_WORKERS", "2")))
+
+async def submit_job(job_type: str, params: Dict[str, Any], user: Optional[Dict[str, Any]] = None, dedupe_key: Optional[str] = None) -> Dict[str, Any]:
+    """Queue a job. Jobs sharing a `dedupe_key` are queued once, enforced by a unique index."""
+    from pymongo.errors import DuplicateKeyError
+    if job_type not in JOB_HANDLERS:
+        raise HTTPException(400, detail=f"Unknown job type: {job_type}")
+    now = utcnow_iso()
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "params": params,
+        "status": "queued",
+        "progress": {},
+        "checkpoint": {},
+        "attempts": 0,
+        "cancel_requested": False,
+        "created_by": (user or {}).get("id"),
+        "created_at": now,
+        "updated_at": now,
+    }
+    if dedupe_key:
+        job["dedupe_key"] = dedupe_key
+    try:
+        await db.jobs.insert_one(job)
+    except DuplicateKeyError:
+        existing = await db.jobs.find_one({"dedupe_key": dedupe_key}, {"id": 1, "status": 1})
+        return {"ok": True, "job_id": (existing or {}).get("id"), "status": (existing or {}).get("status"), "duplicate": True}
+    job_runner.wake()
+    return {"ok": True, "job_id": job["id"], "status": "queued"}
+
+@job_handler("links.check", resumable=True)
+async def _job_check_links(ctx: JobContext) -> Dict[str, Any]:
+    async def on_batch(totals: Dict[str, Any]) -> None:
+        await ctx.progress(checkpoint=totals, done=totals["checked"], total=ctx.params.get("limit"))
+    return await run_link_check(
+        int(ctx.params.get("limit", 100)), bool(ctx.params.get("replace_dead")), on_batch=on_batch, totals=ctx.checkpoint
+    )
+
+@job_handler("parser")
+async def _job_parser(ctx: JobContext) -> Dict[str, Any]:
+    p = ctx.params
+    return await run_parser(p["source"], p["list_url"], p.get("category"), int(p.get("limit", 50)), int(p.get("pages", 1)), bool(p.get("stream", False)), on_progress=ctx.progress)
+
+@job_handler("seed.creators")
+async def _job_seed_creators(ctx: JobContext) -> Dict[str, Any]:
+    return await run_seed_creators(int(ctx.params.get("count", 10)), ctx.params.get("owner_id"), on_progress=ctx.progress)
+
+@job_handler("creators.metrics")
+async def _job_creator_metrics(ctx: JobContext) -> Dict[str, Any]:
+    ids = ctx.params.get("creator_ids")
+    # one aggregation: cancellable until it starts, not while it runs
+    await ctx.progress()
+    await recompute_creators_metrics(list(ids) if ids is not None else None)
+    return {"ok": True}
+
+@job_handler("channels.growth_score")
+async def _job_growth_scores(ctx: JobContext) -> Dict[str, Any]:
+    return await run_growth_scores(int(ctx.params.get("batch_size", 1000)), on_progress=ctx.progress)
+
+async def queue_growth_scores(now: Optional[float] = None) -> Dict[str, Any]:
+    """Queue this interval's channels.growth_score job; every worker may call it, one job is queued."""
+    slot = int((time.time() if now is None else now) // GROWTH_SCORE_INTERVAL_SECONDS)
+    return await submit_job("channels.growth_score", {}, dedupe_key=f"channels.growth_score:{slot}")
+
+async def schedule_growth_scores() -> None:
+    """Queue a channels.growth_score job at the start of every GROWTH_SCORE_INTERVAL_SECONDS slot."""
+    while True:
+        try:
+            await queue_growth_scores()
+        except Exception as e:
+            logger.warning(f"Growth score scheduling failed: {e}")
+        await asyncio.sleep(GROWTH_SCORE_INTERVAL_SECONDS - time.time() % GROWTH_SCORE_INTERVAL_SECONDS)
+
+@job_handler("seed.all")
+async def _job_seed_all(ctx: JobContext) -> Dict[str, Any]:
+    return await run_seed_all(on_progress=ctx.progress)
+
+@api.post("/admin/jobs")
+async def admin_submit_job(payload: JobSubmitPayload, user: Dict[str, Any] = Depends(get_current_admin)):
+    return await submit_job(payload.type, payload.params, user)
+
+@api.get("/admin/jobs")
+async def admin_list_jobs(
+    status: Optional[JobStatus] = None,
+    job_type: Optional[str] = Query(None, alias="type"),
+    limit: int = Query(50, ge=1, le=200),
+    user: Dict[str, Any] = Depends(get_current_admin_reader),
+):
+    query: Dict[str, Any] = {}
+    if status:
+        query["status"] = status
+    if job_type:
+        query["type"] = job_type
+    items = await db.jobs.find(query).sort("created_at", -1).limit(limit).to_list(length=limit)
+    return {"items": [parse_from_mongo(j) for j in items]}
+
+@api.get("/admin/jobs/{job_id}")
+async def admin_get_job(job_id: str, user: Dict[str, Any] = Depends(get_current_admin_reader)):
+    job = await db.jobs.find_one({"id": job_id})
+    if not job:
+        raise HTTPException(404, detail="Job not found")
+    return parse_from_mongo(job)
+
+@api.post("/admin/jobs/{job_id}/cancel")
+async def admin_cancel_job(job_id: str, user: Dict[str, Any] = Depends(get_current_admin)):
+    now = utcnow_iso()
+    res = await db.jobs.update_one({"id": job_id, "status": "queued"}, {"$set": {"status": "cancelled", "cancel_requested": True, "finished_at": now, "updated_at": now}})
+    if res.matched_count == 0:
+        res = await db.jobs.update_one({"id": job_id, "status": "running"}, {"$set": {"cancel_requested": True, "updated_at": now}})
+    if res.matched_count == 0:
+        job = await db.jobs.find_one({"id": job_id})
+        if not job:
+            raise HTTPException(404, detail="Job not found")
+        return {"ok": False, "status": job.get("status")}
+    return {"ok": True}
+
 # -------------------- App wiring --------------------
 
 app.include_router(api)
@@ -2254,11 +4180,350 @@ app.add_middleware(
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+# httpx logs every request at INFO, which floods the log during link checks
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+async def backfill_username_norm(batch_size: int = 500) -> Dict[str, int]:
+    """One-off: set `username_norm` on channels written before it existed.
+
+    Oldest channels claim a username first; later rows with the same canonical username
+    get `username_norm: null` (kept out of the unique index) and are logged for cleanup.
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+    updated = duplicates = 0
+
+    async def flush(ops: List[UpdateOne], ids: List[Any]) -> None:
+        nonlocal updated, duplicates
+        try:
+            res = await db.channels.bulk_write(ops, ordered=False)
+            updated += res.modified_count
+        except BulkWriteError as e:
+            updated += e.details.get("nModified", 0)
+            failed = [ids[err["index"]] for err in e.details.get("writeErrors", []) if err.get("code") == 11000]
+            if failed:
+                duplicates += len(failed)
+                await db.channels.update_many({"_id": {"$in": failed}}, {"$set": {"username_norm": None}})
+                logger.warning(f"username_norm backfill: {len(failed)} duplicate channels left without username_norm")
+
+    ops: List[UpdateOne] = []
+    ids: List[Any] = []
+    cursor = db.channels.find({"username_norm": {"$exists": False}}, {"link": 1, "username": 1}).sort("created_at", 1)
+    async for ch in cursor:
+        norm = normalize_tg_username(ch.get("link")) or normalize_tg_username(ch.get("username"))
+        ops.append(UpdateOne({"_id": ch["_id"]}, {"$set": {"username_norm": norm}}))
+        ids.append(ch["_id"])
+        if len(ops) >= batch_size:
+            await flush(ops, ids)
+            ops, ids = [], []
+    if ops:
+        await flush(ops, ids)
+    if updated or duplicates:
+        notify_write("channels")
+    return {"updated": updated, "duplicates": duplicates}
+
+# -------------------- Migrations --------------------
+
+class MigrationError(RuntimeError):
+    pass
+
+
+Migration = Tuple[int, str, Callable[[], Awaitable[Any]]]
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, name: str):
+    """Register a one-off schema/data migration; run_migrations() applies each version once, in order."""
+    def decorator(fn: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+async def create_spec_index(collection: str, name: str) -> None:
+    """Create one INDEX_SPECS index now, for migrations that depend on it."""
+    for coll, keys, options in INDEX_SPECS:
+        if coll == collection and index_name(keys, options) == name:
+            await db[collection].create_index(keys, **options)
+            return
+    raise KeyError(f"{collection}.{name}")
+
+
+@migration(1, "backfill_search_terms")
+async def _migrate_search_terms() -> None:
+    # populate `search_terms` on channels written before prefix search existed
+    await refresh_search_terms({"search_terms": {"$exists": False}})
+
+@migration(2, "backfill_username_norm")
+async def _migrate_username_norm() -> Dict[str, int]:
+    # duplicates are detected by the unique index, so it has to exist first
+    await create_spec_index("channels", "channels_username_norm_unique")
+    return await backfill_username_norm()
+
+@migration(3, "rebuild_creator_metrics")
+async def _migrate_creator_metrics() -> None:
+    # the pipeline ends in $merge on `id`, which MongoDB refuses without a unique index
+    await create_spec_index("creators", "id_1")
+    await recompute_creators_metrics()
+
+@migration(4, "compute_growth_scores")
+async def _migrate_growth_scores() -> Dict[str, Any]:
+    return await run_growth_scores()
+
+@migration(5, "search_terms_with_descriptions")
+async def _migrate_search_terms_descriptions() -> Dict[str, int]:
+    updated = await refresh_search_terms({})
+    count_cache.invalidate("channels")
+    response_cache.invalidate("channels")
+    return {"updated": updated}
+
+@migration(6, "drop_unlisted_indexes")
+async def _migrate_drop_unlisted_indexes() -> Dict[str, Any]:
+    # the (status, <sort>) compounds replace the single-field sort indexes, so build
+    # the declared set before dropping what it superseded
+    await sync_indexes()
+    return await drop_unlisted_indexes()
+
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def applied_migrations() -> Dict[int, Dict[str, Any]]:
+    return {d["version"]: d async for d in db.migrations.find({"kind": "migration"}, {"_id": 0})}
+
+
+def current_schema_version(applied: Dict[int, Dict[str, Any]]) -> int:
+    """Highest version up to which every migration has been applied."""
+    version = 0
+    for v, _, _ in MIGRATIONS:
+        if applied.get(v, {}).get("status") != "applied":
+            break
+        version = v
+    return version
+
+
+async def run_migrations() -> List[Dict[str, Any]]:
+    """Apply pending migrations in version order, recording each in `migrations`.
+
+    The first failure is recorded with its error and raised as MigrationError; later
+    migrations are not attempted.
+    """
+    applied = await applied_migrations()
+    ran = []
+    for version, name, fn in MIGRATIONS:
+        if applied.get(version, {}).get("status") == "applied":
+            continue
+        key = f"{version:04d}_{name}"
+        record: Dict[str, Any] = {"kind": "migration", "version": version, "name": name, "started_at": utcnow_iso()}
+        started = time.monotonic()
+        logger.info(f"Applying migration {key}")
+        try:
+            result = await fn()
+        except Exception as e:
+            record.update(status="failed", error=f"{type(e).__name__}: {e}", finished_at=utcnow_iso())
+            await db.migrations.replace_one({"_id": key}, record, upsert=True)
+            raise MigrationError(f"Migration {key} failed: {e}") from e
+        record.update(
+            status="applied",
+            finished_at=utcnow_iso(),
+            duration_ms=int((time.monotonic() - started) * 1000),
+            result=result if isinstance(result, dict) else None,
+        )
+        await db.migrations.replace_one({"_id": key}, record, upsert=True)
+        ran.append(record)
+    return ran
+
+
+async def sync_indexes() -> Dict[str, Any]:
+    """Create every INDEX_SPECS index, one at a time, and record the outcome of each.
+
+    A failing index (e.g. a conflicting definition) is logged as an error and reported by
+    /admin/migrations; it doesn't stop the others from being built.
+    """
+    results = []
+    for collection, keys, options in INDEX_SPECS:
+        entry: Dict[str, Any] = {"collection": collection, "name": index_name(keys, options), "keys": keys}
+        try:
+            await db[collection].create_index(keys, **options)
+            entry["status"] = "ready"
+        except Exception as e:
+            entry.update(status="failed", error=str(e))
+            logger.error(f"Index {collection}.{entry['name']} failed to build: {e}")
+        results.append(entry)
+    doc = {
+        "kind": "indexes",
+        "version": index_specs_version(),
+        "indexes": results,
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "updated_at": utcnow_iso(),
+    }
+    await db.migrations.replace_one({"_id": "indexes"}, doc, upsert=True)
+    return doc
+
+
+async def index_builds_in_progress() -> set:
+    """(collection, index name) pairs being built right now; empty if `$currentOp` isn't permitted."""
+    try:
+        ops = await client.admin.aggregate([
+            {"$currentOp": {"allUsers": True}},
+            {"$match": {"command.createIndexes": {"$exists": True}}},
+        ]).to_list(length=None)
+    except Exception:
+        return set()
+    return {(op["command"]["createIndexes"], ix.get("name")) for op in ops for ix in op["command"].get("indexes", [])}
+
+
+async def unlisted_indexes() -> List[Dict[str, Any]]:
+    """Indexes on INDEX_SPECS collections that INDEX_SPECS doesn't declare (other than `_id_`)."""
+    declared: Dict[str, set] = {}
+    for collection, keys, options in INDEX_SPECS:
+        declared.setdefault(collection, set()).add(index_name(keys, options))
+    out = []
+    for collection, names in declared.items():
+        for name, info in (await db[collection].index_information()).items():
+            if name != "_id_" and name not in names:
+                out.append({"collection": collection, "name": name, "keys": info.get("key")})
+    return out
+
+
+async def drop_unlisted_indexes() -> Dict[str, Any]:
+    """Drop the indexes unlisted_indexes() reports, e.g. ones a newer INDEX_SPECS entry superseded."""
+    dropped = []
+    for entry in await unlisted_indexes():
+        await db[entry["collection"]].drop_index(entry["name"])
+        logger.info(f"Dropped index {entry['collection']}.{entry['name']}")
+        dropped.append(f"{entry['collection']}.{entry['name']}")
+    return {"dropped": dropped}
+
+
+async def index_status() -> List[Dict[str, Any]]:
+    """Each INDEX_SPECS index as ready, building, failed (with the recorded error) or missing."""
+    recorded = await db.migrations.find_one({"_id": "indexes"}) or {}
+    errors = {(r["collection"], r["name"]): r.get("error") for r in recorded.get("indexes", []) if r.get("status") == "failed"}
+    building = await index_builds_in_progress()
+    live: Dict[str, Dict[str, Any]] = {}
+    out = []
+    for collection, keys, options in INDEX_SPECS:
+        if collection not in live:
+            live[collection] = await db[collection].index_information()
+        name = index_name(keys, options)
+        entry: Dict[str, Any] = {"collection": collection, "name": name, "keys": keys}
+        if name in live[collection]:
+            entry["status"] = "ready"
+        elif (collection, name) in building:
+            entry["status"] = "building"
+        elif (collection, name) in errors:
+            entry.update(status="failed", error=errors[(collection, name)])
+        else:
+            entry["status"] = "missing"
+        out.append(entry)
+    return out
+
+
+async def migration_status() -> Dict[str, Any]:
+    applied = await applied_migrations()
+    recorded = await db.migrations.find_one({"_id": "indexes"}, {"version": 1, "updated_at": 1}) or {}
+    indexes = await index_status()
+    unlisted = await unlisted_indexes()
+    return {
+        "schema_version": current_schema_version(applied),
+        "target_schema_version": SCHEMA_VERSION,
+        "migrations": [{"version": v, "name": n, **(applied.get(v) or {"status": "pending"})} for v, n, _ in MIGRATIONS],
+        "index_specs_version": index_specs_version(),
+        "index_specs_version_synced": recorded.get("version"),
+        "indexes_synced_at": recorded.get("updated_at"),
+        "indexes_not_ready": [f"{i['collection']}.{i['name']}" for i in indexes if i["status"] != "ready"],
+        "indexes": indexes,
+        "indexes_unlisted": [f"{i['collection']}.{i['name']}" for i in unlisted],
+    }
+
+
+async def check_schema_version() -> int:
+    """Boot-time check (one query): raise MigrationError if the database is behind this build."""
+    version = current_schema_version(await applied_migrations())
+    if version < SCHEMA_VERSION:
+        raise MigrationError(
+            f"Database schema is at version {version}, this build needs {SCHEMA_VERSION}: run `python manage.py migrate`"
+        )
+    return version
+
+
+@contextlib.asynccontextmanager
+async def migration_lock(owner: str, lease_seconds: float = 120.0, wait_seconds: float = 600.0):
+    """Hold the `migrations` lock document so only one process migrates or seeds at a time.
+
+    The lease is renewed while held, so a crashed holder blocks others for at most
+    `lease_seconds`. Raises MigrationError if the lock isn't acquired within `wait_seconds`.
+    """
+    from pymongo.errors import DuplicateKeyError
+    holder = f"{owner}@{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def lease() -> Dict[str, Any]:
+        return {"kind": "lock", "holder": holder, "expires_at": (datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)).isoformat()}
+
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        try:
+            await db.migrations.update_one(
+                {"_id": "lock", "$or": [{"expires_at": {"$lt": utcnow_iso()}}, {"holder": holder}]},
+                {"$set": lease()},
+                upsert=True,
+            )
+            break
+        except DuplicateKeyError:
+            if time.monotonic() >= deadline:
+                current = await db.migrations.find_one({"_id": "lock"}) or {}
+                raise MigrationError(f"Migration lock is held by {current.get('holder')} until {current.get('expires_at')}")
+            await asyncio.sleep(1.0)
+
+    async def renew() -> None:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            await db.migrations.update_one({"_id": "lock", "holder": holder}, {"$set": lease()})
+
+    renewer = asyncio.create_task(renew())
+    try:
+        yield holder
+    finally:
+        renewer.cancel()
+        await db.migrations.delete_one({"_id": "lock", "holder": holder})
+
+
+async def migrate(owner: str = "startup", wait_seconds: float = 600.0, indexes: bool = True) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Apply pending migrations, then build the spec indexes, under the migration lock."""
+    async with migration_lock(owner, wait_seconds=wait_seconds):
+        ran = await run_migrations()
+        synced = await sync_indexes() if indexes else None
+    return ran, synced
+
+def env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
+
+scheduled_tasks: List[asyncio.Task] = []
 
 @app.on_event("startup")
 async def on_startup():
-    await create_indexes()
+    # Migrations, index builds and seeding are done by `python manage.py migrate|seed`;
+    # workers only check that the database is at this build's schema version.
+    # Single-process dev setups can opt back in with MIGRATE_ON_STARTUP / SEED_ON_STARTUP;
+    # index builds stay in manage.py migrate either way (apart from those a migration needs).
+    if env_flag("MIGRATE_ON_STARTUP") and current_schema_version(await applied_migrations()) < SCHEMA_VERSION:
+        await migrate(indexes=False)
+    if env_flag("SEED_ON_STARTUP"):
+        async with migration_lock("startup seed"):
+            await seed_test_users()
+    await check_schema_version()
+    job_runner.start()
+    scheduled_tasks.append(asyncio.create_task(schedule_growth_scores()))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in scheduled_tasks:
+        task.cancel()
+    await job_runner.stop()
+    await creator_metrics_queue.drain()
+    await page_fetcher.aclose()
+    parser_pool.shutdown()
     client.close()
\ No newline at end of file
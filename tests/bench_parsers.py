@@ -0,0 +1,111 @@
+"""Listing-parser benchmark: `python tests/bench_parsers.py [cards] [depth]`.
+
+Builds a synthetic listing with `cards` channel cards, each wrapped in `depth` extra divs, and
+times the current parsers against the pre-CardIndex extractor (kept below for comparison).
+"""
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import scraping  # noqa: E402
+
+
+def legacy_extract(card, base_url):
+    a = card.select_one('a[href*="t.me"], a[href*="telegram.me"]')
+    if a and a.get('href'):
+        link = a.get('href').strip()
+    else:
+        m = re.search(r"@([A-Za-z0-9_]{4,})", card.get_text(" ", strip=True))
+        link = f"https://t.me/{m.group(1)}" if m else None
+    if not link:
+        return {}
+    name = None
+    for sel in ['.title', 'h3', 'h2', 'h4', 'a', '.name']:
+        el = card.select_one(sel)
+        if el and el.get_text(strip=True):
+            name = el.get_text(strip=True)
+            break
+    img = card.select_one('img')
+    avatar = scraping.absolutize(img.get('src') if img else None, base_url)
+    # subscriber counts use the current number grammar, so only card discovery is compared
+    m2 = scraping._SUBS_RE.search(card.get_text(" ", strip=True).lower())
+    cat = None
+    for el in card.select('.tag, .badge, .label, .category, [class*="tag"], [class*="badge"], [class*="category"]'):
+        if el.get_text(strip=True):
+            cat = el.get_text(strip=True)
+            break
+    return {"name": name or link.rsplit('/', 1)[-1], "link": link, "avatar_url": avatar,
+            "subscribers": scraping.to_int(m2.group(1)) if m2 else 0, "category": cat}
+
+
+def legacy_parse_telemetr(html, base_url):
+    soup = BeautifulSoup(html, "lxml")
+    uniq = {}
+    for c in soup.select('article, .card, .channel, .list-item, .ch-list, .list, .row, .col, div'):
+        data = legacy_extract(c, base_url)
+        if data:
+            uniq[data['link']] = data
+    return list(uniq.values())
+
+
+def listing_page(cards: int, depth: int) -> str:
+    body = []
+    for i in range(cards):
+        card = (
+            f'<article class="card"><img src="/a/{i}.jpg"><h3 class="title">Channel {i}</h3>'
+            f'<a href="https://t.me/channel_{i:05d}">open</a><span class="badge">Cat {i % 7}</span>'
+            f'<div class="stats">{1000 + i} подписчиков</div></article>'
+        )
+        body.append("<div class='col'>" * depth + card + "</div>" * depth)
+    return "<html><body><div class='list'>" + "".join(body) + "</div></body></html>"
+
+
+def tgstat_page(cards: int, depth: int) -> str:
+    body = []
+    for i in range(cards):
+        card = (
+            f'<div class="card peer-item-box"><div class="card-body">'
+            f'<a href="https://tgstat.ru/channel/@channel_{i:05d}"><img src="/a/{i}.jpg"><h4>Channel {i}</h4></a>'
+            f'<div class="font-12">{1000 + i} подписчиков</div><span class="badge">Cat {i % 7}</span></div></div>'
+        )
+        body.append("<div class='col'>" * depth + card + "</div>" * depth)
+    return "<html><body><div class='row'>" + "".join(body) + "</div></body></html>"
+
+
+PAGE_BUILDERS = {"tgstat": tgstat_page}
+
+
+def bench(label, fn, html, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(html, "https://bench.test/")
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:<22} {best * 1000:9.1f} ms  {len(out)} cards")
+    return out
+
+
+def chunks_of(raw: bytes, size: int = 65536):
+    return (raw[i:i + size] for i in range(0, len(raw), size))
+
+
+if __name__ == "__main__":
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"{cards} cards per page, wrapper depth {depth}")
+    for source, parser in scraping.PARSERS.items():
+        html = PAGE_BUILDERS.get(source, listing_page)(cards, depth)
+        bench(source, lambda h, base, source=source: scraping.parse_listing(source, h, base), html)
+        if parser.streamable:
+            raw = html.encode()
+            bench(f"{source} (stream)", lambda h, base, source=source: scraping.parse_listing_stream(source, chunks_of(raw), base, None, "utf-8"), html)
+            bench(f"{source} (stream, 50)", lambda h, base, source=source: scraping.parse_listing_stream(source, chunks_of(raw), base, 50, "utf-8"), html)
+    html = listing_page(cards, depth)
+    new = bench("telemetr", lambda h, base: scraping.parse_listing("telemetr", h, base), html)
+    old = bench("telemetr (legacy)", legacy_parse_telemetr, html)
+    assert new == old, "CardIndex output diverged from the legacy extractor"
@@ -0,0 +1,58 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the catalog sites the parsers scrape.
+
+    Routes are registered per test on `server.routes` as path -> callable(handler)
+    returning (status, headers, body); HEAD requests get the headers only
+    (`handler.command` tells them apart). `server.hits` counts requests per path.
+    """
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def _respond(self, body):
+        path = self.path.split("?", 1)[0]
+        self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        route = self.server.routes.get(self.path) or self.server.routes.get(path)
+        if route is None:
+            status, headers, payload = 404, {}, b"not found"
+        else:
+            status, headers, payload = route(self)
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        if "Content-Length" not in headers:
+            self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if body:
+            self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.routes = {}
+    server.hits = {}
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
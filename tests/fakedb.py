@@ -0,0 +1,413 @@
+"""In-memory stand-in for the Motor database the backend talks to.
+
+Covers the filter operators, sort order (null < numbers < strings), updates, unique
+indexes and bulk writes the server issues. Anything else raises NotImplementedError so
+a test fails loudly instead of passing against behaviour MongoDB doesn't have.
+"""
+import copy
+import itertools
+import re
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+MISSING = object()
+_ids = itertools.count(1)
+
+
+def get_path(doc, path):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def set_path(doc, path, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+
+def type_rank(value):
+    if value is MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    raise NotImplementedError(type(value))
+
+
+def sort_key(value):
+    rank = type_rank(value)
+    return (rank, None if rank == 1 else value)
+
+
+def equals(value, cond):
+    if cond is None:
+        return value is MISSING or value is None
+    if isinstance(value, list) and not isinstance(cond, list):
+        return cond in value
+    return value is not MISSING and value == cond
+
+
+def compare(value, op, arg):
+    values = value if isinstance(value, list) else [value]
+    for v in values:
+        if v is MISSING or type_rank(v) != type_rank(arg):
+            continue
+        if (op == "$gt" and v > arg) or (op == "$gte" and v >= arg) or (op == "$lt" and v < arg) or (op == "$lte" and v <= arg):
+            return True
+    return False
+
+
+def match_value(value, cond):
+    if not (isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond)):
+        return equals(value, cond)
+    for op, arg in cond.items():
+        if op == "$eq":
+            ok = equals(value, arg)
+        elif op == "$ne":
+            ok = not equals(value, arg)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = compare(value, op, arg)
+        elif op == "$in":
+            ok = any(equals(value, a) for a in arg)
+        elif op == "$nin":
+            ok = not any(equals(value, a) for a in arg)
+        elif op == "$exists":
+            ok = (value is not MISSING) == bool(arg)
+        elif op == "$not":
+            ok = not match_value(value, arg)
+        elif op == "$type":
+            ok = arg == "string" and isinstance(value, str)
+        elif op == "$regex":
+            flags = re.I if "i" in cond.get("$options", "") else 0
+            values = value if isinstance(value, list) else [value]
+            ok = any(isinstance(v, str) and re.search(arg, v, flags) for v in values)
+        elif op == "$options":
+            ok = True
+        else:
+            raise NotImplementedError(op)
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc, query):
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            ok = any(matches(doc, q) for q in cond)
+        elif key == "$and":
+            ok = all(matches(doc, q) for q in cond)
+        elif key.startswith("$"):
+            raise NotImplementedError(key)
+        else:
+            ok = match_value(get_path(doc, key), cond)
+        if not ok:
+            return False
+    return True
+
+
+def project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    projection = {k: v for k, v in projection.items() if not isinstance(v, dict)}
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+def sort_docs(docs, spec):
+    for field, direction in reversed(spec):
+        if isinstance(direction, dict):
+            continue
+        docs.sort(key=lambda d: sort_key(get_path(d, field)), reverse=direction == -1)
+    return docs
+
+
+class Result:
+    def __init__(self, **counts):
+        self.inserted_count = counts.get("inserted", 0)
+        self.matched_count = counts.get("matched", 0)
+        self.modified_count = counts.get("modified", 0)
+        self.upserted_count = counts.get("upserted", 0)
+        self.upserted_id = counts.get("upserted_id")
+        self.inserted_id = counts.get("inserted_id")
+
+
+class Cursor:
+    def __init__(self, load, projection=None):
+        self._load = load
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def _docs(self):
+        # sort before projecting: MongoDB sorts on fields the projection leaves out
+        docs = sort_docs(self._load(), self._sort)[self._skip:]
+        docs = docs[:self._limit] if self._limit else docs
+        return [project(d, self._projection) for d in docs]
+
+    async def to_list(self, length=None):
+        docs = self._docs()
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self._docs():
+                yield doc
+        return gen()
+
+
+class Collection:
+    def __init__(self, name):
+        self.name = name
+        self.docs = []
+        self.indexes = {}
+
+    # -- indexes --
+
+    async def create_index(self, keys, **options):
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = options.get("name") or "_".join(f"{f}_{d}" for f, d in keys)
+        self.indexes[name] = (keys, options)
+        return name
+
+    async def index_information(self):
+        info = {"_id_": {"key": [("_id", 1)]}}
+        for name, (keys, options) in self.indexes.items():
+            info[name] = {"key": keys, **{k: v for k, v in options.items() if k != "name"}}
+        return info
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+    def _check_unique(self, doc, skip=None):
+        for name, (keys, options) in self.indexes.items():
+            if not options.get("unique"):
+                continue
+            partial = options.get("partialFilterExpression")
+            if partial and not matches(doc, partial):
+                continue
+            key = [get_path(doc, f) for f, _ in keys]
+            for other in self.docs:
+                if other is skip or (partial and not matches(other, partial)):
+                    continue
+                if [get_path(other, f) for f, _ in keys] == key:
+                    raise DuplicateKeyError(f"E11000 duplicate key error index: {name}", 11000)
+
+    # -- reads --
+
+    def find(self, query=None, projection=None, **kwargs):
+        return Cursor(lambda: [d for d in self.docs if matches(d, query)], projection)
+
+    async def find_one(self, query=None, projection=None, **kwargs):
+        for doc in self.docs:
+            if matches(doc, query):
+                return project(doc, projection)
+        return None
+
+    async def count_documents(self, query):
+        return sum(1 for d in self.docs if matches(d, query))
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def distinct(self, field, query=None):
+        out = []
+        for doc in self.docs:
+            value = get_path(doc, field)
+            if matches(doc, query) and value is not MISSING and value not in out:
+                out.append(value)
+        return out
+
+    def aggregate(self, pipeline):
+        def load():
+            docs = [copy.deepcopy(d) for d in self.docs]
+            for stage in pipeline:
+                (op, arg), = stage.items()
+                if op == "$match":
+                    docs = [d for d in docs if matches(d, arg)]
+                elif op == "$group" and set(arg) == {"_id", "n"} and arg["n"] == {"$sum": 1}:
+                    groups = {}
+                    for d in docs:
+                        key = get_path(d, arg["_id"][1:])
+                        key = None if key is MISSING else key
+                        groups[key] = groups.get(key, 0) + 1
+                    docs = [{"_id": k, "n": n} for k, n in groups.items()]
+                else:
+                    raise NotImplementedError(op)
+            return docs
+        return Cursor(load)
+
+    # -- writes --
+
+    async def insert_one(self, doc):
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", next(_ids))
+        self._check_unique(doc)
+        self.docs.append(doc)
+        return Result(inserted=1, inserted_id=doc["_id"])
+
+    async def insert_many(self, docs):
+        for doc in docs:
+            await self.insert_one(doc)
+        return Result(inserted=len(docs))
+
+    def _apply(self, doc, update, inserting):
+        new = copy.deepcopy(doc)
+        for op, fields in update.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                for k, v in fields.items():
+                    set_path(new, k, copy.deepcopy(v))
+            elif op == "$unset":
+                for k in fields:
+                    new.pop(k, None)
+            elif op == "$inc":
+                for k, v in fields.items():
+                    new[k] = new.get(k, 0) + v
+            elif op != "$setOnInsert":
+                raise NotImplementedError(op)
+        return new
+
+    def _update(self, query, update, upsert, many):
+        targets = [d for d in self.docs if matches(d, query)]
+        if not many:
+            targets = targets[:1]
+        if not targets and upsert:
+            seed = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            doc = self._apply(seed, update, inserting=True)
+            doc.setdefault("_id", next(_ids))
+            self._check_unique(doc)
+            self.docs.append(doc)
+            return Result(upserted=1, upserted_id=doc["_id"])
+        modified = 0
+        for doc in targets:
+            new = self._apply(doc, update, inserting=False)
+            if new != doc:
+                self._check_unique(new, skip=doc)
+                doc.clear()
+                doc.update(new)
+                modified += 1
+        return Result(matched=len(targets), modified=modified)
+
+    async def update_one(self, query, update, upsert=False):
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query, update, upsert=False):
+        return self._update(query, update, upsert, many=True)
+
+    async def replace_one(self, query, doc, upsert=False):
+        for i, existing in enumerate(self.docs):
+            if matches(existing, query):
+                self.docs[i] = {"_id": existing["_id"], **copy.deepcopy(doc)}
+                return Result(matched=1, modified=1)
+        if upsert:
+            await self.insert_one({**{k: v for k, v in query.items() if not k.startswith("$")}, **doc})
+            return Result(upserted=1)
+        return Result()
+
+    async def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False, return_document=False, **kwargs):
+        found = sort_docs([d for d in self.docs if matches(d, query)], sort or [])
+        if not found:
+            if not upsert:
+                return None
+            res = self._update(query, update, upsert=True, many=False)
+            new = next(d for d in self.docs if d["_id"] == res.upserted_id)
+            return project(new, projection) if return_document else None
+        doc = found[0]
+        before = copy.deepcopy(doc)
+        self._update({"_id": doc["_id"]}, update, upsert=False, many=False)
+        return project(doc if return_document else before, projection)
+
+    async def delete_one(self, query):
+        for i, doc in enumerate(self.docs):
+            if matches(doc, query):
+                del self.docs[i]
+                return Result(matched=1)
+        return Result()
+
+    async def delete_many(self, query):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, query)]
+        return Result(matched=before - len(self.docs))
+
+    async def bulk_write(self, ops, ordered=True):
+        counts = {"inserted": 0, "matched": 0, "modified": 0, "upserted": 0}
+        errors = []
+        for i, op in enumerate(ops):
+            try:
+                if isinstance(op, UpdateOne):
+                    res = self._update(op._filter, op._doc, op._upsert, many=False)
+                elif isinstance(op, InsertOne):
+                    res = await self.insert_one(op._doc)
+                else:
+                    raise NotImplementedError(type(op))
+            except DuplicateKeyError as e:
+                errors.append({"index": i, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+                continue
+            counts["inserted"] += res.inserted_count
+            counts["matched"] += res.matched_count
+            counts["modified"] += res.modified_count
+            counts["upserted"] += res.upserted_count
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": errors, "nInserted": counts["inserted"], "nUpserted": counts["upserted"],
+                "nMatched": counts["matched"], "nModified": counts["modified"],
+            })
+        return Result(**counts)
+
+
+class FakeDB:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = Collection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+async def with_spec_indexes(db, server, collection):
+    """Create the collection's INDEX_SPECS unique indexes on a FakeDB."""
+    for coll, keys, options in server.INDEX_SPECS:
+        if coll == collection and options.get("unique"):
+            await db[coll].create_index(keys, **options)
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+import server
+from tests.fakedb import Collection, FakeDB
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class CountingUsers(Collection):
+    def __init__(self, name):
+        super().__init__(name)
+        self.lookups = 0
+
+    async def find_one(self, query=None, projection=None, **kwargs):
+        self.lookups += 1
+        return await super().find_one(query, projection)
+
+
+@pytest.fixture
+def users(monkeypatch):
+    db = FakeDB()
+    db._collections["users"] = CountingUsers("users")
+    run(db.users.insert_many([
+        {"id": "u1", "email": "u1@test.com", "role": "admin", "password_hash": "h1"},
+        {"id": "u2", "email": "u2@test.com", "role": "admin", "password_hash": "h2"},
+    ]))
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "auth_user_cache", server.AuthUserCache())
+    monkeypatch.setattr(server, "AUTH_STATELESS_READS", False)
+    return db.users
+
+
+def bearer(user_id, **claims):
+    payload = {"sub": user_id, "exp": datetime.now(timezone.utc) + timedelta(minutes=5), **claims}
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=jwt.encode(payload, server.JWT_SECRET, algorithm=server.JWT_ALG))
+
+
+def token_for(user_id, role="admin"):
+    token = server.make_token({"id": user_id, "email": f"{user_id}@test.com", "role": role})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_user_is_cached_per_token_issue_time(users):
+    first = token_for("u1")
+    run(server.get_current_user(first))
+    run(server.get_current_user(first))
+    assert users.lookups == 1
+    # a token issued later for the same user is a separate entry
+    run(server.get_current_user(bearer("u1", iat=datetime.now(timezone.utc) + timedelta(seconds=5))))
+    assert users.lookups == 2
+
+
+def test_token_without_iat_is_loaded_and_cached(users):
+    creds = bearer("u1")
+    assert run(server.get_current_user(creds))["id"] == "u1"
+    assert run(server.get_current_user(creds))["id"] == "u1"
+    assert users.lookups == 1
+
+
+def test_role_or_password_change_reloads_the_user(users):
+    u1, u2 = token_for("u1"), token_for("u2")
+    run(server.get_current_user(u1))
+    run(server.get_current_user(u2))
+    run(users.update_one({"id": "u1"}, {"$set": {"role": "advertiser", "password_hash": "new"}}))
+    server.notify_write("users", ["u1"])
+    reloaded = run(server.get_current_user(u1))
+    assert (reloaded["role"], reloaded["password_hash"]) == ("advertiser", "new")
+    with pytest.raises(HTTPException) as err:
+        run(server.get_current_admin_reader(reloaded))
+    assert err.value.status_code == 403
+    # only the written user was evicted
+    run(server.get_current_user(u2))
+    assert users.lookups == 3
+
+
+def test_deleted_user_is_rejected_after_invalidation(users):
+    creds = token_for("u2")
+    run(server.get_current_user(creds))
+    run(users.delete_one({"id": "u2"}))
+    server.notify_write("users", ["u2"])
+    with pytest.raises(HTTPException) as err:
+        run(server.get_current_user(creds))
+    assert err.value.status_code == 401
+
+
+def test_reader_loads_the_user_unless_stateless_reads_are_on(users, monkeypatch):
+    # the token still claims admin, but the stored role was changed
+    creds = token_for("u1", role="admin")
+    run(users.update_one({"id": "u1"}, {"$set": {"role": "advertiser"}}))
+    assert run(server.get_current_reader(creds))["role"] == "advertiser"
+    assert users.lookups == 1
+    monkeypatch.setattr(server, "AUTH_STATELESS_READS", True)
+    assert run(server.get_current_reader(creds)) == {"id": "u1", "email": "u1@test.com", "role": "admin"}
+    assert users.lookups == 1
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+import server
+from tests.fakedb import Collection
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class CountingCollection(Collection):
+    """FakeDB collection that records which count path each call took."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.calls = []
+
+    async def estimated_document_count(self):
+        self.calls.append("estimated")
+        return await super().estimated_document_count()
+
+    async def count_documents(self, query):
+        self.calls.append("count")
+        return await super().count_documents(query)
+
+    def aggregate(self, pipeline):
+        self.calls.append("group")
+        return super().aggregate(pipeline)
+
+
+@pytest.fixture
+def channels():
+    coll = CountingCollection("channels")
+    run(coll.insert_many([
+        {"id": f"ch-{i}", "status": ["approved", "draft"][i % 2], "category": ["news", "tech", "fun"][i % 3]}
+        for i in range(12)
+    ]))
+    return coll
+
+
+def test_unfiltered_count_uses_collection_metadata(channels):
+    cache = server.CountCache()
+    assert run(cache.count(channels, {})) == (12, False)
+    assert channels.calls == ["estimated"]
+
+
+def test_group_field_counts_come_from_one_cached_group(channels):
+    cache = server.CountCache()
+    base = {"status": "approved"}
+
+    async def scenario():
+        return [await cache.count(channels, {**base, "category": c}, group_field="category", base=base) for c in ("news", "tech", "none")]
+
+    assert run(scenario()) == [(2, True), (2, False), (0, False)]
+    assert channels.calls == ["group"]
+    # an operator on the group field isn't a plain equality, so it's counted directly
+    assert run(cache.count(channels, {**base, "category": {"$in": ["news"]}}, group_field="category", base=base)) == (2, True)
+    assert channels.calls == ["group", "count"]
+
+
+def test_counts_are_cached_until_the_ttl_expires(channels):
+    cache = server.CountCache(ttl=0.05)
+    query = {"status": "draft"}
+    assert run(cache.count(channels, query)) == (6, True)
+    run(channels.insert_one({"id": "late", "status": "draft"}))
+    assert run(cache.count(channels, query)) == (6, False)
+    time.sleep(0.06)
+    assert run(cache.count(channels, query)) == (7, True)
+    assert channels.calls == ["count", "count"]
+
+
+def test_notify_write_invalidates_only_that_collection(channels, monkeypatch):
+    cache = server.CountCache()
+    monkeypatch.setattr(server, "count_cache", cache)
+    creators = CountingCollection("creators")
+
+    async def scenario():
+        await cache.count(channels, {"status": "draft"})
+        await cache.count(channels, {"status": "approved"}, group_field="status")
+        await cache.count(creators, {"category": "news"})
+        server.notify_write("channels")
+        await cache.count(channels, {"status": "draft"})
+        await cache.count(channels, {"status": "approved"}, group_field="status")
+        await cache.count(creators, {"category": "news"})
+
+    run(scenario())
+    assert channels.calls == ["count", "group", "count", "group"]
+    assert creators.calls == ["count"]
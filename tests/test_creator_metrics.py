@@ -0,0 +1,188 @@
+import asyncio
+import math
+import random
+
+import server
+
+
+class Links:
+    """creator_channel_links stand-in: channel id -> creator ids."""
+
+    def __init__(self, links):
+        self.links = links
+        self.queries = []
+
+    async def distinct(self, field, query=None):
+        self.queries.append(query)
+        channels = query["channel_id"]["$in"] if query else list(self.links)
+        return sorted({c for ch in channels for c in self.links.get(ch, [])})
+
+
+class DB:
+    def __init__(self, links):
+        self.creator_channel_links = Links(links)
+
+
+def test_channel_writes_are_coalesced_into_one_flush(monkeypatch):
+    db = DB({"ch1": ["a"], "ch2": ["a", "b"], "ch3": ["c"]})
+    recomputed = []
+
+    async def recompute(creator_ids=None):
+        recomputed.append(creator_ids)
+
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "recompute_creators_metrics", recompute)
+
+    async def go():
+        queue = server.CreatorMetricsQueue(delay=0.05, batch_size=1)
+        queue.mark_channels(["ch1"])
+        queue.mark_channels(["ch2"])
+        queue.mark_channels(["ch1"])
+        assert recomputed == []
+        await asyncio.sleep(0.2)
+        return queue
+
+    queue = asyncio.run(go())
+    assert recomputed == [["a"], ["b"]]
+    assert queue.flushes == 1 and not queue.pending
+    assert [sorted(q["channel_id"]["$in"]) for q in db.creator_channel_links.queries] == [["ch1", "ch2"]]
+
+
+def test_unknown_ids_rebuild_every_creator_on_drain(monkeypatch):
+    db = DB({"ch1": ["a"], "ch3": ["c"]})
+    recomputed = []
+
+    async def recompute(creator_ids=None):
+        recomputed.append(creator_ids)
+
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "recompute_creators_metrics", recompute)
+
+    async def go():
+        queue = server.CreatorMetricsQueue(delay=60)
+        queue.mark_channels(["ch1"])
+        queue.mark_channels(None)
+        await queue.drain()
+
+    asyncio.run(go())
+    assert recomputed == [None]
+    assert db.creator_channel_links.queries == []
+
+
+def evaluate(expr, doc, env=None):
+    """Just enough of the aggregation expression language to run creator_metrics_pipeline."""
+    env = env or {}
+    if isinstance(expr, str) and expr.startswith("$$"):
+        name, *path = expr[2:].split(".")
+        value = env[name]
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, list):
+        return [evaluate(e, doc, env) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if not next(iter(expr), "").startswith("$"):
+        return {k: evaluate(v, doc, env) for k, v in expr.items()}
+    (op, arg), = expr.items()
+    ev = lambda e: evaluate(e, doc, env)  # noqa: E731
+
+    def order(v):
+        return (0, 0) if v is None else (1, v) if isinstance(v, (int, float)) else (2, v)
+
+    if op == "$literal":
+        return arg
+    if op == "$let":
+        inner = {**env, **{k: ev(v) for k, v in arg["vars"].items()}}
+        return evaluate(arg["in"], doc, inner)
+    if op in ("$map", "$filter"):
+        out = []
+        for item in ev(arg["input"]):
+            value = evaluate(arg["in"] if op == "$map" else arg["cond"], doc, {**env, arg["as"]: item})
+            if op == "$map":
+                out.append(value)
+            elif value:
+                out.append(item)
+        return out
+    if op == "$cond":
+        return ev(arg[1]) if ev(arg[0]) else ev(arg[2])
+    args = ev(arg) if isinstance(arg, list) else [ev(arg)]
+    if op in ("$sum", "$min", "$max", "$avg") and len(args) == 1 and isinstance(args[0], list):
+        args = args[0]
+    nums = [a for a in args if isinstance(a, (int, float))]
+    if op == "$gt":
+        return order(args[0]) > order(args[1])
+    if op == "$ne":
+        return args[0] != args[1]
+    if op == "$size":
+        return len(args[0])
+    if op == "$ifNull":
+        return args[1] if args[0] is None else args[0]
+    if op == "$sum":
+        return sum(nums)
+    if op in ("$min", "$max"):
+        values = [a for a in args if a is not None]
+        return (min if op == "$min" else max)(values, key=order) if values else None
+    if op == "$avg":
+        return sum(nums) / len(nums) if nums else None
+    if None in args:
+        return None
+    if op == "$multiply":
+        return math.prod(args)
+    if op == "$divide":
+        return args[0] / args[1]
+    if op == "$round":
+        return round(args[0], args[1])
+    if op == "$trunc":
+        return math.trunc(args[0])
+    if op == "$toLong":
+        return int(args[0])
+    raise NotImplementedError(op)
+
+
+def legacy_metrics(channels):
+    """The Python implementation the pipeline replaced."""
+    metrics = server.CreatorMetrics()
+    if not channels:
+        return metrics
+    metrics.channels_count = len(channels)
+    alive = [ch for ch in channels if ch.get("link_status") != "dead"] or channels
+    metrics.subscribers_total = sum(ch.get("subscribers", 0) for ch in alive)
+    er = [(ch["er"], ch.get("subscribers", 0)) for ch in channels if ch.get("er") is not None and ch["er"] > 0]
+    if er and sum(s for _, s in er) > 0:
+        metrics.avg_er_percent = round(sum(e * s for e, s in er) / sum(s for _, s in er), 3)
+    prices = [ch["price_rub"] for ch in channels if ch.get("price_rub") is not None and ch["price_rub"] > 0]
+    if prices:
+        metrics.min_price_rub = min(prices)
+        metrics.avg_price_rub = int(sum(prices) / len(prices))
+    cpm = [(ch["cpm_rub"], ch.get("subscribers", 0)) for ch in channels if ch.get("cpm_rub") is not None and ch["cpm_rub"] > 0]
+    if cpm and sum(s for _, s in cpm) > 0:
+        metrics.avg_cpm_rub = int(sum(c * s for c, s in cpm) / sum(s for _, s in cpm))
+    posts = [ch["last_post_at"] for ch in channels if ch.get("last_post_at")]
+    if posts:
+        metrics.last_post_at_min = max(posts)
+    return metrics
+
+
+def test_metrics_pipeline_matches_python_computation():
+    pipeline = server.creator_metrics_pipeline(["a"], "2026-01-01T00:00:00")
+    assert pipeline[0] == {"$match": {"id": {"$in": ["a"]}}}
+    assert pipeline[-1]["$merge"]["on"] == "id"
+    assert server.creator_metrics_pipeline(None, "now")[0] == {"$match": {}}
+    project = pipeline[-2]["$project"]
+    rng = random.Random(7)
+    maybe = lambda value: rng.choice([None, 0, value])  # noqa: E731
+    for _ in range(300):
+        channels = []
+        for _ in range(rng.randrange(0, 6)):
+            ch = {
+                "subscribers": rng.randrange(0, 100000), "er": maybe(rng.uniform(0, 20)),
+                "price_rub": maybe(rng.randrange(1, 50000)), "cpm_rub": maybe(rng.uniform(1, 900)),
+                "last_post_at": rng.choice([None, "", f"2026-0{rng.randrange(1, 10)}-01T00:00:00"]),
+                "link_status": rng.choice([None, "alive", "dead"]),
+            }
+            channels.append({k: v for k, v in ch.items() if v is not None or rng.random() < 0.5})
+        metrics = server.CreatorMetrics(**evaluate(project["metrics"], {"chs": channels}))
+        assert metrics == legacy_metrics(channels), channels
@@ -0,0 +1,69 @@
+import asyncio
+import csv
+import io
+import json
+
+import server
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+    async def close(self):
+        self.closed = True
+
+
+def export(writer, docs, model, size=2, **kwargs):
+    async def go():
+        columns = server.export_columns(model, **kwargs)
+        return [chunk async for chunk in writer(server.cursor_batches(cursor, size), columns)]
+
+    cursor = FakeCursor(docs)
+    chunks = asyncio.run(go())
+    assert cursor.closed
+    return chunks
+
+
+CREATORS = [
+    {"id": f"c{i}", "name": f"Creator {i}", "tags": ["news", "tech"], "metrics": {"subscribers_total": i * 1000, "avg_er_percent": 2.5}, "flags": {"verified": i % 2 == 0}}
+    for i in range(5)
+]
+
+
+def test_creator_columns_flatten_nested_models():
+    columns = dict(server.export_columns(server.CreatorResponse, exclude=("channels",)))
+    assert columns["metrics.subscribers_total"] == "int"
+    assert columns["metrics.avg_er_percent"] == "float"
+    assert columns["flags.verified"] == "bool"
+    assert columns["tags"] == "json"
+    assert columns["priority_level"] == "str"
+    assert "channels" not in columns
+
+
+def test_csv_export_streams_one_chunk_per_batch():
+    chunks = export(server.csv_export, CREATORS, server.CreatorResponse, exclude=("channels",))
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [r["id"] for r in rows] == ["c0", "c1", "c2", "c3", "c4"]
+    assert rows[3]["metrics.subscribers_total"] == "3000"
+    assert json.loads(rows[0]["tags"]) == ["news", "tech"]
+    assert rows[1]["bio"] == ""
+
+
+def test_csv_export_of_nothing_is_a_header():
+    chunks = export(server.csv_export, [], server.ChannelResponse)
+    assert b"".join(chunks).decode().splitlines() == [",".join(name for name, _ in server.export_columns(server.ChannelResponse))]
+
+
+def test_ndjson_export():
+    chunks = export(server.ndjson_export, CREATORS, server.CreatorResponse, size=10)
+    assert [json.loads(line)["id"] for line in b"".join(chunks).decode().splitlines()] == ["c0", "c1", "c2", "c3", "c4"]
@@ -0,0 +1,33 @@
+import server
+
+
+def test_shape_fills_empty_buckets():
+    raw = {
+        "total": [{"n": 7}],
+        "category": [{"_id": "Новости", "count": 5}, {"_id": "Крипто", "count": 2}],
+        "language": [],
+        "subscribers": [{"_id": 0, "count": 3}, {"_id": 1_000_000, "count": 4}],
+        "price_rub": [{"_id": "unknown", "count": 7}],
+    }
+    facets = server.shape_channel_facets(raw, "2026-01-01T00:00:00+00:00")
+    assert facets["total"] == 7
+    assert facets["category"] == [{"value": "Новости", "count": 5}, {"value": "Крипто", "count": 2}]
+    assert facets["country"] == []
+    subs = facets["subscribers"]["buckets"]
+    assert len(subs) == len(server.FACET_BUCKETS["subscribers"]) - 1
+    assert subs[0] == {"min": 0, "max": 1_000, "count": 3}
+    assert subs[-1] == {"min": 1_000_000, "max": None, "count": 4}
+    assert sum(b["count"] for b in facets["price_rub"]["buckets"]) == 0
+    assert facets["price_rub"]["unknown"] == 7
+    assert facets["er"]["unknown"] == 0
+
+
+def test_shape_of_an_empty_catalog():
+    facets = server.shape_channel_facets({}, "now")
+    assert facets["total"] == 0
+    assert all(b["count"] == 0 for b in facets["er"]["buckets"])
+
+
+def test_facets_route_is_not_shadowed_by_channel_id():
+    paths = [getattr(r, "path", "") for r in server.app.routes]
+    assert paths.index("/api/channels/facets") < paths.index("/api/channels/{channel_id}")
@@ -0,0 +1,111 @@
+import asyncio
+import io
+
+import server
+from tests.fakedb import FakeDB
+
+
+def chunks(data: bytes, fmt: str, size: int = 1000):
+    records = server.iter_import_records(io.BytesIO(data), fmt)
+    out = []
+    while (chunk := server.next_import_chunk(records, size)) is not None:
+        out.append(chunk)
+    return out
+
+
+def test_csv_import_coerces_numbers_and_reports_lines():
+    data = (
+        "﻿name;link;subscribers;er;price_rub\n"
+        "Alpha;https://t.me/alpha_news;12,5 тыс;4,2;1 500\n"
+        "\n"
+        "Beta;https://t.me/beta_news;many;;\n"
+        'Gamma;"https://t.me/gamma_news";1.2M;0.5;\n'
+    ).encode("utf-8")
+    [(valid, errors)] = chunks(data, "csv")
+    assert [(line, c.name, c.subscribers, c.er, c.price_rub) for line, c in valid] == [
+        (2, "Alpha", 12500, 4.2, 1500),
+        (5, "Gamma", 1200000, 0.5, None),
+    ]
+    assert [e["line"] for e in errors] == [4]
+    assert errors[0]["errors"][0]["field"] == "subscribers"
+
+
+def test_jsonl_import_reads_in_chunks():
+    lines = [f'{{"name": "Ch {i}", "link": "https://t.me/ch_{i:04d}", "subscribers": {i}}}' for i in range(5)]
+    lines.insert(2, "{broken")
+    lines.insert(4, '["not", "an", "object"]')
+    parts = chunks("\n".join(lines).encode(), "jsonl", size=3)
+    assert [len(valid) + len(errors) for valid, errors in parts] == [3, 3, 1]
+    errors = [e["line"] for _, errs in parts for e in errs]
+    assert errors == [3, 5]
+    assert [c.subscribers for valid, _ in parts for _, c in valid] == [0, 1, 2, 3, 4]
+
+
+def test_import_op_upserts_by_username():
+    payload = server.ChannelCreate(name="Alpha", link="t.me/Alpha_News", subscribers=10)
+    match, op = server.import_channel_op(payload, "upsert", "draft", "2026-01-01T00:00:00")
+    assert match == {"username_norm": "alpha_news"}
+    update = op._doc
+    assert update["$set"]["subscribers"] == 10
+    assert update["$setOnInsert"]["status"] == "draft"
+    assert "subscribers" not in update["$setOnInsert"]
+    assert "er" in update["$setOnInsert"]
+
+
+def test_write_errors_do_not_drop_validation_errors(monkeypatch):
+    from pymongo.errors import BulkWriteError
+
+    class Channels:
+        refreshed = []
+
+        async def bulk_write(self, ops, ordered=True):
+            raise BulkWriteError({"nUpserted": 1, "nMatched": 0, "writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+        async def find(self, query, projection=None):
+            self.refreshed.append(query)
+            return
+            yield
+
+    class DB:
+        channels = Channels()
+
+    monkeypatch.setattr(server, "db", DB())
+    monkeypatch.setattr(server, "notify_write", lambda *a, **k: None)
+    data = (
+        "name;link;subscribers\n"
+        "Alpha;https://t.me/alpha_news;10\n"
+        "Beta;https://t.me/beta_news;many\n"
+        "Gamma;https://t.me/gamma_news;30\n"
+    ).encode("utf-8")
+    report = asyncio.run(server.import_channels(io.BytesIO(data), "csv"))
+    assert [e["line"] for e in report["errors"]] == [3, 4]
+    assert report["errors"][0]["errors"][0]["field"] == "subscribers"
+    assert (report["valid"], report["invalid"], report["inserted"]) == (1, 2, 1)
+    # rows without descriptions get search_terms re-derived from the stored documents
+    assert DB.channels.refreshed == [{"$or": [{"username_norm": "alpha_news"}, {"username_norm": "gamma_news"}]}]
+
+
+def test_search_terms_cover_descriptions_only_for_full_documents():
+    full = server.ChannelCreate(name="Ёжик News", link="https://t.me/hedgehog", short_description="Новости про ежей").model_dump()
+    assert server.prepare_channel_for_mongo(full)["search_terms"] == ["ежик", "news", "новости", "про", "ежей"]
+    # a partial write can't see the stored descriptions; update_channel_fields re-derives instead
+    assert "search_terms" not in server.prepare_channel_for_mongo({"name": "Renamed"})
+
+
+def test_partial_upsert_rederives_score_and_search_terms(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    existing = server.ChannelCreate(name="Alpha", link="https://t.me/alpha_news", short_description="Крипто сигналы")
+    asyncio.run(db.channels.insert_one({**server.prepare_channel_for_mongo(existing.model_dump()), "id": "a"}))
+    data = (
+        "name;link;growth_30d;growth_score\n"
+        "Alpha Daily;https://t.me/alpha_news;40;1000000\n"
+        "Beta;https://t.me/beta_news;;1000000\n"
+    ).encode("utf-8")
+    report = asyncio.run(server.import_channels(io.BytesIO(data), "csv"))
+    assert (report["inserted"], report["updated"]) == (1, 1)
+    alpha, beta = db.channels.docs
+    assert alpha["growth_score"] == 20
+    assert alpha["search_terms"] == ["alpha", "daily", "крипто", "сигналы"]
+    # growth_score is not an import column: new rows are scored from their own fields
+    assert beta["growth_score"] == 0
@@ -0,0 +1,35 @@
+import pytest
+
+import server
+
+
+@pytest.mark.parametrize("name,collection,query,sort", server.INDEX_ADVISOR_QUERIES, ids=[q[0] for q in server.INDEX_ADVISOR_QUERIES])
+def test_every_advised_query_has_an_index_in_sort_order(name, collection, query, sort):
+    assert any(c == collection and server.index_serves_sort(keys, query, sort) for c, keys, _ in server.INDEX_SPECS)
+
+
+def test_category_price_sort_uses_the_category_index():
+    query = {"status": "approved", "category": "Новости"}
+    sort = server.CHANNEL_SORTS["price"]
+    assert server.index_serves_sort([("status", 1), ("category", 1), ("price_rub", -1), ("id", -1)], query, sort)
+    # still in sort order, with category checked on the fetched documents
+    assert server.index_serves_sort([("status", 1), ("price_rub", -1), ("id", -1)], query, sort)
+    assert not server.index_serves_sort([("price_rub", -1)], query, sort)
+    assert server.suggest_index({**query, "subscribers": {"$gte": 10}}, sort) == [
+        ("status", 1), ("category", 1), ("price_rub", -1), ("id", -1), ("subscribers", 1),
+    ]
+
+
+def test_summarize_explain_finds_nested_stages():
+    explain = {
+        "queryPlanner": {"winningPlan": {"queryPlan": {
+            "stage": "LIMIT",
+            "inputStage": {"stage": "SORT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status_1"}}},
+        }}},
+        "executionStats": {"totalDocsExamined": 5000, "totalKeysExamined": 5000, "nReturned": 24},
+    }
+    summary = server.summarize_explain(explain)
+    assert summary["stages"] == ["LIMIT", "SORT", "FETCH", "IXSCAN"]
+    assert summary["indexes"] == ["status_1"]
+    assert summary["in_memory_sort"] and not summary["collscan"]
+    assert summary["docs_examined"] == 5000
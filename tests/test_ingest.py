@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import server
+from tests.fakedb import Collection, FakeDB, with_spec_indexes
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class RecordingChannels(Collection):
+    def __init__(self, name):
+        super().__init__(name)
+        self.batches = []
+
+    async def bulk_write(self, ops, ordered=True):
+        self.batches.append(len(ops))
+        assert not ordered
+        return await super().bulk_write(ops, ordered)
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    db = FakeDB()
+    db._collections["channels"] = RecordingChannels("channels")
+    monkeypatch.setattr(server, "db", db)
+    run(with_spec_indexes(db, server, "channels"))
+    return db.channels
+
+
+@pytest.mark.parametrize("raw,expected", [
+    ("durov", "t.me/durov"),
+    ("@durov", "t.me/durov"),
+    ("  https://t.me/durov  ", "https://t.me/durov"),
+    ("t.me/joinchat/AbC", "t.me/joinchat/AbC"),
+    ("", None),
+    ("https://example.com/durov", None),
+    ("https://t.me/", None),
+    ("not a link", None),
+])
+def test_ingest_link_normalization(raw, expected):
+    assert server.normalize_ingest_link(raw) == expected
+
+
+def test_ingest_batches_upserts_and_counts_new_and_existing(channels):
+    run(channels.insert_one({"id": "old", "link": "https://t.me/chan_1", "username_norm": "chan_1", "status": "approved"}))
+    items = [{"link": f"https://t.me/chan_{i}", "subscribers": i} for i in range(5)]
+    items += [{"link": "@CHAN_2"}, {"link": "t.me/+invite"}, {"link": "t.me/+invite"}]
+    result = run(server.ingest_channels(items, category="Новости", batch_size=2))
+    assert result == {"ok": True, "inserted": 5, "matched": 1, "duplicates": 2, "invalid": 0, "errors": 0}
+    assert channels.batches == [2, 2, 2]
+    drafts = [d for d in channels.docs if d["id"] != "old"]
+    assert {d["username_norm"] for d in drafts} == {"chan_0", "chan_2", "chan_3", "chan_4", None}
+    assert all(d["status"] == "draft" and d["category"] == "Новости" for d in drafts)
+    # the existing channel is left as it was
+    assert channels.docs[0]["status"] == "approved" and "subscribers" not in channels.docs[0]
+
+
+def test_invalid_links_are_rejected_and_counted(channels):
+    items = [{"link": "https://example.com/chan"}, {"link": "two words"}, {"link": "  "}, {}, {"link": "good_chan"}]
+    result = run(server.ingest_channels(items))
+    assert (result["inserted"], result["invalid"]) == (1, 2)
+    assert [d["link"] for d in channels.docs] == ["t.me/good_chan"]
+
+
+def test_write_errors_are_counted_without_losing_the_rest(channels, monkeypatch):
+    async def partly_failing(ops, ordered=True):
+        # the server rejected one op of the unordered batch and applied the others
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000"}], "nUpserted": len(ops) - 1, "nMatched": 0})
+
+    monkeypatch.setattr(channels, "bulk_write", partly_failing)
+    result = run(server.ingest_channels([{"link": f"chan_{i}"} for i in range(5)], batch_size=3))
+    assert (result["inserted"], result["matched"], result["errors"]) == (3, 0, 2)
@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from tests.fakedb import FakeDB, with_spec_indexes
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def iso(seconds_from_now):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds_from_now)).isoformat()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    return db
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Register test job types; values are (handler, resumable)."""
+    def register(job_type, fn, resumable=False):
+        monkeypatch.setitem(server.JOB_HANDLERS, job_type, (fn, resumable))
+    return register
+
+
+async def noop(ctx):
+    return {"ok": True}
+
+
+def job(db, job_id):
+    return next(d for d in db.jobs.docs if d["id"] == job_id)
+
+
+def test_claim_takes_the_oldest_queued_job_and_leases_it(db, handlers):
+    handlers("test.noop", noop)
+    runner = server.JobRunner()
+
+    async def scenario():
+        first = await server.submit_job("test.noop", {})
+        second = await server.submit_job("test.noop", {})
+        a, b, none = await runner._claim(), await runner._claim(), await runner._claim()
+        return first, second, a, b, none
+
+    first, second, a, b, none = run(scenario())
+    assert (a["id"], b["id"], none) == (first["job_id"], second["job_id"], None)
+    assert a["status"] == "running" and a["attempts"] == 1 and a["worker"] == runner.worker_id
+    assert a["lease_until"] > server.utcnow_iso()
+
+
+def test_recover_requeues_resumable_and_fails_the_rest(db, handlers):
+    handlers("test.resumable", noop, resumable=True)
+    handlers("test.oneshot", noop)
+    run(db.jobs.insert_many([
+        {"id": "expired-resumable", "type": "test.resumable", "status": "running", "lease_until": iso(-5)},
+        {"id": "expired-oneshot", "type": "test.oneshot", "status": "running", "lease_until": iso(-5)},
+        {"id": "live", "type": "test.oneshot", "status": "running", "lease_until": iso(60)},
+    ]))
+    run(server.JobRunner().recover())
+    assert job(db, "expired-resumable")["status"] == "queued"
+    assert job(db, "expired-oneshot")["status"] == "failed"
+    assert job(db, "expired-oneshot")["error"] == "Interrupted by worker restart"
+    assert job(db, "live")["status"] == "running"
+
+
+def test_links_check_resumes_from_its_checkpoint(db, monkeypatch):
+    seen = []
+
+    async def fake_link_check(limit, replace_dead, on_batch=None, totals=None):
+        seen.append(dict(totals))
+        done = {**totals, "checked": totals.get("checked", 0) + 5}
+        await on_batch(done)
+        return {"ok": True, **done}
+
+    monkeypatch.setattr(server, "run_link_check", fake_link_check)
+    checkpoint = {"checked": 10, "alive": 9, "dead": 1, "started_at": iso(-60)}
+    run(db.jobs.insert_one({
+        "id": "links", "type": "links.check", "params": {"limit": 20}, "status": "running",
+        "lease_until": iso(-5), "checkpoint": checkpoint, "attempts": 1,
+    }))
+    runner = server.JobRunner()
+
+    async def scenario():
+        await runner.recover()
+        claimed = await runner._claim()
+        await runner._execute(claimed)
+
+    run(scenario())
+    assert seen == [checkpoint]
+    doc = job(db, "links")
+    assert doc["status"] == "succeeded" and doc["attempts"] == 2
+    assert doc["checkpoint"]["checked"] == 15
+    assert doc["progress"] == {"done": 15, "total": 20}
+
+
+def test_cancel_stops_a_running_job_at_its_next_progress_call(db, handlers):
+    steps = []
+
+    async def loop(ctx):
+        for i in range(3):
+            steps.append(i)
+            if i == 1:
+                await server.admin_cancel_job(ctx.id, user={})
+            await ctx.progress(done=i)
+        return {"ok": True}
+
+    handlers("test.loop", loop)
+    runner = server.JobRunner()
+
+    async def scenario():
+        await server.submit_job("test.loop", {})
+        await runner._execute(await runner._claim())
+
+    run(scenario())
+    assert steps == [0, 1]
+    assert db.jobs.docs[0]["status"] == "cancelled"
+
+
+def test_cancelling_a_queued_job_keeps_it_from_running(db, handlers):
+    handlers("test.noop", noop)
+
+    async def scenario():
+        queued = await server.submit_job("test.noop", {})
+        assert (await server.admin_cancel_job(queued["job_id"], user={}))["ok"]
+        return await server.JobRunner()._claim()
+
+    assert run(scenario()) is None
+    assert db.jobs.docs[0]["status"] == "cancelled"
+
+
+def test_worker_survives_a_failed_status_update(db, handlers, monkeypatch):
+    handlers("test.noop", noop)
+    runner = server.JobRunner(poll_seconds=0.01)
+    executed = []
+
+    async def flaky_execute(job):
+        executed.append(job["id"])
+        if len(executed) == 1:
+            raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(runner, "_execute", flaky_execute)
+
+    async def scenario():
+        await server.submit_job("test.noop", {})
+        await server.submit_job("test.noop", {})
+        worker = asyncio.create_task(runner._worker())
+        for _ in range(100):
+            if len(executed) == 2:
+                break
+            await asyncio.sleep(0.01)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    run(scenario())
+    assert len(executed) == 2
+
+
+def test_growth_score_slot_is_queued_once_across_workers(db):
+    async def scenario():
+        await with_spec_indexes(db, server, "jobs")
+        now = 1_000 * server.GROWTH_SCORE_INTERVAL_SECONDS + 5
+        results = await asyncio.gather(*(server.queue_growth_scores(now) for _ in range(3)))
+        later = await server.queue_growth_scores(now + server.GROWTH_SCORE_INTERVAL_SECONDS)
+        return results, later
+
+    results, later = run(scenario())
+    assert sum(1 for r in results if not r.get("duplicate")) == 1
+    assert len({r["job_id"] for r in results}) == 1
+    assert not later.get("duplicate")
+    assert len(db.jobs.docs) == 2
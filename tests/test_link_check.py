@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import server
+from tests.fakedb import FakeDB
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ok(h):
+    return 200, {}, b"ok"
+
+
+def gone(h):
+    return 404, {}, b"gone"
+
+
+def no_head(h):
+    return (405, {}, b"") if h.command == "HEAD" else (200, {}, b"ok")
+
+
+def slow(h):
+    time.sleep(1.0)
+    return 200, {}, b"late"
+
+
+async def check(links, **kwargs):
+    async with server.LinkChecker(rate_per_sec=0, **kwargs) as checker:
+        return await checker.check_many(links)
+
+
+def test_classifies_alive_dead_and_timeouts(fixture_server):
+    routes = {"/ok": ok, "/gone": gone, "/no-head": no_head, "/slow": slow}
+    fixture_server.routes.update(routes)
+    base = fixture_server.base_url
+    statuses = run(check([base + path for path in routes] + ["http://127.0.0.1:9/closed"], timeout=0.3))
+    assert statuses == ["alive", "dead", "alive", "dead", "dead"]
+    # HEAD answered 405, so the checker fell back to a ranged GET
+    assert fixture_server.hits["/no-head"] == 2
+    assert fixture_server.hits["/ok"] == 1
+
+
+@pytest.mark.parametrize("kwargs,expected", [
+    ({"concurrency": 3}, 3),  # per-host cap defaults to the global one
+    ({"concurrency": 6, "per_host": 2}, 2),
+])
+def test_concurrency_limits(fixture_server, kwargs, expected):
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    def tracked(h):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.05)
+        with lock:
+            state["now"] -= 1
+        return 200, {}, b"ok"
+
+    fixture_server.routes["/t"] = tracked
+    statuses = run(check([f"{fixture_server.base_url}/t?{i}" for i in range(12)], **kwargs))
+    assert statuses == ["alive"] * 12
+    assert state["peak"] == expected
+
+
+@pytest.fixture
+def channels(fixture_server, monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setenv("LINK_CHECK_RATE_PER_SEC", "0")
+    monkeypatch.setenv("LINK_CHECK_TIMEOUT_SECONDS", "2")
+    fixture_server.routes.update({"/ok": ok, "/gone": gone})
+    docs = []
+    for i in range(5):
+        path = "/gone" if i in (1, 3) else "/ok"
+        # links point at the fixture server; username_norm stands in for the t.me username
+        docs.append({
+            "id": f"ch-{i}", "status": "approved", "username": f"chan_{i}", "username_norm": f"chan_{i}",
+            "link": f"{fixture_server.base_url}{path}?{i}",
+        })
+    docs.append({"id": "placeholder", "status": "approved", "link": "#"})
+    run(db.channels.insert_many(docs))
+    return db
+
+
+def test_run_reports_batch_totals_and_checks_each_channel_once(channels, fixture_server):
+    batches = []
+
+    async def on_batch(totals):
+        batches.append(dict(totals))
+
+    result = run(server.run_link_check(limit=100, batch_size=2, on_batch=on_batch))
+    assert (result["checked"], result["alive"], result["dead"]) == (5, 3, 2)
+    assert [b["checked"] for b in batches] == [2, 4, 5]
+    assert len({b["started_at"] for b in batches}) == 1
+    assert sum(fixture_server.hits.values()) == 5 + 2  # dead links also get the GET fallback
+    by_id = {d["id"]: d for d in channels.channels.docs}
+    assert by_id["ch-1"]["link_status"] == "dead" and by_id["ch-0"]["link_status"] == "alive"
+    assert "link_status" not in by_id["placeholder"]
+
+
+def test_resumed_run_continues_from_the_checkpoint(channels):
+    batches = []
+
+    async def stop_after_first(totals):
+        batches.append(dict(totals))
+        raise server.JobCancelled()
+
+    with pytest.raises(server.JobCancelled):
+        run(server.run_link_check(limit=100, batch_size=2, on_batch=stop_after_first))
+    result = run(server.run_link_check(limit=100, batch_size=2, totals=batches[0]))
+    assert result["checked"] == 5
+    assert result["alive"] + result["dead"] == 5
+
+
+def test_replace_dead_clears_the_username_and_is_not_rechecked(channels):
+    run(server.run_link_check(limit=100, replace_dead=True))
+    dead = [d for d in channels.channels.docs if d.get("link_status") == "dead"]
+    assert [d["id"] for d in dead] == ["ch-1", "ch-3"]
+    assert all(d["link"] == "#" and d["username_norm"] is None for d in dead)
+    assert [d["username_norm"] for d in channels.channels.docs if d.get("link_status") == "alive"] == ["chan_0", "chan_2", "chan_4"]
+    again = run(server.run_link_check(limit=100))
+    assert (again["checked"], again["dead"]) == (3, 0)
@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class Migrations:
+    """`migrations` collection stand-in keyed by _id."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find(self, query, projection=None):
+        async def gen():
+            for doc in list(self.docs.values()):
+                if all(doc.get(k) == v for k, v in query.items()):
+                    yield {k: v for k, v in doc.items() if k != "_id"}
+        return gen()
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = {"_id": query["_id"], **doc}
+
+
+class Cursor:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self.docs:
+                yield doc
+        return gen()
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class Collection:
+    """Empty collection that enforces MongoDB's index preconditions for the calls migrations make."""
+
+    def __init__(self, name):
+        self.name = name
+        self.indexes = {}
+
+    async def create_index(self, keys, **options):
+        self.indexes[server.index_name(keys, options)] = (keys, options)
+
+    async def index_information(self):
+        return {"_id_": {"key": [("_id", 1)]}, **{name: {"key": keys} for name, (keys, _) in self.indexes.items()}}
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+
+    def find(self, *args, **kwargs):
+        return Cursor()
+
+    def aggregate(self, pipeline):
+        merge = pipeline[-1].get("$merge")
+        if merge:
+            on = merge["on"] if isinstance(merge["on"], list) else [merge["on"]]
+            if not any(opts.get("unique") and [k for k, _ in keys] == on for keys, opts in self.indexes.values()):
+                raise RuntimeError(f"Cannot find index to verify that join fields will be unique: {self.name}")
+        return Cursor()
+
+
+class DB:
+    def __init__(self):
+        self.migrations = Migrations()
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = Collection(name)
+        return self.collections[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def test_index_names_match_mongo_defaults():
+    assert server.index_name([("status", 1), ("category", 1), ("price_rub", -1), ("id", -1)], {}) == "status_1_category_1_price_rub_-1_id_-1"
+    assert server.index_name([("name", "text")], {"name": "channels_text_idx"}) == "channels_text_idx"
+    names = [(c, server.index_name(k, o)) for c, k, o in server.INDEX_SPECS]
+    assert len(names) == len(set(names))
+
+
+def test_migrations_are_ordered_and_unique():
+    versions = [v for v, _, _ in server.MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert server.SCHEMA_VERSION == versions[-1]
+    with pytest.raises(ValueError):
+        server.migration(versions[0], "again")(lambda: None)
+
+
+def test_run_migrations_stops_at_first_failure_and_resumes(monkeypatch):
+    db = DB()
+    calls = []
+    state = {"fail": True}
+
+    async def ok_one():
+        calls.append(1)
+
+    async def flaky():
+        calls.append(2)
+        if state["fail"]:
+            raise RuntimeError("boom")
+        return {"fixed": 3}
+
+    async def last():
+        calls.append(3)
+
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "MIGRATIONS", [(1, "one", ok_one), (2, "two", flaky), (3, "three", last)])
+
+    with pytest.raises(server.MigrationError, match="0002_two"):
+        asyncio.run(server.run_migrations())
+    assert calls == [1, 2]
+    assert db.migrations.docs["0002_two"]["status"] == "failed"
+    assert "boom" in db.migrations.docs["0002_two"]["error"]
+    applied = asyncio.run(server.applied_migrations())
+    assert server.current_schema_version(applied) == 1
+
+    state["fail"] = False
+    ran = asyncio.run(server.run_migrations())
+    assert [r["version"] for r in ran] == [2, 3]
+    assert calls == [1, 2, 2, 3]
+    assert db.migrations.docs["0002_two"]["result"] == {"fixed": 3}
+    assert server.current_schema_version(asyncio.run(server.applied_migrations())) == 3
+
+
+def test_migrations_apply_in_order_on_an_empty_database(monkeypatch):
+    db = DB()
+    monkeypatch.setattr(server, "db", db)
+    ran = asyncio.run(server.run_migrations())
+    assert [r["version"] for r in ran] == [v for v, _, _ in server.MIGRATIONS]
+    assert server.current_schema_version(asyncio.run(server.applied_migrations())) == server.SCHEMA_VERSION
+    assert "id_1" in db.creators.indexes
+    assert "channels_username_norm_unique" in db.channels.indexes
+
+
+def test_boot_check_refuses_a_database_behind_the_build(monkeypatch):
+    db = DB()
+
+    async def noop():
+        pass
+
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "MIGRATIONS", [(1, "one", noop), (2, "two", noop)])
+    monkeypatch.setattr(server, "SCHEMA_VERSION", 2)
+    with pytest.raises(server.MigrationError, match="manage.py migrate"):
+        asyncio.run(server.check_schema_version())
+    asyncio.run(server.run_migrations())
+    assert asyncio.run(server.check_schema_version()) == 2
+
+
+def test_unlisted_indexes_are_reported_then_dropped_by_their_migration(monkeypatch):
+    db = DB()
+    monkeypatch.setattr(server, "db", db)
+    for legacy in ([("status", 1), ("subscribers", -1)], [("created_at", -1)], [("price_rub", -1)], [("er", -1)]):
+        asyncio.run(db.channels.create_index(legacy))
+    unlisted = asyncio.run(server.unlisted_indexes())
+    assert sorted(f"{i['collection']}.{i['name']}" for i in unlisted) == [
+        "channels.created_at_-1", "channels.er_-1", "channels.price_rub_-1", "channels.status_1_subscribers_-1",
+    ]
+    (_, _, drop), = [m for m in server.MIGRATIONS if m[1] == "drop_unlisted_indexes"]
+    result = asyncio.run(drop())
+    assert len(result["dropped"]) == 4
+    assert asyncio.run(server.unlisted_indexes()) == []
+    # the compound that supersedes the legacy index was built before the drop
+    assert "status_1_subscribers_-1_id_-1" in db.channels.indexes
+
+
+def test_ledger_records_each_migration_and_gaps_hold_the_version_back(monkeypatch):
+    db = DB()
+
+    async def noop():
+        return {"n": 1}
+
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "MIGRATIONS", [(1, "one", noop), (2, "two", noop)])
+    asyncio.run(server.run_migrations())
+    record = db.migrations.docs["0001_one"]
+    assert record["kind"] == "migration" and record["status"] == "applied"
+    assert record["result"] == {"n": 1} and record["duration_ms"] >= 0
+    assert record["started_at"] <= record["finished_at"]
+    # applied migrations are not run again
+    assert asyncio.run(server.run_migrations()) == []
+    # a later migration applied over a failed one doesn't advance the schema version
+    db.migrations.docs["0001_one"]["status"] = "failed"
+    assert server.current_schema_version(asyncio.run(server.applied_migrations())) == 0
+
+
+def test_sync_indexes_records_each_outcome_and_keeps_going(monkeypatch):
+    db = DB()
+    monkeypatch.setattr(server, "db", db)
+    specs = [
+        ("channels", [("id", 1)], {"unique": True}),
+        ("channels", [("link", 1)], {"unique": True}),
+        ("jobs", [("status", 1)], {}),
+    ]
+    monkeypatch.setattr(server, "INDEX_SPECS", specs)
+    create_index = Collection.create_index
+
+    async def conflicting(self, keys, **options):
+        if keys == [("link", 1)]:
+            raise RuntimeError("Index with name: link_1 already exists with different options")
+        await create_index(self, keys, **options)
+
+    monkeypatch.setattr(Collection, "create_index", conflicting)
+    doc = asyncio.run(server.sync_indexes())
+    assert [(i["name"], i["status"]) for i in doc["indexes"]] == [("id_1", "ready"), ("link_1", "failed"), ("status_1", "ready")]
+    assert doc["failed"] == 1 and doc["version"] == server.index_specs_version()
+    assert db.migrations.docs["indexes"]["indexes"][1]["error"].startswith("Index with name")
+
+    async def not_building():
+        return set()
+
+    monkeypatch.setattr(server, "index_builds_in_progress", not_building)
+    status = {i["name"]: i for i in asyncio.run(server.index_status())}
+    assert status["id_1"]["status"] == "ready" and status["status_1"]["status"] == "ready"
+    assert status["link_1"]["status"] == "failed" and "different options" in status["link_1"]["error"]
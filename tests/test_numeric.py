@@ -0,0 +1,95 @@
+"""Property-style checks for the count parsers over a seeded, generated corpus of scraped formats."""
+import math
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+
+pytest.importorskip("pandas")
+
+import scraping  # noqa: E402
+
+SEED = 20240611
+SPACES = [" ", " ", " ", " "]
+PREFIXES = ["", "≈ ", "Подписчики: ", "subs ", "~"]
+TRAILERS = ["", " подписчиков", " subscribers", " members", "+", " чел."]
+SUFFIXES = {
+    1_000: ["k", "K", "к", "тыс", "тыс.", "тысяч", "thousand"],
+    1_000_000: ["m", "M", "м", "млн", "млн.", "миллиона", "million"],
+    1_000_000_000: ["b", "млрд", "billion"],
+}
+
+
+def grouped(n: int, sep: str) -> str:
+    return f"{n:,}".replace(",", sep)
+
+
+def plain_case(rng: random.Random):
+    n = rng.choice([rng.randint(0, 999), rng.randint(1_000, 999_999), rng.randint(1_000_000, 10 ** 12)])
+    style = rng.choice(["plain", "space", "comma", "dot"])
+    if style == "plain" or n < 1000:
+        text = str(n)
+    elif style == "space":
+        text = grouped(n, rng.choice(SPACES))
+    else:
+        text = grouped(n, "," if style == "comma" else ".")
+    return rng.choice(PREFIXES) + text + rng.choice(TRAILERS), n
+
+
+def suffix_case(rng: random.Random):
+    mult = rng.choice(list(SUFFIXES))
+    whole = rng.randint(0, 9999)
+    decimals = rng.randint(0, 3)
+    frac = "".join(rng.choice("0123456789") for _ in range(decimals))
+    number = str(whole) + ((rng.choice(".,") + frac) if frac else "")
+    gap = rng.choice(["", " ", " "])
+    expected = int((Decimal(f"{whole}.{frac or 0}") * mult).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return rng.choice(PREFIXES) + number + gap + rng.choice(SUFFIXES[mult]) + rng.choice(TRAILERS), expected
+
+
+def corpus(size: int = 3000):
+    rng = random.Random(SEED)
+    return [plain_case(rng) if rng.random() < 0.5 else suffix_case(rng) for _ in range(size)]
+
+
+JUNK = [None, float("nan"), "", "   ", "none", "N/A", "нет данных", "k", "млн", "—"]
+
+
+def test_to_int_reads_generated_formats():
+    for text, expected in corpus():
+        assert scraping.to_int(text) == expected, text
+
+
+def test_parse_counts_matches_scalar_parser():
+    rng = random.Random(SEED + 1)
+    texts = [text for text, _ in corpus()] + JUNK + ["9" * 20, "5000000 млрд", "1200members", "12,500k"]
+    rng.shuffle(texts)
+    counts, valid = scraping.parse_counts(texts)
+    assert counts.dtype.kind == "i" and valid.dtype == bool
+    for text, count, ok in zip(texts, counts, valid):
+        scalar = scraping.to_int(text)
+        assert ok == (scalar is not None), text
+        assert count == (scalar if ok else 0), text
+
+
+def test_parse_counts_marks_junk_invalid():
+    counts, valid = scraping.parse_counts(JUNK)
+    assert not valid.any()
+    assert (counts == 0).all()
+
+
+def test_suffix_needs_a_word_boundary():
+    assert scraping.to_int("1200 members") == 1200
+    assert scraping.to_int("5 мес") == 5
+    assert scraping.to_int("1,2M") == 1_200_000
+
+
+def test_parse_floats_matches_to_float():
+    rng = random.Random(SEED + 2)
+    texts = [f"{rng.uniform(0, 100):.{rng.randint(0, 3)}f}".replace(".", rng.choice(".,")) for _ in range(500)]
+    texts += [None, "", "abc", " 4,5 "]
+    floats, valid = scraping.parse_floats(texts)
+    for text, value, ok in zip(texts, floats, valid):
+        scalar = scraping.to_float(text)
+        assert ok == (scalar is not None), text
+        assert math.isnan(value) if not ok else value == scalar
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def with_fetcher(fn, **kwargs):
+    fetcher = server.PageFetcher(backoff=0.01, **kwargs)
+    try:
+        return await fn(fetcher)
+    finally:
+        await fetcher.aclose()
+
+
+def test_fetch_decodes_body(fixture_server):
+    html = "<html><body>Каналы</body></html>".encode("utf-8")
+    fixture_server.routes["/list"] = lambda h: (200, {"Content-Type": "text/html; charset=utf-8"}, html)
+    text = run(with_fetcher(lambda f: f.fetch(fixture_server.base_url + "/list")))
+    assert "Каналы" in text
+
+
+def test_fetch_revalidates_with_etag(fixture_server):
+    def route(h):
+        if h.headers.get("If-None-Match") == '"v1"':
+            return 304, {}, b""
+        return 200, {"ETag": '"v1"'}, b"<html>first</html>"
+
+    fixture_server.routes["/list"] = route
+
+    async def twice(f):
+        url = fixture_server.base_url + "/list"
+        return await f.fetch(url), await f.fetch(url)
+
+    first, second = run(with_fetcher(twice))
+    assert first == second == "<html>first</html>"
+    assert fixture_server.hits["/list"] == 2
+
+
+def test_fetch_retries_transient_errors(fixture_server):
+    calls = {"n": 0}
+
+    def route(h):
+        calls["n"] += 1
+        if calls["n"] < 3:
+            return 503, {}, b"busy"
+        return 200, {}, b"ok"
+
+    fixture_server.routes["/flaky"] = route
+    assert run(with_fetcher(lambda f: f.fetch(fixture_server.base_url + "/flaky"), retries=3)) == "ok"
+    assert calls["n"] == 3
+
+
+def test_fetch_gives_up_on_client_errors(fixture_server):
+    fixture_server.routes["/gone"] = lambda h: (404, {}, b"")
+    with pytest.raises(server.HTTPException) as exc:
+        run(with_fetcher(lambda f: f.fetch(fixture_server.base_url + "/gone")))
+    assert "404" in exc.value.detail
+    assert fixture_server.hits["/gone"] == 1
+
+
+def test_fetch_caps_response_size(fixture_server):
+    fixture_server.routes["/big"] = lambda h: (200, {}, b"x" * 5000)
+    with pytest.raises(server.HTTPException) as exc:
+        run(with_fetcher(lambda f: f.fetch(fixture_server.base_url + "/big"), max_bytes=1000))
+    assert "larger" in exc.value.detail
+
+
+def test_fetch_many_pages(fixture_server):
+    for n in (1, 2, 3):
+        fixture_server.routes[f"/top/{n}"] = lambda h, n=n: (200, {}, f"page {n}".encode())
+    urls = server.list_page_urls(fixture_server.base_url + "/top/{page}", pages=3)
+    assert run(with_fetcher(lambda f: f.fetch_many(urls))) == ["page 1", "page 2", "page 3"]
+
+
+def test_list_page_urls_query_param():
+    assert server.list_page_urls("https://x.test/list?cat=news&page=1", 3) == [
+        "https://x.test/list?cat=news&page=1",
+        "https://x.test/list?cat=news&page=2",
+        "https://x.test/list?cat=news&page=3",
+    ]
+
+
+def test_open_stream_retries_before_handing_out_body(fixture_server):
+    calls = {"n": 0}
+
+    def route(h):
+        calls["n"] += 1
+        return (503, {}, b"busy") if calls["n"] == 1 else (200, {}, b"streamed")
+
+    fixture_server.routes["/big"] = route
+
+    async def read(f):
+        async with f.open_stream(fixture_server.base_url + "/big") as resp:
+            return await resp.aread()
+
+    assert run(with_fetcher(read)) == b"streamed"
+    assert calls["n"] == 2
+
+
+def test_stream_listing_stops_at_limit(fixture_server, monkeypatch):
+    cards = "".join(
+        f'<div class="card"><h3>Channel {i}</h3><a href="https://t.me/channel_{i:04d}">go</a>{i} subs</div>'
+        for i in range(2000)
+    )
+    body = f"<html><body><div class='list'>{cards}</div></body></html>".encode()
+    fixture_server.routes["/list"] = lambda h: (200, {"Content-Type": "text/html; charset=utf-8"}, body)
+
+    async def go():
+        monkeypatch.setattr(server, "page_fetcher", server.PageFetcher(backoff=0.01))
+        try:
+            return await server.stream_listing("telemetr", fixture_server.base_url + "/list", 5)
+        finally:
+            await server.page_fetcher.aclose()
+
+    items = run(go())
+    assert [it["link"] for it in items] == [f"https://t.me/channel_{i:04d}" for i in range(5)]
+    assert items[0]["name"] == "Channel 0"
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from tests.fakedb import FakeDB, sort_docs
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    db = FakeDB()
+    docs = []
+    for i in range(23):
+        docs.append({
+            "id": f"ch-{i:02d}",
+            "name": ["Alpha", "Beta", "Gamma"][i % 3],
+            "link": f"https://t.me/channel_{i:02d}",
+            "status": "approved",
+            # heavy ties and nulls, so only the `id` tiebreaker orders whole pages
+            "subscribers": [1000, 500, 500, 0][i % 4],
+            "price_rub": None if i % 5 == 0 else [100, 200][i % 2],
+            "er": None if i % 3 == 0 else 2.5,
+            "created_at": f"2026-01-0{1 + i % 3}T00:00:00+00:00",
+            "updated_at": "2026-01-05T00:00:00+00:00",
+        })
+    asyncio.run(db.channels.insert_many(docs))
+    monkeypatch.setattr(server, "db", db)
+    return db
+
+
+@pytest.fixture
+def client():
+    return TestClient(server.app)
+
+
+def walk(client, sort, limit=4):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"sort": sort, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/channels", params=params).json()
+        ids.extend(item["id"] for item in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            assert not body["has_more"]
+            return ids, pages
+
+
+@pytest.mark.parametrize("sort", list(server.CHANNEL_SORTS))
+def test_every_sort_ends_with_the_id_tiebreaker(sort):
+    assert server.CHANNEL_SORTS[sort][-1][0] == "id"
+
+
+@pytest.mark.parametrize("sort", list(server.CHANNEL_SORTS))
+def test_cursor_walk_has_no_duplicates_or_gaps(catalog, client, sort):
+    ids, pages = walk(client, sort)
+    expected = [d["id"] for d in sort_docs(list(catalog.channels.docs), server.CHANNEL_SORTS[sort])]
+    assert ids == expected
+    assert pages == 6
+
+
+def test_seek_filter_breaks_ties_on_id(catalog):
+    spec = server.CHANNEL_SORTS["popular"]
+    after = server.seek_filter(spec, [500, "ch-05"])
+    found = asyncio.run(catalog.channels.find(after).sort(spec).to_list())
+    assert [d["id"] for d in found][:3] == ["ch-02", "ch-01", "ch-19"]
+
+
+def test_seek_filter_places_nulls_last_on_descending_keys(catalog):
+    spec = server.CHANNEL_SORTS["price"]
+    found = asyncio.run(catalog.channels.find(server.seek_filter(spec, [100, "ch-02"])).sort(spec).to_list())
+    assert all(d["price_rub"] is None for d in found)
+    assert [d["id"] for d in found] == ["ch-20", "ch-15", "ch-10", "ch-05", "ch-00"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!not-base64!!",
+    "WzFd",  # valid base64 JSON, but a list
+    server.encode_cursor({"s": "new", "v": ["2026-01-01", "x"]}),
+    server.encode_cursor({"s": "popular", "v": [1]}),
+], ids=["garbage", "not-an-object", "other-sort", "wrong-length"])
+def test_malformed_or_mismatched_cursor_is_rejected(catalog, client, cursor):
+    r = client.get("/api/channels", params={"sort": "popular", "cursor": cursor})
+    assert r.status_code == 400
+
+
+def test_relevance_sort_cannot_use_a_cursor(catalog, client):
+    cursor = server.encode_cursor({"s": "relevance", "v": [1.0, 10, "ch-01"]})
+    r = client.get("/api/channels", params={"sort": "relevance", "q": "crypto news", "cursor": cursor})
+    assert r.status_code == 400
+    assert "relevance" in r.json()["detail"]
+
+
+def test_totals_default_off_in_cursor_mode(catalog, client, monkeypatch):
+    calls = []
+
+    async def count(collection, query, **kwargs):
+        calls.append(query)
+        return 23, True
+
+    monkeypatch.setattr(server.count_cache, "count", count)
+    first = client.get("/api/channels", params={"limit": 4}).json()
+    assert first["total"] == 23 and len(calls) == 1
+    nxt = client.get("/api/channels", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+    assert nxt["total"] is None and len(calls) == 1
+    counted = client.get("/api/channels", params={"limit": 4, "cursor": first["next_cursor"], "include_total": True}).json()
+    assert counted["total"] == 23 and len(calls) == 2
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("bs4")
+
+import server  # noqa: E402
+
+HTML = '<div class="card"><h3>Pool</h3><a href="https://t.me/pool_chan">go</a> 12 subs</div>'
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def pool():
+    pool = server.ParserPool(workers=2, max_tasks_per_child=0, timeout=5, memory_mb=0)
+    yield pool
+    pool.shutdown()
+
+
+def parse(pool):
+    return pool.parse("telemetr", HTML, "https://x.test/")
+
+
+def test_parse_runs_in_a_worker_process(pool):
+    async def scenario():
+        cards = await parse(pool)
+        pid = await pool.call(os.getpid)
+        return cards, pid
+
+    cards, pid = run(scenario())
+    assert [c["name"] for c in cards] == ["Pool"]
+    assert pid != os.getpid()
+    assert pool.stats() == {"workers": 2, "idle": 1, "recycled": 0}
+
+
+def test_timeout_replaces_only_the_stuck_worker(pool):
+    pool.timeout = 2
+
+    async def scenario():
+        stuck = asyncio.ensure_future(pool.call(time.sleep, 30))
+        await asyncio.sleep(0.2)
+        # the other worker keeps parsing while one is stuck
+        cards = await parse(pool)
+        with pytest.raises(HTTPException) as err:
+            await stuck
+        return cards, err.value, await parse(pool)
+
+    cards, err, after = run(scenario())
+    assert err.status_code == 504
+    assert cards == after and cards[0]["name"] == "Pool"
+    assert pool.stats()["recycled"] == 1
+
+
+def test_crashed_worker_is_reported_and_replaced(pool):
+    async def scenario():
+        with pytest.raises(HTTPException) as err:
+            await pool.call(os._exit, 3)
+        return err.value, await parse(pool)
+
+    err, cards = run(scenario())
+    assert err.status_code == 502 and "exit code 3" in err.detail
+    assert cards[0]["name"] == "Pool"
+
+
+def test_memory_error_is_reported_as_oom():
+    pool = server.ParserPool(workers=1, max_tasks_per_child=0, timeout=10, memory_mb=1024)
+    try:
+        async def scenario():
+            with pytest.raises(HTTPException) as err:
+                await pool.call(bytearray, 8 * 1024 ** 3)
+            return err.value, await parse(pool)
+
+        err, cards = run(scenario())
+    finally:
+        pool.shutdown()
+    assert err.status_code == 503 and "memory" in err.detail
+    assert cards[0]["name"] == "Pool"
+    assert pool.stats()["recycled"] == 1
+
+
+def test_parse_errors_propagate_and_keep_the_worker(pool):
+    async def scenario():
+        with pytest.raises(KeyError):
+            await pool.parse("no-such-source", HTML, "https://x.test/")
+        return await parse(pool)
+
+    assert run(scenario())[0]["name"] == "Pool"
+    assert pool.stats()["recycled"] == 0
+
+
+def test_workers_are_retired_after_max_tasks():
+    pool = server.ParserPool(workers=1, max_tasks_per_child=2, timeout=5, memory_mb=0)
+    try:
+        async def scenario():
+            return [await pool.call(os.getpid) for _ in range(4)]
+
+        pids = run(scenario())
+    finally:
+        pool.shutdown()
+    assert pids[0] == pids[1] != pids[2] == pids[3]
+    assert pool.stats()["recycled"] == 2
+
+
+def test_zero_workers_parses_in_a_thread():
+    pool = server.ParserPool(workers=0)
+
+    async def scenario():
+        return await parse(pool), await pool.call(os.getpid)
+
+    cards, pid = run(scenario())
+    assert cards[0]["name"] == "Pool"
+    assert pid == os.getpid()
+    assert pool.stats()["idle"] == 0
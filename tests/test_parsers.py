@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bs4")
+
+import scraping  # noqa: E402
+
+FIXTURES = Path(__file__).parent / "fixtures" / "parsers"
+PAGES = sorted(FIXTURES.glob("*.html"))
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[p.stem for p in PAGES])
+def test_parser_matches_golden_output(page):
+    source = page.stem.split("_")[0]
+    got = scraping.PARSERS[source].parse(page.read_text(encoding="utf-8"), f"https://{source}.test/catalog")
+    expected = json.loads(page.with_suffix(".json").read_text(encoding="utf-8"))
+    assert got == expected
+
+
+def test_nested_container_wins_for_its_link():
+    html = """
+    <div class="list">
+      <div class="card"><h3>Outer</h3><a href="https://t.me/chan_one">go</a> 5 subs
+        <div class="card"><h3>Inner</h3>@chan_one 7 subs</div>
+      </div>
+    </div>
+    """
+    [card] = scraping.parse_listing("telemetr", html, "https://x.test/")
+    assert card["name"] == "Inner"
+    assert card["subscribers"] == 7
+
+
+def test_card_text_ignores_scripts():
+    html = "<div><script>var a = '@hidden_user';</script>no handle</div>"
+    assert scraping.parse_listing("telemetr", html, "https://x.test/") == []
+
+
+@pytest.mark.parametrize("source", ["telemetr", "telega"])
+def test_streaming_parser_finds_the_same_cards(source):
+    page = FIXTURES / f"{source}_list.html"
+    raw = page.read_bytes()
+    chunks = [raw[i:i + 64] for i in range(0, len(raw), 64)]
+    streamed = scraping.parse_listing_stream(source, chunks, f"https://{source}.test/catalog", encoding="utf-8")
+    expected = json.loads(page.with_suffix(".json").read_text(encoding="utf-8"))
+    assert {c["link"] for c in streamed} == {c["link"] for c in expected}
+    # telemetr's <a class="card"> wrapper case is the documented exception: the wrapper no longer
+    # sees the finished inner card's text, so its name falls back to the link
+    by_link = {c["link"]: c for c in expected}
+    mismatched = [c["link"] for c in streamed if c != by_link[c["link"]]]
+    assert mismatched in ([], ["https://t.me/outer_anchor"])
+
+
+def test_streaming_parser_stops_at_limit():
+    parser = scraping.StreamingCardParser("telemetr", "https://x.test/", limit=2)
+    for i in range(10):
+        parser.feed(f'<div class="card"><a href="https://t.me/chan_{i:02d}">c{i}</a></div>'.encode())
+    parser.close()
+    assert parser.done
+    assert [c["link"] for c in parser.cards] == ["https://t.me/chan_00", "https://t.me/chan_01"]
+
+
+def test_selector_compiles_css_subset():
+    sel = scraping.Selector('h3, .title, a[href*="t.me"], div.card[data-kind*="chan"]')
+    assert sel.matches("h3", [], {}.get)
+    assert sel.matches("span", ["x", "title"], {}.get)
+    assert sel.matches("a", [], {"href": "https://t.me/x"}.get)
+    assert not sel.matches("a", [], {"href": "https://example.com"}.get)
+    assert sel.matches("div", ["card"], {"data-kind": "channel"}.get)
+    assert not sel.matches("div", ["card"], {}.get)
+    assert "self::h3" in sel.xpath
+
+
+def test_selector_rejects_unsupported_syntax():
+    with pytest.raises(ValueError):
+        scraping.Selector("div > a")
+
+
+def test_registered_source_is_used_for_parsing(monkeypatch):
+    monkeypatch.setitem(scraping.PARSERS, "demo", scraping.SourceParser(
+        "demo", cards=".entry", title=(".label",), category=".topic",
+    ))
+    html = """
+    <section class="entry"><span class="label">Demo Chan</span><a href="https://t.me/demo_chan">go</a>
+      <i class="topic">Тест</i> 42 subs</section>
+    """
+    [card] = scraping.parse_listing("demo", html, "https://demo.test/")
+    assert card == {"name": "Demo Chan", "link": "https://t.me/demo_chan", "avatar_url": None, "subscribers": 42, "category": "Тест"}
+    streamed = scraping.parse_listing_stream("demo", [html.encode()], "https://demo.test/", encoding="utf-8")
+    assert streamed == [card]
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+from tests.fakedb import FakeDB
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_hash_and_verify_run_on_the_pool_threads():
+    hasher = server.PasswordHasher(workers=2, max_queue=4)
+
+    async def scenario():
+        hashed = await hasher.hash("s3cret")
+        ok, bad = await asyncio.gather(hasher.verify("s3cret", hashed), hasher.verify("wrong", hashed))
+        thread = await hasher._run(lambda: threading.current_thread().name)
+        return hashed, ok, bad, thread
+
+    hashed, ok, bad, thread = run(scenario())
+    assert hashed.startswith("$pbkdf2-sha256$")
+    assert (ok, bad) == (True, False)
+    assert thread.startswith("pwd")
+    assert hasher.stats() == {"workers": 2, "running": 0, "queue_depth": 0, "max_queue_depth": 1, "completed": 4, "rejected": 0}
+
+
+def test_full_queue_fails_fast_with_503():
+    hasher = server.PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(hasher._run(release.wait))
+        queued = asyncio.ensure_future(hasher._run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as err:
+            await hasher.verify("pw", "hash")
+        stats = hasher.stats()
+        release.set()
+        await asyncio.gather(running, queued)
+        return err.value, stats
+
+    err, stats = run(scenario())
+    assert err.status_code == 503
+    assert (stats["running"], stats["queue_depth"], stats["rejected"]) == (1, 1, 1)
+    assert hasher.stats()["completed"] == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    hasher = server.PasswordHasher(workers=1, max_queue=2)
+    monkeypatch.setattr(server, "password_hasher", hasher)
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    run(db.users.insert_one({
+        "id": "u1", "email": "admin@test.com", "role": "admin", "created_at": "2026-01-01T00:00:00+00:00",
+        "password_hash": server.pwd_ctx.hash("Admin123"),
+    }))
+    monkeypatch.setitem(server.app.dependency_overrides, server.get_current_admin_reader, lambda: {"id": "u1", "role": "admin"})
+    return TestClient(server.app)
+
+
+def test_login_verifies_through_the_pool_and_metrics_report_it(client):
+    assert client.post("/api/auth/login", json={"email": "admin@test.com", "password": "Admin123"}).status_code == 200
+    assert client.post("/api/auth/login", json={"email": "admin@test.com", "password": "nope"}).status_code == 401
+    stats = client.get("/api/admin/metrics").json()["password_hasher"]
+    assert stats["completed"] == 2 and stats["rejected"] == 0
+    assert set(stats) == {"workers", "running", "queue_depth", "max_queue_depth", "completed", "rejected"}
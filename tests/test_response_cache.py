@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Loader:
+    """Loader that counts calls and can hold each load open until released."""
+
+    def __init__(self, value="v", error=None):
+        self.calls = 0
+        self.value = value
+        self.error = error
+        self.gate = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error:
+            raise self.error
+        return f"{self.value}{self.calls}"
+
+
+def test_concurrent_misses_share_one_load():
+    cache = server.ResponseCache()
+    load = Loader()
+
+    async def scenario():
+        load.gate = asyncio.Event()
+        waiters = [asyncio.ensure_future(cache.get_or_load("k", 60, ("channels",), load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        load.gate.set()
+        return await asyncio.gather(*waiters)
+
+    assert run(scenario()) == ["v1"] * 5
+    assert load.calls == 1
+    assert (cache.misses, cache.hits) == (1, 4)
+    assert run(cache.get_or_load("k", 60, ("channels",), load)) == "v1"
+
+
+def test_write_evicts_tagged_entries_and_discards_loads_in_flight():
+    cache = server.ResponseCache()
+    load = Loader()
+
+    async def scenario():
+        await cache.get_or_load("channels", 60, ("channels",), load)
+        await cache.get_or_load("creators", 60, ("creators",), load)
+        cache.invalidate("channels")
+        assert set(cache._entries) == {"creators"}
+        # a load that started before a write returns its result but doesn't store it
+        load.gate = asyncio.Event()
+        stale = asyncio.ensure_future(cache.get_or_load("channels", 60, ("channels",), load))
+        await asyncio.sleep(0)
+        cache.invalidate("channels")
+        load.gate.set()
+        assert await stale == "v3"
+        load.gate = None
+        return await cache.get_or_load("channels", 60, ("channels",), load)
+
+    assert run(scenario()) == "v4"
+
+
+def test_failed_load_is_not_cached():
+    cache = server.ResponseCache()
+    load = Loader(error=RuntimeError("db down"))
+
+    async def scenario():
+        load.gate = asyncio.Event()
+        waiters = [asyncio.ensure_future(cache.get_or_load("k", 60, (), load)) for _ in range(3)]
+        await asyncio.sleep(0)
+        load.gate.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        load.gate, load.error = None, None
+        return results, await cache.get_or_load("k", 60, (), load)
+
+    results, retried = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert retried == "v2" and load.calls == 2
+    assert cache.stats()["inflight"] == 0
+
+
+def test_cached_endpoint_keys_on_arguments_and_clears_on_write(monkeypatch):
+    monkeypatch.setattr(server, "response_cache", server.ResponseCache())
+    calls = []
+
+    @server.cached_endpoint(ttl=60, tags=("categories",))
+    async def handler(limit: int = 10):
+        calls.append(limit)
+        return {"limit": limit, "n": len(calls)}
+
+    async def scenario():
+        first = [await handler(limit=5), await handler(limit=5), await handler(limit=6)]
+        server.notify_write("categories")
+        return first, await handler(limit=5)
+
+    first, after_write = run(scenario())
+    assert [r["n"] for r in first] == [1, 1, 2]
+    assert after_write == {"limit": 5, "n": 3}
+    assert calls == [5, 6, 5]
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from tests.fakedb import FakeDB
+
+NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def days_ago(n):
+    return (NOW - timedelta(days=n)).isoformat()
+
+
+def test_growth_score_components():
+    assert server.compute_growth_score({}, NOW) == 0
+    assert server.compute_growth_score({"growth_30d": 40}, NOW) == 20
+    assert server.compute_growth_score({"growth_30d": 500, "er": 50}, NOW) == 80
+    assert server.compute_growth_score({"growth_30d": -30, "er": -1}, NOW) == 0
+    assert server.compute_growth_score({"last_post_at": NOW.isoformat()}, NOW) == 20
+    assert server.compute_growth_score({"last_post_at": days_ago(7)}, NOW) == 10
+    assert server.compute_growth_score({"last_post_at": "2026-02-22T00:00:00Z"}, NOW) == 10
+    assert server.compute_growth_score({"last_post_at": "not a date", "er": "12"}, NOW) == 0
+
+
+def test_featured_channels_outrank_everything_else():
+    best_regular = {"growth_30d": 100, "er": 20, "last_post_at": NOW.isoformat()}
+    quiet_featured = {"is_featured": True, "last_post_at": days_ago(365)}
+    assert server.compute_growth_score(best_regular, NOW) == 100
+    assert server.compute_growth_score(quiet_featured, NOW) > server.compute_growth_score(best_regular, NOW)
+
+
+def test_new_channels_are_scored_on_write():
+    doc = server.prepare_channel_for_mongo(server.ChannelCreate(name="Alpha", link="https://t.me/alpha_news", growth_30d=40).model_dump())
+    assert doc["growth_score"] == 20
+    featured = server.prepare_channel_for_mongo(server.ChannelCreate(name="Beta", link="https://t.me/beta_news", is_featured=True).model_dump())
+    assert featured["growth_score"] >= server.GROWTH_SCORE_FEATURED_BONUS
+    # a partial update can't be scored from its own fields; update_channel_fields rescores it
+    assert "growth_score" not in server.prepare_channel_for_mongo({"er": 5.0})
+
+
+def test_growth_score_job_stops_when_cancelled(monkeypatch):
+    class Cursor:
+        def __init__(self, docs):
+            self.docs = docs
+
+        def batch_size(self, n):
+            return self
+
+        async def __aiter__(self):
+            for doc in self.docs:
+                yield doc
+
+    class Result:
+        modified_count = 1
+
+    class Channels:
+        writes = 0
+
+        def find(self, query, projection):
+            return Cursor([{"id": str(i), "growth_30d": i} for i in range(1, 4)])
+
+        async def bulk_write(self, ops, ordered=True):
+            Channels.writes += 1
+            return Result()
+
+    class DB:
+        channels = Channels()
+
+    async def cancel(**progress):
+        raise server.JobCancelled()
+
+    monkeypatch.setattr(server, "db", DB())
+    with pytest.raises(server.JobCancelled):
+        asyncio.run(server.run_growth_scores(batch_size=1, on_progress=cancel))
+    assert Channels.writes == 1
+
+
+def test_updates_cannot_set_growth_score(monkeypatch):
+    assert "growth_score" not in server.ChannelUpdate.model_fields
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    channel = server.prepare_channel_for_mongo(server.ChannelCreate(name="Alpha", link="https://t.me/alpha_news", growth_30d=40).model_dump())
+    asyncio.run(db.channels.insert_one({**channel, "id": "a"}))
+    # even a raw updates dict carrying a score is rescored from the channel's own fields
+    asyncio.run(server.update_channel_fields("a", {"name": "Alpha 2", "growth_score": 1e9}))
+    assert db.channels.docs[0]["growth_score"] == 20
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from tests.fakedb import FakeDB, with_spec_indexes
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.mark.parametrize("raw", [
+    "durov", "@Durov", " durov ", "t.me/durov", "https://t.me/durov/", "http://telegram.me/durov?start=1",
+    "https://www.t.me/durov", "telegram.dog/durov", "https://t.me/s/durov", "https://t.me/durov/123",
+])
+def test_spellings_of_a_public_channel_normalize_to_one_username(raw):
+    assert server.normalize_tg_username(raw) == "durov"
+
+
+@pytest.mark.parametrize("raw", [
+    None, "", "@", "#", "https://t.me/", "https://t.me/s/", "https://t.me/joinchat/AAAAAE",
+    "https://t.me/+AbCdEf", "https://t.me/c/1234/5", "https://t.me/addstickers/pack",
+    "https://example.com/durov", "https://t.me.evil.com/durov", "@ab", "@bad-name",
+])
+def test_invites_reserved_paths_and_other_hosts_have_no_username(raw):
+    assert server.normalize_tg_username(raw) is None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    return db
+
+
+def test_backfill_keeps_the_oldest_channel_and_nulls_duplicates(db):
+    run(db.channels.insert_many([
+        {"id": "new", "link": "https://t.me/Dupe", "created_at": "2026-03-01"},
+        {"id": "old", "link": "@dupe", "created_at": "2026-01-01"},
+        {"id": "invite", "link": "https://t.me/joinchat/xyz", "created_at": "2026-01-02"},
+        {"id": "by-username", "link": "#", "username": "other_chan", "created_at": "2026-01-03"},
+        {"id": "done", "link": "https://t.me/done_chan", "username_norm": "done_chan", "created_at": "2025-01-01"},
+    ]))
+    run(with_spec_indexes(db, server, "channels"))
+    result = run(server.backfill_username_norm(batch_size=2))
+    norms = {d["id"]: d["username_norm"] for d in db.channels.docs}
+    assert norms == {"new": None, "old": "dupe", "invite": None, "by-username": "other_chan", "done": "done_chan"}
+    assert result["duplicates"] == 1
+    # a second run has nothing left to do
+    assert run(server.backfill_username_norm()) == {"updated": 0, "duplicates": 0}
+
+
+def test_lookup_by_username_falls_back_to_the_stored_username(db):
+    run(db.channels.insert_many([
+        {"id": "a", "name": "A", "link": "https://t.me/chan_a", "username": "chan_a", "username_norm": "chan_a",
+         "status": "approved", "created_at": "2026-01-01", "updated_at": "2026-01-01"},
+        {"id": "b", "name": "B", "link": "https://t.me/+invite", "username": "Private-B", "username_norm": None,
+         "status": "approved", "created_at": "2026-01-01", "updated_at": "2026-01-01"},
+    ]))
+    client = TestClient(server.app)
+    assert client.get("/api/channels/username/@CHAN_A").json()["channel"]["id"] == "a"
+    assert client.get("/api/channels/username/Private-B").json()["channel"]["id"] == "b"
+    assert client.get("/api/channels/username/missing").status_code == 404